@@ -0,0 +1,370 @@
+"""
+Offline Batch Modu
+Video dosyalarını ve resim klasörlerini GUI olmadan sınıflandırır
+
+Kullanım:
+    python batch.py kayit1.mp4 kayit2.mp4 resimler/ -o sonuclar.jsonl
+    python batch.py kayitlar/ -o sonuclar.csv --workers 8 --chunk-size 500
+
+Her girdi parçalara (shard) bölünür ve process havuzuna dağıtılır; her
+worker process kendi PoseDetector örneğine sahiptir. Sonuçlar sırayı
+koruyarak JSONL veya CSV olarak akış halinde yazılır.
+
+--cache ile videoların landmark'ları landmark_cache'e yazılır; aynı video
+aynı model ayarlarıyla (ve aynı --chunk-size ile, takip shard başında
+sıfırlandığı için) tekrar işlenirken inference yapılmaz, satırlar kayıttan
+vektörel olarak üretilir.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from landmark_cache import DEFAULT_ROOT, LandmarkCache, score
+from landmarks import LandmarkArrays
+from pose_detector import PoseDetector, add_detector_arguments, detector_options_from_args
+
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v"}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+FIELDNAMES = [
+    "source", "frame", "timestamp", "pose",
+    "mouth_ratio", "hand_height", "hands_detected", "face_detected",
+]
+
+
+# ─── Worker tarafı ───────────────────────────────────────────────────────────
+
+_detector_options = {}
+_detectors = {}
+_cache_root = None
+_chunk_size = None
+
+
+def _init_worker(detector_options, cache_root=None, chunk_size=None):
+    global _detector_options, _cache_root, _chunk_size
+    _detector_options = detector_options
+    _cache_root = cache_root
+    _chunk_size = chunk_size
+
+
+def _get_detector(static_image_mode):
+    """Process başına mod başına bir detector (video: takip, resim: statik)"""
+    detector = _detectors.get(static_image_mode)
+    if detector is None:
+        # Cache'e yazılan landmark'lar başka kurallarla da puanlanır - tüm noktalar gerekli
+        detector = PoseDetector(static_image_mode=static_image_mode, full_landmarks=_cache_root is not None,
+                                **_detector_options)
+        _detectors[static_image_mode] = detector
+    return detector
+
+
+def _make_row(source, frame_index, timestamp, result):
+    debug_info = result.debug_info
+    return {
+        "source": source,
+        "frame": frame_index,
+        "timestamp": timestamp,
+        "pose": result.pose_name,
+        "mouth_ratio": round(float(debug_info['mouth_ratio']), 6),
+        "hand_height": round(float(debug_info['hand_height']), 6),
+        "hands_detected": debug_info['hands_detected'],
+        "face_detected": debug_info['face_detected'],
+    }
+
+
+def _cache_options(detector_options, chunk_size):
+    """Video shard'larının cache anahtarı ayarları - takip her shard başında sıfırlanır"""
+    return {"static_image_mode": False, **detector_options, "tracking_chunk": chunk_size}
+
+
+def _process_shard(shard):
+    """Tek bir shard'ı işler, (satır listesi, cache'e yazılacak landmark'lar veya None) döner"""
+    if shard["kind"] == "video":
+        return _process_video_shard(shard)
+    if shard["kind"] == "cached":
+        return _process_cached_shard(shard), None
+    return _process_image_shard(shard), None
+
+
+def _process_video_shard(shard):
+    detector = _get_detector(static_image_mode=False)
+    # Önceki shard'ın takip durumu bu shard'a taşınmasın
+    detector.reset()
+
+    capture = cv2.VideoCapture(shard["path"])
+    if shard["start"] > 0:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, shard["start"])
+
+    rows = []
+    landmarks, latencies = [], []
+    fps = shard["fps"]
+    try:
+        for frame_index in range(shard["start"], shard["end"]):
+            ret, frame = capture.read()
+            if not ret:
+                break
+            started = time.perf_counter()
+            result = detector.detect(frame)
+            latencies.append(time.perf_counter() - started)
+            landmarks.append(result.landmarks)
+            timestamp = round(frame_index / fps, 4) if fps > 0 else None
+            rows.append(_make_row(shard["path"], frame_index, timestamp, result))
+    finally:
+        capture.release()
+
+    if _cache_root is None or not landmarks:
+        return rows, None
+    captured = {
+        "landmarks": LandmarkArrays.stack(landmarks),
+        "timestamps": [row["timestamp"] or 0.0 for row in rows],
+        "latencies": latencies,
+    }
+    return rows, captured
+
+
+def _process_cached_shard(shard):
+    """Video shard'ının satırları cache kaydından - inference yok, kurallar tek geçişte"""
+    cached = LandmarkCache(_cache_root).load(shard["path"], _cache_options(_detector_options, _chunk_size))
+    start, end = shard["start"], min(shard["end"], len(cached))
+    landmarks = LandmarkArrays(
+        pose=cached.landmarks.pose[start:end],
+        hands=cached.landmarks.hands[start:end],
+        face=cached.landmarks.face[start:end],
+    )
+    labels, metrics = score(landmarks, _detector_options.get("thresholds"), _detector_options.get("gestures"))
+    hand_counts = landmarks.hand_count
+    face_detected = landmarks.face_detected
+    # Tespit yoksa (veya kural dosyasında metrik yoksa) debug değerleri 0 gösterilir (PoseDetector ile aynı)
+    missing = np.full(end - start, np.nan)
+    mouth_ratio = np.nan_to_num(metrics.get('mouth_ratio', missing), nan=0.0)
+    hand_height = np.nan_to_num(metrics.get('hand_height', missing), nan=0.0)
+    fps = shard["fps"]
+    return [
+        {
+            "source": shard["path"],
+            "frame": start + offset,
+            "timestamp": round((start + offset) / fps, 4) if fps > 0 else None,
+            "pose": str(labels[offset]),
+            "mouth_ratio": round(float(mouth_ratio[offset]), 6),
+            "hand_height": round(float(hand_height[offset]), 6),
+            "hands_detected": int(hand_counts[offset]),
+            "face_detected": bool(face_detected[offset]),
+        }
+        for offset in range(end - start)
+    ]
+
+
+def _process_image_shard(shard):
+    detector = _get_detector(static_image_mode=True)
+
+    rows = []
+    for frame_index, path in shard["files"]:
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f"Uyarı: {path} okunamadı!", file=sys.stderr)
+            continue
+        rows.append(_make_row(path, frame_index, None, detector.detect(frame)))
+    return rows
+
+
+# ─── Shard planlama ──────────────────────────────────────────────────────────
+
+def _video_shards(path, chunk_size):
+    capture = cv2.VideoCapture(str(path))
+    if not capture.isOpened():
+        print(f"Uyarı: {path} açılamadı!", file=sys.stderr)
+        return []
+    frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    capture.release()
+
+    # Frame sayısı bilinmiyorsa (bazı container'lar) tek shard
+    if frame_count <= 0:
+        return [{"kind": "video", "path": str(path), "start": 0, "end": sys.maxsize, "fps": fps}]
+
+    return [
+        {"kind": "video", "path": str(path), "start": start,
+         "end": min(start + chunk_size, frame_count), "fps": fps}
+        for start in range(0, frame_count, chunk_size)
+    ]
+
+
+def _image_shards(paths, chunk_size):
+    files = list(enumerate(str(path) for path in paths))
+    return [
+        {"kind": "images", "files": files[start:start + chunk_size]}
+        for start in range(0, len(files), chunk_size)
+    ]
+
+
+def plan_shards(inputs, chunk_size):
+    """Girdileri (video / resim / klasör) sıralı shard listesine çevirir"""
+    shards = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            children = sorted(path.iterdir())
+            images = [child for child in children if child.suffix.lower() in IMAGE_EXTENSIONS]
+            shards.extend(_image_shards(images, chunk_size))
+            for child in children:
+                if child.suffix.lower() in VIDEO_EXTENSIONS:
+                    shards.extend(_video_shards(child, chunk_size))
+        elif path.suffix.lower() in IMAGE_EXTENSIONS:
+            shards.extend(_image_shards([path], chunk_size))
+        elif path.exists():
+            shards.extend(_video_shards(path, chunk_size))
+        else:
+            print(f"Uyarı: {path} bulunamadı!", file=sys.stderr)
+    return shards
+
+
+# ─── Çıktı ───────────────────────────────────────────────────────────────────
+
+class _JsonlWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, row):
+        self.stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class _CsvWriter:
+    def __init__(self, stream):
+        self.writer = csv.DictWriter(stream, fieldnames=FIELDNAMES)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+
+def _open_writer(output, output_format):
+    stream = sys.stdout if output == "-" else open(output, "w", newline="", encoding="utf-8")
+    writer = _CsvWriter(stream) if output_format == "csv" else _JsonlWriter(stream)
+    return stream, writer
+
+
+def _use_cache(shards, cache, options):
+    """Cache'te tam kaydı olan videoların shard'larını "cached" türüne çevirir"""
+    hits = {}
+    for shard in shards:
+        if shard["kind"] != "video":
+            continue
+        path = shard["path"]
+        if path not in hits:
+            cached = cache.load(path, options)
+            hits[path] = cached is not None and cached.complete
+        if hits[path]:
+            shard["kind"] = "cached"
+    return shards
+
+
+class _CacheCollector:
+    """Cache'te olmayan videoların shard landmark'larını toplar, video tamamlanınca kaydeder"""
+
+    def __init__(self, cache, shards, options):
+        self.cache = cache
+        self.options = options
+        self.remaining = {}
+        for shard in shards:
+            if shard["kind"] == "video":
+                self.remaining[shard["path"]] = self.remaining.get(shard["path"], 0) + 1
+        self.parts = {path: [] for path in self.remaining}
+
+    def add(self, shard, captured):
+        path = shard["path"]
+        if path not in self.remaining:
+            return
+        self.parts[path].append(captured)
+        self.remaining[path] -= 1
+        if self.remaining[path] == 0:
+            parts = [part for part in self.parts.pop(path) if part is not None]
+            del self.remaining[path]
+            if parts:
+                self.cache.store(
+                    path, self.options,
+                    LandmarkArrays(
+                        pose=np.concatenate([part["landmarks"].pose for part in parts]),
+                        hands=np.concatenate([part["landmarks"].hands for part in parts]),
+                        face=np.concatenate([part["landmarks"].face for part in parts]),
+                    ),
+                    np.concatenate([part["timestamps"] for part in parts]),
+                    np.concatenate([part["latencies"] for part in parts]),
+                )
+
+
+def run_batch(inputs, output="-", output_format="jsonl", workers=None, chunk_size=300,
+              detector_options=None, cache_root=None):
+    """Shard'ları process havuzunda işler, satırları sırayla yazar; toplam frame sayısını döner"""
+    detector_options = detector_options or {}
+    shards = plan_shards(inputs, chunk_size)
+    if not shards:
+        return 0
+    collector = None
+    if cache_root is not None:
+        cache = LandmarkCache(cache_root)
+        options = _cache_options(detector_options, chunk_size)
+        shards = _use_cache(shards, cache, options)
+        collector = _CacheCollector(cache, shards, options)
+
+    workers = min(workers or os.cpu_count() or 1, len(shards))
+    stream, writer = _open_writer(output, output_format)
+    total = 0
+    try:
+        with Pool(workers, initializer=_init_worker, initargs=(detector_options, cache_root, chunk_size)) as pool:
+            # imap sırayı korur - shard'lar ve satırlar planlandığı sırayla gelir
+            for shard, (rows, captured) in zip(shards, pool.imap(_process_shard, shards)):
+                for row in rows:
+                    writer.write(row)
+                total += len(rows)
+                stream.flush()
+                if collector is not None:
+                    collector.add(shard, captured)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return total
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Video ve resimleri GUI olmadan sınıflandır")
+    parser.add_argument("inputs", nargs="+", help="Video dosyaları, resimler veya klasörler")
+    parser.add_argument("-o", "--output", default="-", help="Çıktı dosyası (varsayılan: stdout)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default=None,
+                        help="Çıktı formatı (varsayılan: dosya uzantısından)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker process sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--chunk-size", type=int, default=300,
+                        help="Shard başına frame / resim sayısı")
+    parser.add_argument("--cache", nargs="?", const=str(DEFAULT_ROOT), default=None,
+                        help="Video landmark cache klasörü (değer verilmezse .landmark_cache/)")
+    add_detector_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    output_format = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    total = run_batch(
+        args.inputs,
+        output=args.output,
+        output_format=output_format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        detector_options=detector_options_from_args(args),
+        cache_root=args.cache,
+    )
+    print(f"[OK] {total} frame işlendi", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
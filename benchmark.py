@@ -0,0 +1,244 @@
+"""
+PoseDetector Benchmark
+Sabit bir klip veya sentetik frame'leri PoseDetector'dan geçirip aşama bazlı süre ölçer
+
+Kullanım:
+    python benchmark.py                                   # assets/ resimlerinden sentetik frame'ler
+    python benchmark.py --clip kayit.mp4 --frames 300
+    python benchmark.py --resolutions 640x480,1280x720 --save-baseline baseline.json
+    python benchmark.py --baseline baseline.json --tolerance 0.2   # gerileme varsa çıkış kodu 1
+    python benchmark.py --backend onnx --onnx-int8 --batch-size 8 --no-render
+    python benchmark.py --full-landmarks                  # tüm noktaları çevirmenin maliyeti
+
+Aşamalar: color (BGR→RGB), pose / hands / face (veya holistic için inference),
+convert (landmark → numpy; varsayılan sadece kuralların noktaları), rules,
+draw, overlay ve frame başına toplam süre (total). --no-render ile
+sadece tespit ölçülür (headless / batch maliyeti). --batch-size > 1 ile
+frame'ler PoseDetector.detect_batch ile gruplar halinde işlenir; süreler
+grubun frame başına payıdır.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from frame_source import open_source
+from pose_detector import PoseDetector, add_detector_arguments, detector_options_from_args
+from renderer import PoseRenderer
+
+
+ASSETS_DIR = Path(__file__).parent / "assets"
+PERCENTILES = (50, 95, 99)
+
+# Çok kısa aşamalarda ölçüm gürültüsü yüzünden yanlış alarm olmasın
+MIN_REGRESSION_MS = 0.5
+
+
+def parse_resolution(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def load_source_frames(clip=None, limit=120):
+    """Klipten (video, resim klasörü, .mpraw) ilk `limit` frame'i ya da assets/ resimlerini okur (BGR)"""
+    frames = []
+    if clip:
+        source = open_source(clip, realtime=False)
+        while len(frames) < limit:
+            ret, frame = source.read()
+            if not ret:
+                break
+            frames.append(frame)
+        source.release()
+        if not frames:
+            raise RuntimeError(f"{clip} okunamadı")
+        return frames
+
+    # Sentetik: sabit asset resimleri + sabit tohumlu hafif gürültü
+    rng = np.random.default_rng(0)
+    for image_path in sorted(ASSETS_DIR.glob("*.jpg")):
+        image = cv2.imread(str(image_path))
+        if image is None:
+            continue
+        for _ in range(max(limit // 4, 1)):
+            noise = rng.integers(-4, 5, size=image.shape, dtype=np.int16)
+            frames.append(np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+    if not frames:
+        raise RuntimeError(f"{ASSETS_DIR} içinde resim bulunamadı")
+    return frames
+
+
+def run_resolution(detector, renderer, source_frames, resolution, frames, warmup, batch_size=1):
+    """Tek çözünürlük için aşama başına süre listeleri (ms) döner"""
+    width, height = resolution
+    resized = [cv2.resize(frame, (width, height)) for frame in source_frames]
+
+    def process(batch):
+        """(sonuç, frame'in çizim süreleri) listesi - renderer.timings her frame'de yenilenir"""
+        results = detector.detect_batch(batch) if batch_size > 1 else [detector.detect(batch[0])]
+        render_timings = []
+        for frame, result in zip(batch, results):
+            if renderer is not None:
+                renderer.render(frame, result)
+                render_timings.append(dict(renderer.timings))
+            else:
+                render_timings.append({})
+        return list(zip(results, render_timings))
+
+    def take(start, count):
+        return [resized[index % len(resized)].copy() for index in range(start, start + count)]
+
+    for index in range(0, warmup, batch_size):
+        process(take(index, batch_size))
+
+    samples = {}
+    started = time.perf_counter()
+    for index in range(0, frames, batch_size):
+        batch = take(index, min(batch_size, frames - index))
+        batch_started = time.perf_counter()
+        results = process(batch)
+        per_frame = (time.perf_counter() - batch_started) * 1000.0 / len(batch)
+        for result, render_timings in results:
+            samples.setdefault('total', []).append(per_frame)
+            stage_timings = {**result.timings, **render_timings}
+            for stage, seconds in stage_timings.items():
+                samples.setdefault(stage, []).append(seconds * 1000.0)
+    elapsed = time.perf_counter() - started
+
+    return samples, frames / elapsed if elapsed > 0 else 0.0
+
+
+def summarize(samples, fps, frames):
+    """Süre listelerini p50/p95/p99, ortalama ve throughput özetine çevirir"""
+    stages = {}
+    for stage, values in samples.items():
+        values = np.asarray(values)
+        summary = {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+        summary["mean"] = float(values.mean())
+        # Lazy modda atlanan modeller her frame'de ölçülmez
+        summary["runs"] = int(values.size)
+        summary["throughput"] = 1000.0 / summary["mean"] if summary["mean"] > 0 else 0.0
+        stages[stage] = summary
+    return {"fps": fps, "frames": frames, "stages": stages}
+
+
+def compare_to_baseline(report, baseline, tolerance, metric="p50"):
+    """Baseline'a göre `tolerance` oranından fazla yavaşlayan aşamaları döner"""
+    regressions = []
+    for resolution, current in report["results"].items():
+        reference = baseline.get("results", {}).get(resolution)
+        if reference is None:
+            continue
+        for stage, summary in current["stages"].items():
+            reference_stage = reference["stages"].get(stage)
+            if reference_stage is None:
+                continue
+            limit = reference_stage[metric] * (1.0 + tolerance)
+            if summary[metric] > limit and summary[metric] - reference_stage[metric] > MIN_REGRESSION_MS:
+                regressions.append((resolution, stage, reference_stage[metric], summary[metric]))
+    return regressions
+
+
+def print_report(report):
+    for resolution, result in report["results"].items():
+        print(f"\n== {resolution}  ({result['fps']:.1f} FPS, {result['frames']} frame)")
+        print(f"{'aşama':<10} {'p50':>8} {'p95':>8} {'p99':>8} {'ort':>8} {'çalışma':>8} {'işlem/s':>8}")
+        for stage, summary in result["stages"].items():
+            print(
+                f"{stage:<10} {summary['p50']:>8.2f} {summary['p95']:>8.2f} {summary['p99']:>8.2f} "
+                f"{summary['mean']:>8.2f} {summary['runs']:>8d} {summary['throughput']:>8.1f}"
+            )
+
+
+def run_benchmark(resolutions, frames=200, warmup=20, clip=None, detector_options=None, render=True,
+                  batch_size=1, full_landmarks=False):
+    detector_options = detector_options or {}
+    source_frames = load_source_frames(clip)
+    report = {
+        "config": {
+            "clip": str(clip) if clip else "synthetic",
+            "frames": frames,
+            "warmup": warmup,
+            "detector": detector_options,
+            "render": render,
+            "batch_size": batch_size,
+            "full_landmarks": full_landmarks,
+            "machine": platform.platform(),
+            "python": platform.python_version(),
+        },
+        "results": {},
+    }
+    for resolution in resolutions:
+        # Her çözünürlük temiz takip durumuyla başlasın
+        detector = PoseDetector(full_landmarks=full_landmarks, **detector_options)
+        renderer = PoseRenderer() if render else None
+        try:
+            samples, fps = run_resolution(detector, renderer, source_frames, resolution, frames, warmup,
+                                          batch_size)
+        finally:
+            detector.release()
+        report["results"][f"{resolution[0]}x{resolution[1]}"] = summarize(samples, fps, frames)
+    return report
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PoseDetector aşama bazlı benchmark")
+    parser.add_argument("--clip", help="Tekrar oynatılacak video, resim klasörü veya .mpraw kaydı (varsayılan: sentetik frame'ler)")
+    parser.add_argument("--resolutions", default="640x480",
+                        help="Virgülle ayrılmış çözünürlükler, örn. 640x480,1280x720")
+    parser.add_argument("--frames", type=int, default=200, help="Ölçülen frame sayısı")
+    parser.add_argument("--warmup", type=int, default=20, help="Ölçülmeyen ısınma frame sayısı")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="detect_batch ile birlikte işlenen frame sayısı (onnx backend'inde toplu inference)")
+    add_detector_arguments(parser)
+    parser.add_argument("--no-render", dest="render", action="store_false",
+                        help="Overlay çizimini ölçüme katma")
+    parser.add_argument("--full-landmarks", action="store_true",
+                        help="Tüm landmark noktalarını çevir (landmark cache / sunucu maliyeti)")
+    parser.add_argument("--json", help="Raporu JSON olarak bu dosyaya yaz")
+    parser.add_argument("--save-baseline", help="Raporu baseline olarak kaydet")
+    parser.add_argument("--baseline", help="Karşılaştırılacak baseline JSON dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="İzin verilen yavaşlama oranı (0.2 = %%20)")
+    parser.add_argument("--metric", choices=[f"p{p}" for p in PERCENTILES], default="p50",
+                        help="Baseline karşılaştırmasında kullanılan yüzdelik")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    report = run_benchmark(
+        [parse_resolution(text) for text in args.resolutions.split(",")],
+        frames=args.frames,
+        warmup=args.warmup,
+        clip=args.clip,
+        detector_options=detector_options_from_args(args),
+        render=args.render,
+        batch_size=args.batch_size,
+        full_landmarks=args.full_landmarks,
+    )
+    print_report(report)
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            Path(path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(report, baseline, args.tolerance, args.metric)
+        if regressions:
+            print(f"\n[HATA] {len(regressions)} aşamada gerileme (tolerans %{args.tolerance * 100:.0f}):")
+            for resolution, stage, before, after in regressions:
+                print(f"  {resolution} {stage}: {before:.2f} ms → {after:.2f} ms")
+            sys.exit(1)
+        print("\n[OK] Baseline'a göre gerileme yok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Frame Display Module
+Numpy RGB buffer'ını kopyalamadan ekrana çizen Qt widget'ları
+"""
+
+import time
+
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QColor, QImage, QPainter, QPainterPath, QPen
+from PyQt5.QtWidgets import QOpenGLWidget, QWidget
+
+
+class _FrameViewMixin:
+    """Ortak çizim mantığı
+
+    `set_frame` ile verilen RGB buffer'ı QImage ile sarmalanır (kopya yok),
+    paintEvent sırasında hedef alana ölçeklenerek çizilir. QPixmap
+    oluşturulmaz; buffer bir sonraki frame gelene kadar widget'ta kalır.
+
+    `paint_histogram` atanırsa (bkz. metrics.Histogram) her çizimin süresi kaydedilir.
+    """
+
+    BACKGROUND = QColor("#1e1e1e")
+    BORDER = QColor("#444")
+    RADIUS = 10.0
+    MARGIN = 2
+
+    def _init_view(self):
+        self._frame = None
+        self._image = None
+        self.paint_histogram = None
+        self.setMinimumSize(640, 480)
+
+    def set_frame(self, rgb_frame):
+        """Yeni frame'i gösterir, artık kullanılmayan önceki buffer'ı döner"""
+        previous = self._frame
+        height, width = rgb_frame.shape[:2]
+        self._frame = rgb_frame
+        self._image = QImage(rgb_frame.data, width, height, rgb_frame.strides[0], QImage.Format_RGB888)
+        self.update()
+        return previous
+
+    def clear_frame(self):
+        previous = self._frame
+        self._frame = None
+        self._image = None
+        self.update()
+        return previous
+
+    def _paint(self):
+        started = time.perf_counter()
+        painter = QPainter(self)
+        bounds = QRectF(self.rect()).adjusted(1, 1, -1, -1)
+        clip = QPainterPath()
+        clip.addRoundedRect(bounds, self.RADIUS, self.RADIUS)
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillPath(clip, self.BACKGROUND)
+        if self._image is not None:
+            painter.setClipPath(clip)
+            target = self.rect().adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+            painter.drawImage(target, self._image)
+            painter.setClipping(False)
+        painter.setPen(QPen(self.BORDER, 2))
+        painter.drawPath(clip)
+        painter.end()
+        if self.paint_histogram is not None:
+            self.paint_histogram.observe(time.perf_counter() - started)
+
+
+class FrameView(_FrameViewMixin, QWidget):
+    """Raster (CPU) çizimli frame görünümü"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._init_view()
+
+    def paintEvent(self, event):
+        self._paint()
+
+
+class GLFrameView(_FrameViewMixin, QOpenGLWidget):
+    """OpenGL çizimli frame görünümü - ölçekleme GPU'da, frame texture olarak yüklenir"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._init_view()
+
+    def paintGL(self):
+        self._paint()
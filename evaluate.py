@@ -0,0 +1,434 @@
+"""
+Etiketli Değerlendirme
+Etiketli klip setini bir detector yapılandırma matrisinden geçirir; sınıf
+başına precision / recall, frame başına gecikme ve CPU süresi ile Pareto tablosu
+
+Kullanım:
+    python evaluate.py etiketler.json --grid model_complexity=0,1 --grid refine_landmarks=true,false
+    python evaluate.py klipler/ --matrix matris.json --workers 4 --json rapor.json
+    python evaluate.py etiketler.json --grid input_scale=0.5,1.0 --max-regression 0.01
+
+Etiket manifest'i (yollar manifest'e göre):
+    {"clips": [
+        {"path": "el_kaldirma.mp4", "label": "raising_hand"},
+        {"path": "karisik.mp4", "segments": [
+            {"start": 0, "end": 90, "label": "default"},
+            {"start": 90, "end": 200, "label": "thinking"}
+        ]},
+        {"path": "sasirma_resimleri/", "label": "shocking"}
+    ]}
+Segment sınırları frame indeksidir (end hariç); segment dışındaki frame'ler
+işlenir ama puanlanmaz. Manifest yerine klasör verilirse her alt klasör bir
+etikettir (klipler/thinking/*.mp4 ...).
+
+Matris: {"base": {...}, "matrix": {"anahtar": [değerler, ...]}}; kartezyen
+çarpımın her elemanı bir yapılandırmadır. Anahtarlar PoseDetector
+argümanlarıdır, iç içe değerler noktayla yazılır (thresholds.mouth_ratio);
+"smoothing" anahtarı PoseStabilizer'ı açar. İlk yapılandırma referanstır:
+makro F1'i referanstan `--max-regression` kadardan fazla düşenler işaretlenir
+ve çıkış kodu 1 olur.
+
+Yapılandırma × klip işleri process havuzunda paralel çalışır; klipler kendi
+içinde sırayla işlenir (takip durumu korunur). Gecikmeler aynı yük altında
+ölçülür - mutlak süreler için --workers 1.
+
+--cache ile landmark'lar landmark_cache'e yazılır / oradan okunur: sadece
+kural eşikleri (thresholds.*), kural dosyası (gestures) veya smoothing farklı
+olan yapılandırmalar tek inference'ı paylaşır, tekrar çalıştırmada kurallar
+saniyeler içinde yeniden puanlanır. Gecikme ve CPU sütunları kaydın
+oluşturulduğu çalıştırmadandır. lazy modda kurallar hangi modelin
+çalışacağını belirlediği için eşikleri veya kural dosyası farklı
+yapılandırmalar ayrı kayıt oluşturur.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+
+from frame_source import IMAGE_EXTENSIONS, open_source
+from landmark_cache import DEFAULT_ROOT, LandmarkCache, config_key, is_image_source
+from gestures import DEFAULT_ENGINE, load_gestures
+from pose_detector import PoseDetector, add_detector_arguments, detector_options_from_args
+from smoothing import PoseStabilizer
+
+
+# Varsayılan kuralların etiketleri; "gestures" anahtarlı yapılandırmalar kendi dosyasınınkini kullanır
+LABELS = DEFAULT_ENGINE.all_labels
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v", ".mpraw", ".raw"}
+
+
+# ─── Etiketler ve yapılandırmalar ────────────────────────────────────────────
+
+def load_clips(path, labels=LABELS):
+    """Manifest dosyasından ya da etiket klasörlerinden klip listesi (etiketler `labels` içinden)
+
+    Her klip: {"path": str, "segments": [(başlangıç, bitiş, etiket), ...]}
+    """
+    path = Path(path)
+    if path.is_dir():
+        clips = []
+        for label_dir in sorted(child for child in path.iterdir() if child.is_dir()):
+            _check_label(label_dir.name, label_dir, labels)
+            children = sorted(label_dir.iterdir())
+            if any(child.suffix.lower() in IMAGE_EXTENSIONS for child in children):
+                clips.append({"path": str(label_dir), "segments": [(0, sys.maxsize, label_dir.name)]})
+            clips.extend(
+                {"path": str(child), "segments": [(0, sys.maxsize, label_dir.name)]}
+                for child in children if child.suffix.lower() in VIDEO_EXTENSIONS
+            )
+        return clips
+
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    clips = []
+    for entry in manifest["clips"]:
+        clip_path = (path.parent / entry["path"]).resolve()
+        if "segments" in entry:
+            segments = [(int(s["start"]), int(s["end"]), s["label"]) for s in entry["segments"]]
+        else:
+            segments = [(0, sys.maxsize, entry["label"])]
+        for _, _, label in segments:
+            _check_label(label, clip_path, labels)
+        clips.append({"path": str(clip_path), "segments": segments})
+    return clips
+
+
+def _check_label(label, where, labels):
+    if label not in labels:
+        raise ValueError(f"{where}: bilinmeyen etiket {label!r} (seçenekler: {tuple(labels)})")
+
+
+def frame_labels(segments, count):
+    """Frame başına beklenen etiket (puanlanmayan frame'ler None)"""
+    labels = np.full(count, None, dtype=object)
+    for start, end, label in segments:
+        labels[start:min(end, count)] = label
+    return labels
+
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def parse_grid(items):
+    """["anahtar=d1,d2", ...] → {"anahtar": [d1, d2]} (değerler JSON olarak okunur)"""
+    matrix = {}
+    for item in items:
+        key, _, values = item.partition("=")
+        if not values:
+            raise ValueError(f"Geçersiz --grid: {item!r} (biçim: anahtar=değer1,değer2)")
+        matrix[key.strip()] = [_parse_value(value.strip()) for value in values.split(",")]
+    return matrix
+
+
+def expand_matrix(base, matrix):
+    """Kartezyen çarpım - [(ad, seçenekler), ...]; ilk eleman her değerin ilk seçeneği"""
+    keys = list(matrix)
+    configs = []
+    for values in itertools.product(*(matrix[key] for key in keys)):
+        options = json.loads(json.dumps(base))
+        for key, value in zip(keys, values):
+            _set_nested(options, key, value)
+        name = ", ".join(f"{key}={value}" for key, value in zip(keys, values)) or "base"
+        configs.append((name, options))
+    return configs
+
+
+def _set_nested(options, key, value):
+    *parents, leaf = key.split(".")
+    for parent in parents:
+        if not isinstance(options.get(parent), dict):
+            options[parent] = {}
+        options = options[parent]
+    options[leaf] = value
+
+
+# ─── Worker tarafı ───────────────────────────────────────────────────────────
+
+def _detector_options(options, clip_path):
+    """Yapılandırmadan PoseDetector argümanları (resim klasörleri bağımsız resimlerdir - takip kapalı)"""
+    options = {name: value for name, value in options.items() if name != "smoothing"}
+    options.setdefault("static_image_mode", is_image_source(clip_path))
+    return options
+
+
+def _evaluate_job(job):
+    """Tek yapılandırma × tek klip - tahminler, frame süreleri ve toplam CPU süresi"""
+    config_index, clip_index, options, clip_path, max_frames = job
+
+    source = open_source(clip_path, realtime=False)
+    if not source.isOpened():
+        raise RuntimeError(f"{clip_path} açılamadı")
+    detector = PoseDetector(**_detector_options(options, clip_path))
+    stabilizer = PoseStabilizer.for_detector(detector) if options.get("smoothing") else None
+
+    predictions = []
+    latencies = []
+    try:
+        detector.warm_up()
+        cpu_started = time.process_time()
+        while max_frames is None or len(predictions) < max_frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            started = time.perf_counter()
+            result = detector.detect(frame)
+            if stabilizer is not None:
+                stabilizer.apply(result, source.timestamp)
+            latencies.append(time.perf_counter() - started)
+            predictions.append(result.pose_name)
+        cpu_time = time.process_time() - cpu_started
+    finally:
+        source.release()
+        detector.release()
+
+    return config_index, clip_index, predictions, latencies, cpu_time
+
+
+def _cache_job(job):
+    """Klibin landmark'larını yapılandırmanın model ayarlarıyla cache'e yazar"""
+    cache_root, detector_options, clip_path, max_frames = job
+    LandmarkCache(cache_root).build(clip_path, detector_options, max_frames)
+    return clip_path
+
+
+def _rescore(cached, options):
+    """Cache kaydından tahminler - kurallar tüm frame'lerde tek geçişte, smoothing sırayla"""
+    labels, metrics = cached.score(options.get("thresholds"), options.get("gestures"))
+    if options.get("smoothing"):
+        engine = load_gestures(options.get("gestures"))
+        thresholds = engine.resolve_thresholds(options.get("thresholds"))
+        stabilizer = PoseStabilizer(hysteresis=engine.hysteresis(thresholds), default_label=engine.default_label)
+        labels = [
+            stabilizer.update({name: float(values[index]) for name, values in metrics.items()},
+                              float(cached.timestamps[index]))
+            for index in range(len(cached))
+        ]
+    share = len(cached) / max(cached.meta["frames"], 1)
+    return [str(label) for label in labels], list(cached.latencies), cached.meta["cpu_time"] * share
+
+
+# ─── Puanlama ────────────────────────────────────────────────────────────────
+
+def score(expected, predicted, labels=LABELS):
+    """Sınıf başına precision / recall / F1, doğruluk ve makro F1 (puanlanan frame'ler)"""
+    mask = np.array([label is not None for label in expected], dtype=bool)
+    expected = np.asarray(expected, dtype=object)[mask]
+    predicted = np.asarray(predicted, dtype=object)[mask]
+
+    per_class = {}
+    f1_scores = []
+    for label in labels:
+        true_positive = int(np.sum((predicted == label) & (expected == label)))
+        predicted_count = int(np.sum(predicted == label))
+        expected_count = int(np.sum(expected == label))
+        precision = true_positive / predicted_count if predicted_count else None
+        recall = true_positive / expected_count if expected_count else None
+        f1 = 2 * precision * recall / (precision + recall) if precision and recall else 0.0
+        per_class[label] = {"precision": precision, "recall": recall, "f1": f1, "support": expected_count}
+        # Sette hiç örneği olmayan sınıf makro ortalamaya girmez
+        if expected_count:
+            f1_scores.append(f1)
+
+    return {
+        "frames": int(mask.sum()),
+        "accuracy": float(np.mean(predicted == expected)) if mask.any() else None,
+        "macro_f1": float(np.mean(f1_scores)) if f1_scores else None,
+        "classes": per_class,
+    }
+
+
+def pareto_front(rows):
+    """Makro F1'de daha iyi ve gecikmede daha hızlı başka satırın olmadığı satır indeksleri
+
+    Makro F1'i olmayan satırlar (etiketli frame yok) karşılaştırılamaz ve cepheye girmez.
+    """
+    scored = [row for row in rows if row["macro_f1"] is not None]
+    front = []
+    for index, row in enumerate(rows):
+        if row["macro_f1"] is None:
+            continue
+        dominated = any(
+            other["macro_f1"] >= row["macro_f1"] and other["latency_ms"] <= row["latency_ms"]
+            and (other["macro_f1"] > row["macro_f1"] or other["latency_ms"] < row["latency_ms"])
+            for other in scored
+        )
+        if not dominated:
+            front.append(index)
+    return front
+
+
+def run_evaluation(clips, configs, workers=None, max_frames=None, max_regression=0.01, cache_root=None):
+    """Tüm işleri havuzda çalıştırır, yapılandırma başına özet satırları döner"""
+    if cache_root is not None:
+        collected = _collect_cached(clips, configs, workers, max_frames, cache_root)
+    else:
+        collected = _collect(clips, configs, workers, max_frames)
+
+    rows = []
+    for config_index, (name, options) in enumerate(configs):
+        expected, predicted, latencies, cpu_time = [], [], [], 0.0
+        for clip_index, clip in enumerate(clips):
+            clip_predictions, clip_latencies, clip_cpu = collected[config_index, clip_index]
+            expected.extend(frame_labels(clip["segments"], len(clip_predictions)))
+            predicted.extend(clip_predictions)
+            latencies.extend(clip_latencies)
+            cpu_time += clip_cpu
+        latencies = np.asarray(latencies) * 1000.0
+        rows.append({
+            "name": name,
+            "options": options,
+            **score(expected, predicted, load_gestures(options.get("gestures")).all_labels),
+            "latency_ms": float(latencies.mean()) if latencies.size else 0.0,
+            "latency_p95_ms": float(np.percentile(latencies, 95)) if latencies.size else 0.0,
+            "cpu_ms": cpu_time * 1000.0 / max(latencies.size, 1),
+        })
+
+    for index in pareto_front(rows):
+        rows[index]["pareto"] = True
+    reference = rows[0]["macro_f1"] or 0.0
+    for row in rows:
+        row.setdefault("pareto", False)
+        row["delta_f1"] = (row["macro_f1"] or 0.0) - reference
+        row["regression"] = row["delta_f1"] < -max_regression
+    return rows
+
+
+def _collect(clips, configs, workers, max_frames):
+    jobs = [
+        (config_index, clip_index, options, clip["path"], max_frames)
+        for config_index, (_, options) in enumerate(configs)
+        for clip_index, clip in enumerate(clips)
+    ]
+    collected = {}
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    with Pool(workers) as pool:
+        for done, (config_index, clip_index, predictions, latencies, cpu_time) in enumerate(
+                pool.imap_unordered(_evaluate_job, jobs), 1):
+            collected[config_index, clip_index] = (predictions, latencies, cpu_time)
+            print(f"[{done}/{len(jobs)}] {configs[config_index][0]} · {Path(clips[clip_index]['path']).name}",
+                  file=sys.stderr)
+    return collected
+
+
+def _collect_cached(clips, configs, workers, max_frames, cache_root):
+    """Eksik (model ayarı × klip) kayıtlarını havuzda oluşturur, tüm yapılandırmaları cache'ten puanlar"""
+    cache = LandmarkCache(cache_root)
+    builds = {}
+    for _, options in configs:
+        for clip in clips:
+            detector_options = _detector_options(options, clip["path"])
+            key = (config_key(detector_options), clip["path"])
+            if key not in builds and cache.load(clip["path"], detector_options, min_frames=max_frames) is None:
+                builds[key] = (cache_root, detector_options, clip["path"], max_frames)
+
+    print(f"Cache: {len(builds)} kayıt oluşturulacak", file=sys.stderr)
+    if builds:
+        jobs = list(builds.values())
+        with Pool(min(workers or os.cpu_count() or 1, len(jobs))) as pool:
+            for done, clip_path in enumerate(pool.imap_unordered(_cache_job, jobs), 1):
+                print(f"[{done}/{len(jobs)}] cache · {Path(clip_path).name}", file=sys.stderr)
+
+    collected = {}
+    for config_index, (_, options) in enumerate(configs):
+        for clip_index, clip in enumerate(clips):
+            cached = cache.load(clip["path"], _detector_options(options, clip["path"]), min_frames=max_frames)
+            collected[config_index, clip_index] = _rescore(cached.head(max_frames), options)
+    return collected
+
+
+# ─── Çıktı ───────────────────────────────────────────────────────────────────
+
+def _percent(value):
+    return "    -" if value is None else f"{value * 100:5.1f}"
+
+
+def print_report(rows):
+    labels = list(dict.fromkeys(label for row in rows for label in row["classes"]))
+    width = max(len(row["name"]) for row in rows)
+    print(f"\n{'#':>2}  {'yapılandırma':<{width}}  {'doğr.':>5} {'m-F1':>5} {'ΔF1':>6} "
+          f"{'ms/frame':>8} {'p95':>7} {'CPU ms':>7}  pareto")
+    for index, row in enumerate(rows):
+        flag = "★" if row["pareto"] else ""
+        if row["regression"]:
+            flag += " ✗ gerileme"
+        print(f"{index:>2}  {row['name']:<{width}}  {_percent(row['accuracy'])} {_percent(row['macro_f1'])} "
+              f"{row['delta_f1'] * 100:+6.1f} {row['latency_ms']:>8.2f} {row['latency_p95_ms']:>7.2f} "
+              f"{row['cpu_ms']:>7.2f}  {flag}")
+
+    print(f"\n{'#':>2}  " + "  ".join(f"{label:>13}" for label in labels) + "   (precision / recall %)")
+    for index, row in enumerate(rows):
+        # Farklı kural dosyalı yapılandırmalarda olmayan sınıflar boş kalır
+        missing = {"precision": None, "recall": None}
+        cells = [
+            f"{_percent(row['classes'].get(label, missing)['precision'])} "
+            f"/{_percent(row['classes'].get(label, missing)['recall'])}"
+            for label in labels
+        ]
+        print(f"{index:>2}  " + "  ".join(f"{cell:>13}" for cell in cells))
+    supports = {label: row["classes"][label]["support"] for row in rows for label in row["classes"]}
+    print(f"\nDestek (frame): " + ", ".join(f"{label}={supports[label]}" for label in labels))
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Detector yapılandırmalarını etiketli kliplerle karşılaştır")
+    parser.add_argument("labels", help="Etiket manifest'i (JSON) veya etiket adlı alt klasörleri olan klasör")
+    parser.add_argument("--matrix", help="Yapılandırma matrisi JSON dosyası ({\"base\": ..., \"matrix\": ...})")
+    parser.add_argument("--grid", action="append", default=[],
+                        help="Matris ekseni, örn. model_complexity=0,1 veya thresholds.mouth_ratio=0.12,0.15")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker process sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--max-frames", type=int, default=None, help="Klip başına en fazla frame")
+    parser.add_argument("--max-regression", type=float, default=0.01,
+                        help="Referansa göre izin verilen makro F1 düşüşü (0.01 = 1 puan)")
+    parser.add_argument("--json", help="Raporu JSON olarak bu dosyaya yaz")
+    parser.add_argument("--cache", nargs="?", const=str(DEFAULT_ROOT), default=None,
+                        help="Landmark cache klasörü (değer verilmezse .landmark_cache/)")
+    add_detector_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    base = detector_options_from_args(args)
+    matrix = {}
+    if args.matrix:
+        spec = json.loads(Path(args.matrix).read_text(encoding="utf-8"))
+        base.update(spec.get("base", {}))
+        matrix.update(spec.get("matrix", {}))
+    matrix.update(parse_grid(args.grid))
+
+    configs = expand_matrix(base, matrix)
+    labels = dict.fromkeys(
+        label for _, options in configs for label in load_gestures(options.get("gestures")).all_labels
+    )
+    clips = load_clips(args.labels, labels)
+    if not clips:
+        print("[HATA] Etiketli klip bulunamadı", file=sys.stderr)
+        sys.exit(1)
+    print(f"{len(configs)} yapılandırma × {len(clips)} klip", file=sys.stderr)
+
+    rows = run_evaluation(clips, configs, args.workers, args.max_frames, args.max_regression, args.cache)
+    print_report(rows)
+    if args.json:
+        Path(args.json).write_text(json.dumps({"clips": clips, "results": rows}, indent=2, ensure_ascii=False),
+                                   encoding="utf-8")
+
+    regressions = [f"#{index}" for index, row in enumerate(rows) if row["regression"]]
+    if regressions:
+        print(f"\n[HATA] {len(regressions)} yapılandırmada sınıflandırma gerilemesi: {' '.join(regressions)}")
+        sys.exit(1)
+    print("\n[OK] Referansa göre sınıflandırma gerilemesi yok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Frame Source Module
+Kamera, video dosyası, resim dizisi ve ham frame kaydı için ortak kaynak
+arayüzü; canlı frame'leri tekrar oynatılabilir ham formata kaydeden recorder
+
+Tüm kaynaklar cv2.VideoCapture ile aynı `read(image=None)` / `isOpened()` /
+`release()` arayüzünü sunar, FramePipeline ve benchmark hangisi olduğunu bilmez.
+
+Ham kayıt formatı (.mpraw):
+    64 baytlık başlık: magic, genişlik, yükseklik, kanal sayısı
+    ardından sabit boyutlu kayıtlar: float64 zaman damgası (saniye) + uint8 frame
+Kayıt sayısı dosya boyutundan hesaplanır; yarıda kesilen kayıt da okunabilir.
+Okuma np.memmap ile yapılır, dosya belleğe yüklenmez.
+"""
+
+import platform
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+RAW_MAGIC = b"MPRAW001"
+RAW_EXTENSIONS = {".mpraw", ".raw"}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('width', '<u4'),
+    ('height', '<u4'),
+    ('channels', '<u4'),
+    ('reserved', 'u1', 44),
+])
+
+
+def record_dtype(width, height, channels=3):
+    """Ham kayıttaki tek frame'in yapısı"""
+    return np.dtype([('timestamp', '<f8'), ('frame', 'u1', (height, width, channels))])
+
+
+def _copy_into(frame, image):
+    """Frame'i verilen buffer'a kopyalar (boyut uyuşmazsa yeni dizi döner)"""
+    if image is not None and image.shape == frame.shape:
+        np.copyto(image, frame)
+        return image
+    return np.array(frame)
+
+
+class FrameSource:
+    """Kaynakların ortak temeli
+
+    realtime=True ise kayıtlı kaynaklar orijinal zaman damgalarına göre
+    beklenerek, False ise mümkün olan en yüksek hızda okunur. loop=True ise
+    kaynak bitince başa sarılır.
+    """
+
+    is_live = False
+
+    def __init__(self, realtime=True, loop=False):
+        self.realtime = realtime
+        self.loop = loop
+        self.timestamp = None
+        self._clock_start = None
+        self._first_timestamp = None
+
+    def read(self, image=None):
+        ret, frame, timestamp = self._read_frame(image)
+        if not ret and self.loop and self._rewind():
+            self._clock_start = None
+            ret, frame, timestamp = self._read_frame(image)
+        if not ret:
+            return False, None
+        self.timestamp = timestamp
+        if self.realtime:
+            self._pace(timestamp)
+        return True, frame
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+    def _read_frame(self, image):
+        raise NotImplementedError
+
+    def _rewind(self):
+        return False
+
+    def _pace(self, timestamp):
+        """Kaynak zaman damgası ile duvar saatini hizalar"""
+        now = time.perf_counter()
+        if self._clock_start is None:
+            self._clock_start = now
+            self._first_timestamp = timestamp
+            return
+        wait = (timestamp - self._first_timestamp) - (now - self._clock_start)
+        if wait > 0:
+            time.sleep(wait)
+
+
+class CameraSource(FrameSource):
+    """Canlı kamera (CAP_DSHOW sadece Windows'ta daha kararlı, diğer platformlarda varsayılan)"""
+
+    is_live = True
+
+    def __init__(self, index=0, width=640, height=480):
+        super().__init__(realtime=False)
+        backend = cv2.CAP_DSHOW if platform.system() == "Windows" else cv2.CAP_ANY
+        self.capture = cv2.VideoCapture(index, backend)
+        self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    def _read_frame(self, image):
+        ret, frame = self.capture.read(image)
+        return ret, frame, time.perf_counter()
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def release(self):
+        self.capture.release()
+
+
+class VideoFileSource(FrameSource):
+    """Video dosyası - zaman damgası dosyadaki frame konumundan"""
+
+    def __init__(self, path, realtime=True, loop=False):
+        super().__init__(realtime, loop)
+        self.path = str(path)
+        self.capture = cv2.VideoCapture(self.path)
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self._index = 0
+
+    def _read_frame(self, image):
+        ret, frame = self.capture.read(image)
+        timestamp = self._index / self.fps
+        self._index += 1
+        return ret, frame, timestamp
+
+    def _rewind(self):
+        self._index = 0
+        return self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def release(self):
+        self.capture.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """Klasördeki resimler (ada göre sıralı), sabit fps ile"""
+
+    def __init__(self, path, fps=30.0, realtime=True, loop=False):
+        super().__init__(realtime, loop)
+        path = Path(path)
+        self.paths = sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS) \
+            if path.is_dir() else [path]
+        self.fps = fps
+        self._index = 0
+
+    def _read_frame(self, image):
+        while self._index < len(self.paths):
+            frame = cv2.imread(str(self.paths[self._index]))
+            timestamp = self._index / self.fps
+            self._index += 1
+            if frame is not None:
+                return True, _copy_into(frame, image), timestamp
+        return False, None, None
+
+    def _rewind(self):
+        self._index = 0
+        return bool(self.paths)
+
+    def isOpened(self):
+        return bool(self.paths)
+
+
+class RawDumpSource(FrameSource):
+    """FrameRecorder kaydını memmap ile okur - kaydedilen zamanlamayla birebir tekrar"""
+
+    def __init__(self, path, realtime=True, loop=False):
+        super().__init__(realtime, loop)
+        self.path = Path(path)
+        header = np.fromfile(self.path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header['magic'][0] != RAW_MAGIC:
+            raise ValueError(f"Geçersiz ham kayıt dosyası: {self.path}")
+        width, height, channels = (int(header[name][0]) for name in ('width', 'height', 'channels'))
+        dtype = record_dtype(width, height, channels)
+        count = (self.path.stat().st_size - HEADER_DTYPE.itemsize) // dtype.itemsize
+        self.records = np.memmap(self.path, dtype=dtype, mode='r', offset=HEADER_DTYPE.itemsize,
+                                 shape=(count,)) if count else np.empty(0, dtype=dtype)
+        self._index = 0
+
+    def __len__(self):
+        return 0 if self.records is None else len(self.records)
+
+    def _read_frame(self, image):
+        if self.records is None or self._index >= len(self.records):
+            return False, None, None
+        record = self.records[self._index]
+        self._index += 1
+        # memmap salt okunur; frame çağıranın buffer'ına kopyalanır
+        return True, _copy_into(record['frame'], image), float(record['timestamp'])
+
+    def _rewind(self):
+        self._index = 0
+        return len(self) > 0
+
+    def isOpened(self):
+        return self.records is not None
+
+    def release(self):
+        """Eşlemeyi ve dosyayı kapatır (Windows'ta kayıt ancak bundan sonra silinebilir)"""
+        records, self.records = self.records, None
+        mapping = getattr(records, '_mmap', None)
+        del records
+        if mapping is not None:
+            try:
+                mapping.close()
+            except BufferError:
+                pass  # Dışarıda hâlâ bir görünüm var - son başvuruyla birlikte kapanır
+
+
+class FrameRecorder:
+    """Frame'leri ve zaman damgalarını ham formatta dosyaya ekler
+
+    Boyut ilk frame'den alınır; farklı boyuttaki sonraki frame'lerde ValueError.
+    Zaman damgaları ilk frame'e göredir (saniye).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.count = 0
+        self._file = None
+        self._shape = None
+        self._first_timestamp = None
+        self._timestamp = np.zeros(1, dtype='<f8')
+
+    def write(self, frame, timestamp=None):
+        now = time.perf_counter() if timestamp is None else timestamp
+        if self._file is None:
+            self._open(frame.shape)
+            self._first_timestamp = now
+        elif frame.shape != self._shape:
+            raise ValueError(f"Frame boyutu değişti: {self._shape} → {frame.shape}")
+        self._timestamp[0] = now - self._first_timestamp
+        self._file.write(self._timestamp.tobytes())
+        self._file.write(np.ascontiguousarray(frame).data)
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self, shape):
+        height, width = shape[:2]
+        channels = shape[2] if len(shape) > 2 else 1
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = RAW_MAGIC
+        header['width'] = width
+        header['height'] = height
+        header['channels'] = channels
+        self._shape = shape
+        self._file = open(self.path, "wb")
+        self._file.write(header.tobytes())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingSource:
+    """Bir kaynaktan okunan her frame'i FrameRecorder'a da yazan sarmalayıcı"""
+
+    def __init__(self, source, recorder):
+        self.source = source
+        self.recorder = recorder
+        self.is_live = source.is_live
+
+    def read(self, image=None):
+        ret, frame = self.source.read(image)
+        if ret:
+            self.recorder.write(frame, self.source.timestamp)
+        return ret, frame
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def release(self):
+        self.source.release()
+        self.recorder.close()
+
+
+def open_source(spec, realtime=True, loop=False):
+    """Kaynak tanımından uygun FrameSource
+
+    "0", "1", ... kamera indeksi; klasör veya resim dosyası resim dizisi;
+    .mpraw / .raw ham kayıt; diğer her şey video dosyası.
+    """
+    spec = str(spec)
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    path = Path(spec)
+    if path.is_dir() or path.suffix.lower() in IMAGE_EXTENSIONS:
+        return ImageSequenceSource(path, realtime=realtime, loop=loop)
+    if path.suffix.lower() in RAW_EXTENSIONS:
+        return RawDumpSource(path, realtime=realtime, loop=loop)
+    return VideoFileSource(path, realtime=realtime, loop=loop)
@@ -0,0 +1,480 @@
+"""
+Gesture Rules Module
+Poz kurallarını bildirimsel bir yapılandırmadan (gestures.json) okur ve
+yükleme anında vektörel numpy fonksiyonlarına derler
+
+Yapılandırma üç bölümden oluşur:
+    thresholds: isimli eşikler (PoseDetector `thresholds` ile değiştirilebilir)
+    metrics:    landmark noktalarından metrikler - distance / offset / angle / ratio
+    gestures:   öncelikli pozlar; her poz metrik koşullarının VE'sidir
+
+Noktalar "grup:indeks,indeks" biçiminde seçilir (ör. "hands:4,8,12",
+"face:13,14"); gruplar pose, hands ve face'tir. Her metrik frame başına bir
+kez hesaplanır ve onu kullanan tüm pozlarca paylaşılır; aynı koşul birden çok
+pozda geçiyorsa da bir kez değerlendirilir. Çok frame'de etiket tek np.select
+ile seçilir, yani poz sayısı artsa da kural maliyeti sabit sayıda dizi
+işlemidir; tek frame'de pozlar öncelik sırasıyla düz bir döngüde denenir ve
+ilk tutan pozda durulur. Landmark dizileri gibi tüm metrikler baştaki ek
+boyutları (ör. frame sayısı) destekler.
+"""
+
+import argparse
+import hashlib
+import json
+import operator
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from landmarks import FACE_POINTS, HAND_POINTS, POSE_POINTS
+
+
+DEFAULT_GESTURES_PATH = Path(__file__).parent / "gestures.json"
+
+GROUPS = {"pose": POSE_POINTS, "hands": HAND_POINTS, "face": FACE_POINTS}
+AXES = {"x": 0, "y": 1, "z": 2}
+OPERATORS = {">": np.greater, "<": np.less}
+# Tek frame (skaler metrik) için; NaN ile karşılaştırma numpy'deki gibi False
+SCALAR_OPERATORS = {">": operator.gt, "<": operator.lt}
+REDUCERS = {
+    "min": lambda values: _nan_reduce(values, np.fmin),
+    "max": lambda values: _nan_reduce(values, np.fmax),
+    "mean": lambda values: _nan_mean(values, axis=-1),
+}
+
+
+def _nan_reduce(values, function):
+    """Tamamı NaN olan satırlarda NaN dönen, uyarısız nanmin / nanmax
+
+    fmin / fmax NaN'ları atlar. Tek frame'de sonuç float64'tür (np.where
+    tabanlı eski sürümdeki gibi), çok frame'de dizinin türü korunur.
+    """
+    reduced = function.reduce(values, axis=-1)
+    return np.float64(reduced) if np.ndim(reduced) == 0 else reduced
+
+
+def _nan_mean(values, axis):
+    """Tamamı NaN olan satırlarda NaN dönen, uyarısız nanmean"""
+    valid = ~np.isnan(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, values, 0.0).sum(axis=axis) / valid.sum(axis=axis)
+
+
+# ─── Derleme ─────────────────────────────────────────────────────────────────
+
+def _compile_points(selector, where, axes):
+    """"grup:indeksler" → landmarks'tan (..., örnek, nokta, eksen) seçen fonksiyon
+
+    pose ve face tek örnekli, hands el başına bir örneklidir. Nokta ve eksen
+    indeksleri derlemede hazırlanır; seçim tek indeksleme işlemidir.
+    """
+    group, _, indices = str(selector).partition(":")
+    if group not in GROUPS:
+        raise ValueError(f"{where}: bilinmeyen nokta grubu {group!r} (seçenekler: {tuple(GROUPS)})")
+    try:
+        points = [int(index) for index in indices.split(",")]
+    except ValueError:
+        raise ValueError(f"{where}: geçersiz nokta seçimi {selector!r} (ör. \"hands:4,8,12\")") from None
+    if not all(0 <= point < GROUPS[group] for point in points):
+        raise ValueError(f"{where}: {group} için nokta indeksi 0-{GROUPS[group] - 1} aralığında olmalı")
+    points = np.array(points)[:, np.newaxis]
+    axes = np.array(axes)
+
+    if group == "hands":
+        return lambda landmarks: landmarks.hands[..., points, axes]
+    return lambda landmarks: getattr(landmarks, group)[..., np.newaxis, points, axes]
+
+
+def _compile_axes(axes, where):
+    try:
+        return [AXES[axis] for axis in axes]
+    except KeyError:
+        raise ValueError(f"{where}: geçersiz eksen {axes!r} (x, y, z harfleri)") from None
+
+
+def _compile_reduce(spec, where, default):
+    name = spec.get("reduce", default)
+    if name not in REDUCERS:
+        raise ValueError(f"{where}: geçersiz reduce {name!r} (seçenekler: {tuple(REDUCERS)})")
+    return REDUCERS[name]
+
+
+def _pairwise(spec, where, default_axes):
+    """a ve b noktalarının tüm çiftleri için eksen farkları (..., çift, eksen)"""
+    axes = _compile_axes(spec.get("axes", default_axes), where)
+    select_a = _compile_points(spec.get("a"), where, axes)
+    select_b = _compile_points(spec.get("b"), where, axes)
+    width = len(axes)
+
+    def deltas(landmarks):
+        # (..., örnek, nokta, eksen) → (..., örnek × nokta, eksen)
+        a = select_a(landmarks)
+        b = select_b(landmarks)
+        a = a.reshape(a.shape[:-3] + (-1, width))
+        b = b.reshape(b.shape[:-3] + (-1, width))
+        pairs = a[..., :, np.newaxis, :] - b[..., np.newaxis, :, :]
+        return pairs.reshape(pairs.shape[:-3] + (-1, width))
+    return deltas
+
+
+def _compile_distance(spec, where, metric):
+    """a ve b noktaları arasındaki uzaklıklar, `reduce` ile (varsayılan: en kısa)"""
+    deltas = _pairwise(spec, where, "xy")
+    reduce = _compile_reduce(spec, where, "min")
+
+    def distance(landmarks, values):
+        pairs = deltas(landmarks)
+        if pairs.shape[-1] == 1:
+            return reduce(np.abs(pairs[..., 0]))
+        return reduce(np.sqrt((pairs ** 2).sum(axis=-1)))
+    return distance
+
+
+def _compile_offset(spec, where, metric):
+    """İşaretli a - b farkı tek eksende, `reduce` ile (varsayılan: en büyük)"""
+    axis = spec.get("axis", "y")
+    if axis not in AXES:
+        raise ValueError(f"{where}: geçersiz eksen {axis!r} (seçenekler: {tuple(AXES)})")
+    deltas = _pairwise({**spec, "axes": axis}, where, axis)
+    reduce = _compile_reduce(spec, where, "max")
+    return lambda landmarks, values: reduce(deltas(landmarks)[..., 0])
+
+
+def _compile_angle(spec, where, metric):
+    """a - vertex - b noktalarının (grup ortalamaları) açısı, derece
+
+    Örnekler (eller) eşleşerek hesaplanır - tek örnekli gruplar her elle
+    eşleşir - ve `reduce` (varsayılan: en büyük) ile birleştirilir.
+    """
+    axes = _compile_axes(spec.get("axes", "xy"), where)
+    selectors = [_compile_points(spec.get(key), where, axes) for key in ("a", "vertex", "b")]
+    reduce = _compile_reduce(spec, where, "max")
+
+    def angle(landmarks, values):
+        a, vertex, b = (_nan_mean(select(landmarks), axis=-2) for select in selectors)
+        u, w = a - vertex, b - vertex
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cosine = (u * w).sum(axis=-1) / np.sqrt((u ** 2).sum(axis=-1) * (w ** 2).sum(axis=-1))
+        return reduce(np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0))))
+    return angle
+
+
+def _compile_ratio(spec, where, metric):
+    """num / den - payda 0 ise 0, payda ölçülemiyorsa NaN"""
+    num = metric(spec.get("num"), f"{where}.num")
+    den = metric(spec.get("den"), f"{where}.den")
+
+    def ratio(landmarks, values):
+        numerator, denominator = num(landmarks, values), den(landmarks, values)
+        # Sadece payda > 0 olan yerlerde bölünür (errstate gerekmez)
+        result = np.zeros(np.broadcast(numerator, denominator).shape, np.result_type(numerator, denominator))
+        np.divide(numerator, denominator, out=result, where=denominator > 0)
+        return np.where(np.isnan(denominator), np.nan, result)
+    return ratio
+
+
+def _metric_groups(spec, specs):
+    """(okunan gruplar, boşsa metriği NaN yapan gruplar) - lazy mod kararları için
+
+    distance / offset / angle gruplarından biri boşsa NaN'dır. ratio sadece
+    payda NaN'sa NaN'dır (pay NaN, payda 0 → 0).
+    """
+    if isinstance(spec, str):
+        return _metric_groups(specs[spec], specs)
+    if spec["type"] == "ratio":
+        num_groups, _ = _metric_groups(spec["num"], specs)
+        den_groups, den_strict = _metric_groups(spec["den"], specs)
+        return num_groups | den_groups, den_strict
+    keys = ("a", "vertex", "b") if spec["type"] == "angle" else ("a", "b")
+    groups = frozenset(str(spec[key]).partition(":")[0] for key in keys)
+    return groups, groups
+
+
+def _metric_points(spec, specs, points):
+    """Metriğin okuduğu landmark indekslerini `points` (grup → küme) içine ekler"""
+    if isinstance(spec, str):
+        _metric_points(specs[spec], specs, points)
+    elif spec["type"] == "ratio":
+        _metric_points(spec["num"], specs, points)
+        _metric_points(spec["den"], specs, points)
+    else:
+        for key in ("a", "vertex", "b"):
+            if key in spec:
+                group, _, indices = str(spec[key]).partition(":")
+                points.setdefault(group, set()).update(int(index) for index in indices.split(","))
+
+
+METRIC_TYPES = {
+    "distance": _compile_distance,
+    "offset": _compile_offset,
+    "angle": _compile_angle,
+    "ratio": _compile_ratio,
+}
+
+
+class GestureEngine:
+    """Derlenmiş poz kuralları
+
+    labels:     pozlar, öncelik sırasıyla (yüksek öncelik önce)
+    thresholds: varsayılan isimli eşikler
+    points:     metriklerin okuduğu landmark indeksleri, grup başına
+                (LandmarkArrays.from_results ile sadece bunlar çevrilir)
+    """
+
+    def __init__(self, config, source=None):
+        self.source = source
+        # Kural içeriğinin kısa hash'i (landmark cache anahtarı için)
+        self.digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        where = str(source or "gestures")
+        self.default_label = config.get("default", "default")
+        self.thresholds = {name: float(value) for name, value in config.get("thresholds", {}).items()}
+        self.assets = {}
+
+        specs = config.get("metrics", {})
+        self._metrics = {}
+        compiling = set()
+
+        def metric(spec, at):
+            """Metrik tanımı veya isimli metriğe başvuru → f(landmarks, değerler)"""
+            if isinstance(spec, str):
+                if spec not in specs:
+                    raise ValueError(f"{at}: bilinmeyen metrik {spec!r}")
+                if spec not in self._metrics:
+                    if spec in compiling:
+                        raise ValueError(f"{at}: döngüsel metrik başvurusu {spec!r}")
+                    compiling.add(spec)
+                    self._metrics[spec] = metric(specs[spec], f"{where}: metrics.{spec}")
+                compute, name = self._metrics[spec], spec
+
+                def reference(landmarks, values):
+                    # Aynı geçişte başka metrikte kullanılmışsa tekrar hesaplanmaz
+                    if name not in values:
+                        values[name] = compute(landmarks, values)
+                    return values[name]
+                return reference
+            if not isinstance(spec, dict) or spec.get("type") not in METRIC_TYPES:
+                raise ValueError(f"{at}: metrik türü {tuple(METRIC_TYPES)} içinden olmalı")
+            return METRIC_TYPES[spec["type"]](spec, at, metric)
+
+        self._compute = {name: metric(name, f"{where}: metrics") for name in specs}
+        self._groups = {name: _metric_groups(name, specs) for name in specs}
+        used = {}
+        for name in specs:
+            _metric_points(name, specs, used)
+        self.points = {group: tuple(sorted(indices)) for group, indices in used.items()}
+
+        # Öncelik: büyük sayı önce; eşitlikte dosyadaki sıra korunur
+        gestures = sorted(config.get("gestures", []), key=lambda gesture: -gesture.get("priority", 0))
+        self.labels = tuple(gesture.get("name") for gesture in gestures)
+        if len(set(self.labels)) != len(self.labels) or self.default_label in self.labels:
+            raise ValueError(f"{where}: poz isimleri benzersiz ve '{self.default_label}' dışında olmalı")
+
+        self._conditions = set()
+        self._rules = []
+        for gesture in gestures:
+            at = f"{where}: gestures.{gesture['name']}"
+            when = gesture.get("when") or []
+            if not when:
+                raise ValueError(f"{at}: en az bir koşul gerekli")
+            conditions = [self._compile_condition(condition, at) for condition in when]
+            self._rules.append((gesture["name"], conditions))
+            asset = {key: gesture[key] for key in ("file", "title") if key in gesture}
+            if asset:
+                self.assets[gesture["name"]] = asset
+
+        # Tek frame sınıflandırması için (etiket, [(metrik, operatör, eşik), ...])
+        self._scalar_rules = [
+            (label, [(metric, SCALAR_OPERATORS[direction], threshold)
+                     for (metric, direction, threshold), _ in conditions])
+            for label, conditions in self._rules
+        ]
+        self._condition_metrics = tuple({metric for metric, _, _ in self._conditions})
+
+    def _compile_condition(self, condition, where):
+        """Koşul → ((metrik, yön, eşik), çıkış eşiği); aynı anahtar bir kez değerlendirilir"""
+        metric, direction, threshold = condition.get("metric"), condition.get("op"), condition.get("threshold")
+        if metric not in self._compute:
+            raise ValueError(f"{where}: bilinmeyen metrik {metric!r}")
+        if direction not in OPERATORS:
+            raise ValueError(f"{where}: geçersiz op {direction!r} (seçenekler: {tuple(OPERATORS)})")
+        if isinstance(threshold, str):
+            if threshold not in self.thresholds:
+                raise ValueError(f"{where}: bilinmeyen eşik {threshold!r}")
+        elif not isinstance(threshold, (int, float)):
+            raise ValueError(f"{where}: eşik bir sayı veya thresholds içindeki bir isim olmalı")
+        exit_ = condition.get("exit")
+        if exit_ is not None and not isinstance(exit_, (int, float)):
+            raise ValueError(f"{where}: çıkış eşiği (exit) bir sayı olmalı")
+        key = (metric, direction, threshold)
+        self._conditions.add(key)
+        return key, exit_
+
+    @property
+    def all_labels(self):
+        """Pozlar ve sonda varsayılan etiket"""
+        return self.labels + (self.default_label,)
+
+    @property
+    def metric_names(self):
+        return tuple(self._compute)
+
+    @property
+    def conditions(self):
+        """Farklı koşullar (metrik, yön, eşik) - pozlarda tekrar edenler bir kez"""
+        return tuple(self._conditions)
+
+    def compute_metrics(self, landmarks):
+        """Tüm metrikler tek geçişte (ara metrikler paylaşılır)"""
+        values = {}
+        for name, compute in self._compute.items():
+            compute(landmarks, values)
+        return values
+
+    def metric(self, name, landmarks):
+        """Tek metrik"""
+        return self._compute[name](landmarks, {})
+
+    def decide_partial(self, landmarks, available, thresholds=None):
+        """Sadece bazı modeller çalışmışken karar (lazy mod, tek frame)
+
+        available: sonucu bilinen gruplar ("pose", "hands", "face"); diğerleri
+        NaN'dır ama "tespit yok" anlamına gelmez. Pozlar öncelik sırasıyla
+        değerlendirilir: koşulu bilinen gruplarla yanlışlanan poz elenir, boş
+        bir grup yüzünden NaN kalacak metrikli koşul da yanlıştır. İlk elenmeyen
+        poz kesin doğruysa karar odur; değilse onun eksik grupları döner.
+        (etiket, boş küme) veya (None, gerekli gruplar) döner - etiket tüm
+        modeller çalışmış gibi hesaplanan etiketle aynıdır.
+        """
+        thresholds = {**self.thresholds, **(thresholds or {})}
+        detected = {
+            "pose": landmarks.pose_detected,
+            "hands": landmarks.hand_count > 0,
+            "face": landmarks.face_detected,
+        }
+        empty = {group for group in available if not detected[group]}
+        values = {}
+        for label, conditions in self._rules:
+            missing = set()
+            for (metric, direction, threshold), _ in conditions:
+                groups, strict = self._groups[metric]
+                if strict & empty:
+                    break
+                if not groups <= available:
+                    missing |= groups - available
+                    continue
+                limit = thresholds[threshold] if isinstance(threshold, str) else threshold
+                if not OPERATORS[direction](self._compute[metric](landmarks, values), limit):
+                    break
+            else:
+                if not missing:
+                    return label, set()
+                return None, missing
+        return self.default_label, set()
+
+    def resolve_thresholds(self, thresholds=None):
+        """Varsayılan eşiklerin üzerine kısmi eşikler; bilinmeyen isim ValueError"""
+        unknown = set(thresholds or {}) - set(self.thresholds)
+        if unknown:
+            raise ValueError(f"Bilinmeyen eşik: {sorted(unknown)} (seçenekler: {tuple(self.thresholds)})")
+        return {**self.thresholds, **(thresholds or {})}
+
+    def classify(self, metrics, thresholds=None):
+        """Metriklerden poz etiketi - öncelik sırasında ilk tutan poz, yoksa varsayılan
+
+        Tek frame için str, çok frame için etiket dizisi döner.
+        """
+        thresholds = {**self.thresholds, **(thresholds or {})}
+        if all(np.ndim(metrics[metric]) == 0 for metric in self._condition_metrics):
+            for label, conditions in self._scalar_rules:
+                for metric, compare, threshold in conditions:
+                    limit = thresholds[threshold] if isinstance(threshold, str) else threshold
+                    if not compare(metrics[metric], limit):
+                        break
+                else:
+                    return label
+            return self.default_label
+
+        masks = {
+            (metric, direction, threshold): OPERATORS[direction](
+                np.asarray(metrics[metric]),
+                thresholds[threshold] if isinstance(threshold, str) else threshold,
+            )
+            for metric, direction, threshold in self._conditions
+        }
+        conditions = [
+            np.logical_and.reduce([masks[key] for key, _ in conditions])
+            for _, conditions in self._rules
+        ]
+        labels = np.select(conditions, self.labels, self.default_label)
+        return str(labels) if labels.ndim == 0 else labels
+
+    def hysteresis(self, thresholds=None):
+        """smoothing.PoseStabilizer için poz → [(metrik, yön, giriş, çıkış), ...]
+
+        Çıkış eşiği verilmemiş koşullarda giriş eşiği kullanılır (histerezis yok).
+        """
+        thresholds = {**self.thresholds, **(thresholds or {})}
+        result = {}
+        for label, keys in self._rules:
+            conditions = []
+            for (metric, direction, threshold), exit_ in keys:
+                enter = thresholds[threshold] if isinstance(threshold, str) else float(threshold)
+                conditions.append((metric, direction, enter, enter if exit_ is None else float(exit_)))
+            result[label] = conditions
+        return result
+
+
+@lru_cache(maxsize=None)
+def _load(path):
+    try:
+        config = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{path} okunamadı: {e}") from None
+    return GestureEngine(config, source=path)
+
+
+def load_gestures(path=None):
+    """Yapılandırmayı okuyup derler (aynı dosya process başına bir kez derlenir)"""
+    if isinstance(path, GestureEngine):
+        return path
+    return _load(str(Path(path or DEFAULT_GESTURES_PATH).resolve()))
+
+
+# Varsayılan kurallar (gestures.json) - eski landmarks API'si ile aynı adlar
+DEFAULT_ENGINE = load_gestures()
+DEFAULT_THRESHOLDS = DEFAULT_ENGINE.thresholds
+POSE_LABELS = DEFAULT_ENGINE.labels
+DEFAULT_LABEL = DEFAULT_ENGINE.default_label
+
+
+def compute_metrics(landmarks):
+    """Varsayılan kuralların tüm metrikleri tek geçişte"""
+    return DEFAULT_ENGINE.compute_metrics(landmarks)
+
+
+def classify(metrics, thresholds=None):
+    """Varsayılan kurallarla poz etiketi (bkz. GestureEngine.classify)"""
+    return DEFAULT_ENGINE.classify(metrics, thresholds)
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Poz kuralı yapılandırmasını doğrular ve özetler")
+    parser.add_argument("config", nargs="?", default=str(DEFAULT_GESTURES_PATH),
+                        help="Kural dosyası (varsayılan: gestures.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    engine = load_gestures(args.config)
+    print(f"{engine.source}: {len(engine.labels)} poz, {len(engine.metric_names)} metrik, "
+          f"{len(engine.conditions)} koşul")
+    for label, conditions in engine.hysteresis().items():
+        rule = " VE ".join(f"{metric} {direction} {enter:g}" for metric, direction, enter, _ in conditions)
+        print(f"  {label:>16}: {rule}")
+    print(f"  {engine.default_label:>16}: (hiçbiri tutmazsa)")
+
+
+if __name__ == "__main__":
+    main()
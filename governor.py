@@ -0,0 +1,155 @@
+"""
+Adaptive Governor Module
+Ölçülen frame işleme süresine göre inference çözünürlüğünü, frame aralığını ve
+hangi modellerin her frame çalışacağını gecikme bütçesine göre ayarlar
+
+Seviyeler kullanıcının ayarlarına göredir: seviye 0 detector'ın ve
+pipeline'ın başlangıç ayarlarıdır (--input-scale vb.), alt seviyeler ölçeği
+bunun üzerine çarparak küçültür, aralıkları sadece büyütür.
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class GovernorLevel:
+    """Tek kalite seviyesi
+
+    input_scale:     inference öncesi frame ölçeği (landmark'lar normalize)
+    frame_interval:  iki inference arasındaki en kısa süre (saniye, 0 = sınırsız)
+    model_intervals: model → her N frame'de bir çalıştır (bkz. ModelScheduler)
+    """
+
+    input_scale: float = 1.0
+    frame_interval: float = 0.0
+    model_intervals: dict = field(default_factory=dict)
+
+
+# Hızlı makinede ilk seviyede kalınır, zayıf makinede sırayla aşağı inilir
+# (ölçekler başlangıç ölçeğine göre, aralıklar en az başlangıç aralıkları)
+DEFAULT_LEVELS = (
+    GovernorLevel(1.0, 0.0),
+    GovernorLevel(0.75, 0.0),
+    GovernorLevel(0.75, 0.040, {"face": 2}),
+    GovernorLevel(0.5, 0.050, {"face": 2, "pose": 2}),
+    GovernorLevel(0.5, 0.066, {"face": 3, "pose": 3, "hands": 2}),
+)
+
+
+class AdaptiveGovernor:
+    """Gecikme bütçesini hedefleyen seviye denetleyicisi
+
+    budget_ms:     hedef frame işleme süresi (milisaniye)
+    alpha:         süre EMA katsayısı
+    degrade_after: EMA bütçeyi bu kadar frame aşarsa bir seviye aşağı
+    upgrade_after: EMA bu kadar frame `headroom * budget` altında kalırsa bir seviye yukarı
+    headroom:      yukarı çıkmak için gereken pay (yukarı / aşağı salınımı önler)
+    """
+
+    def __init__(self, budget_ms=40.0, levels=None, alpha=0.2, degrade_after=5,
+                 upgrade_after=60, headroom=0.6):
+        if budget_ms <= 0:
+            raise ValueError("Gecikme bütçesi pozitif olmalı")
+        self.budget_ms = budget_ms
+        self.levels = tuple(levels or DEFAULT_LEVELS)
+        if not self.levels:
+            raise ValueError("En az bir governor seviyesi gerekli")
+        self.alpha = alpha
+        self.degrade_after = degrade_after
+        self.upgrade_after = upgrade_after
+        self.headroom = headroom
+
+        self.index = 0
+        self.changes = 0
+        self._base = GovernorLevel()
+        self._reset_window()
+
+    @property
+    def level(self):
+        """Güncel seviyenin başlangıç ayarlarıyla birleşmiş hali"""
+        level, base = self.levels[self.index], self._base
+        intervals = dict(base.model_intervals)
+        for model, interval in level.model_intervals.items():
+            intervals[model] = max(intervals.get(model, 1), interval)
+        return GovernorLevel(
+            base.input_scale * level.input_scale,
+            max(base.frame_interval, level.frame_interval),
+            intervals,
+        )
+
+    def attach(self, detector, pipeline=None):
+        """Detector'ın (ve varsa pipeline'ın) mevcut ayarlarını seviye 0 olarak alır
+
+        Bir şey değiştirilmez; ayarlar ancak bütçe aşılıp seviye değişince uygulanır.
+        """
+        self._base = GovernorLevel(
+            detector.input_scale,
+            pipeline.frame_interval if pipeline is not None else 0.0,
+            detector.model_intervals,
+        )
+        self.reset()
+
+    @property
+    def decision(self):
+        """Güncel kararlar - durum çubuğu ve log için"""
+        level = self.level
+        return {
+            'level': self.index,
+            'levels': len(self.levels),
+            'input_scale': level.input_scale,
+            'frame_interval_ms': level.frame_interval * 1000.0,
+            'model_intervals': dict(level.model_intervals),
+            'latency_ms': self.latency_ms,
+            'budget_ms': self.budget_ms,
+            'changes': self.changes,
+        }
+
+    def observe(self, seconds):
+        """Frame işleme süresini ekler; seviye değiştiyse True döner"""
+        sample = seconds * 1000.0
+        if self.latency_ms is None:
+            self.latency_ms = sample
+        else:
+            self.latency_ms = self.alpha * sample + (1.0 - self.alpha) * self.latency_ms
+
+        if self.latency_ms > self.budget_ms:
+            self._over += 1
+            self._under = 0
+        elif self.latency_ms < self.budget_ms * self.headroom:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self.degrade_after and self.index < len(self.levels) - 1:
+            return self._move(1)
+        if self._under >= self.upgrade_after and self.index > 0:
+            return self._move(-1)
+        return False
+
+    def apply(self, detector, pipeline=None):
+        """Güncel seviyeyi detector'a (ve varsa pipeline'a) uygular"""
+        level = self.level
+        if detector.input_scale != level.input_scale and detector.roi_tracker is not None:
+            # ROI kutuları inference frame'inin pikselleriyle; ölçek değişince geçersiz
+            detector.roi_tracker.reset()
+        detector.input_scale = level.input_scale
+        detector.set_model_intervals(level.model_intervals)
+        if pipeline is not None:
+            pipeline.frame_interval = level.frame_interval
+
+    def reset(self):
+        self.index = 0
+        self._reset_window()
+
+    def _move(self, step):
+        self.index += step
+        self.changes += 1
+        # Yeni seviye kendi ölçümleriyle değerlendirilir
+        self._reset_window()
+        return True
+
+    def _reset_window(self):
+        self.latency_ms = None
+        self._over = 0
+        self._under = 0
@@ -0,0 +1,122 @@
+"""
+Monkey Image Cache Module
+Maymun resimlerini başlangıçta bir kez çözer, etiket boyutuna önceden ölçekler
+ve bellekte tutar - poz değişimi diskten okuma / JPEG çözme gerektirmez
+"""
+
+import json
+from pathlib import Path
+
+from PyQt5.QtCore import QSize, Qt
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QLabel, QSizePolicy
+
+from gestures import load_gestures
+
+
+# assets/manifest.json yoksa kullanılan varsayılan pozlar
+DEFAULT_POSES = {
+    "raising_hand": {"file": "raising_hand_pose.jpg", "title": "☝️ İşaret Parmağı Yukarıda"},
+    "shocking": {"file": "shocking_pose.jpg", "title": "😲 Ağız Açık (Şaşkınlık)"},
+    "thinking": {"file": "thinking_pose.jpg", "title": "🤔 El Yüzde (Düşünme)"},
+    "default": {"file": "default_pose.jpg", "title": "😊 Normal Duruş"},
+}
+
+
+def load_manifest(assets_dir, gestures=None):
+    """Poz → {file, title} sözlüğü
+
+    Sıra: varsayılanlar, kural dosyasındaki pozların file / title alanları,
+    en son manifest.json. Resmi olmayan pozlar başlık olarak adını gösterir.
+    """
+    poses = {pose: dict(entry) for pose, entry in DEFAULT_POSES.items()}
+    for pose, entry in load_gestures(gestures).assets.items():
+        poses.setdefault(pose, {}).update(entry)
+    manifest_path = Path(assets_dir) / "manifest.json"
+    if manifest_path.exists():
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"Uyarı: {manifest_path} okunamadı: {e}")
+        else:
+            for pose, entry in manifest.get("poses", {}).items():
+                poses.setdefault(pose, {}).update(entry)
+    return poses
+
+
+class MonkeyImageCache:
+    """Çözülmüş ve hedef boyuta ölçeklenmiş poz resimleri"""
+
+    def __init__(self, assets_dir, poses=None, gestures=None):
+        self.assets_dir = Path(assets_dir)
+        self.poses = poses if poses is not None else load_manifest(assets_dir, gestures)
+        self.titles = {pose: entry.get("title", pose) for pose, entry in self.poses.items()}
+
+        # Orijinaller bir kez çözülür; ölçekleme hep orijinalden yapılır
+        self._originals = {}
+        for pose, entry in self.poses.items():
+            image_path = self.assets_dir / entry.get("file", "")
+            image = QImage(str(image_path)) if image_path.is_file() else QImage()
+            if image.isNull():
+                print(f"Uyarı: {image_path} bulunamadı!")
+                self._originals[pose] = None
+            else:
+                self._originals[pose] = image
+
+    def scale_all(self, size):
+        """Tüm resimlerin `size` boyutuna ölçeklenmiş pixmap'leri (poz → QPixmap)
+
+        Cache birden çok etiket / panel arasında paylaşılır; ölçeklenmiş
+        kopyaları her etiket kendi boyutu için tutar.
+        """
+        return {
+            pose: QPixmap.fromImage(image.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
+            for pose, image in self._originals.items()
+            if image is not None
+        }
+
+    def has_image(self, pose):
+        return self._originals.get(pose) is not None
+
+
+class PoseImageLabel(QLabel):
+    """Önbellekten pixmap gösteren etiket - ölçekleme sadece yeniden boyutlanmada"""
+
+    MISSING_STYLE = "QLabel { color: #ff9800; font-size: 16px; border: 2px dashed #444; }"
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.pose = None
+        self._size = QSize()
+        self._scaled = {}
+        self.setAlignment(Qt.AlignCenter)
+        # Pixmap boyutu layout'u büyütmesin; boyutu layout belirler, resim ona uyar
+        self.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+
+    def show_pose(self, pose):
+        self.pose = pose
+        if self.cache.has_image(pose):
+            self.setStyleSheet("")
+            pixmap = self._scaled.get(pose)
+            if pixmap is not None:
+                self.setPixmap(pixmap)
+        else:
+            self.setText(f"{pose}\n\n(Resim bulunamadı)")
+            self.setStyleSheet(self.MISSING_STYLE)
+
+    def clear_pose(self):
+        """Resmi kaldırır (ör. kişi artık görünmüyor)"""
+        self.pose = None
+        self.clear()
+        self.setStyleSheet("")
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        size = self.contentsRect().size()
+        if size == self._size or size.isEmpty():
+            return
+        self._size = size
+        self._scaled = self.cache.scale_all(size)
+        if self.pose is not None:
+            self.show_pose(self.pose)
@@ -0,0 +1,404 @@
+"""
+Landmark Cache Module
+Kayıtlı videoların landmark dizilerini diskte saklar; kural eşikleri
+değiştiğinde inference tekrarlanmadan tüm frame'ler vektörel yeniden puanlanır
+
+Anahtar: kaynak dosyanın içerik hash'i + modeli etkileyen detector ayarlarının
+hash'i (backend, karmaşıklık, güven eşiği, ölçek ...; kural eşikleri hariç;
+onnx backend'inde model dosyalarının boyutu ve değiştirilme zamanı),
+cache formatı sürümü ve mediapipe sürümü. lazy modda hangi modelin çalışacağına
+kurallar karar verdiği için eşikler ve kural dosyasının içeriği de anahtara
+girer; takibi her N frame'de sıfırlanan kayıtlar (batch.py shard'ları) da
+`tracking_chunk` ile ayrı anahtar alır. Model ayarı, dosya içeriği veya
+mediapipe değişirse anahtar da değişir ve eski kayıt kullanılmaz; `prune`
+kaynağı değişmiş / silinmiş kayıtları temizler.
+
+Yerleşim:
+    <kök>/<dosya anahtarı>/<ayar anahtarı>/
+        pose.npy hands.npy face.npy        (F, ...) float32, NaN = tespit yok
+        timestamps.npy latencies.npy       (F,) saniye
+        meta.json                          kaynak, ayarlar, frame sayısı, CPU süresi
+Diziler np.load(mmap_mode='r') ile açılır; dosyalar belleğe okunmaz. Çok
+kişili modda (max_people > 1) sadece birincil kişinin landmark'ları saklanır.
+
+Kullanım:
+    python landmark_cache.py build kayit.mp4 --model-complexity 0
+    python landmark_cache.py score kayit.mp4 --threshold mouth_ratio=0.18
+    python landmark_cache.py list
+    python landmark_cache.py prune
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+
+from frame_source import IMAGE_EXTENSIONS, ImageSequenceSource, open_source
+from gestures import load_gestures
+from landmarks import LandmarkArrays
+from onnx_backend import model_paths
+from pose_detector import PoseDetector, add_detector_arguments, detector_options_from_args
+
+
+CACHE_VERSION = 1
+DEFAULT_ROOT = Path(__file__).parent / ".landmark_cache"
+
+# Sadece kuralları etkileyen ayarlar - değişince yeniden inference gerekmez
+# (lazy mod hariç, bkz. model_options)
+RULE_OPTIONS = {"thresholds", "gestures"}
+
+ARRAY_NAMES = ("pose", "hands", "face", "timestamps", "latencies")
+
+
+def _mediapipe_version():
+    try:
+        return metadata.version("mediapipe")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def model_options(detector_options):
+    """Landmark'ları etkileyen detector ayarları (kural ayarları lazy mod dışında hariç)"""
+    detector_options = detector_options or {}
+    options = {name: value for name, value in detector_options.items() if name not in RULE_OPTIONS}
+    if options.get("backend") == "onnx":
+        # Aynı yola yeniden export / nicemleme yapılmış model eski kaydı kullanmasın
+        backend_options = options.get("backend_options") or {}
+        paths = model_paths(options.get("model_complexity", 1), backend_options.get("model_dir"),
+                            backend_options.get("int8", False))
+        options["model_files"] = {model: _file_stamp(path) for model, path in paths.items()}
+    if options.get("execution_mode") == "lazy":
+        engine = load_gestures(detector_options.get("gestures"))
+        options["thresholds"] = engine.resolve_thresholds(detector_options.get("thresholds"))
+        options["gestures"] = engine.digest
+    return options
+
+
+def _file_stamp(path):
+    """(boyut, değiştirilme zamanı ns) - dosya yoksa None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def config_key(detector_options):
+    """Modeli etkileyen detector ayarlarının kısa hash'i"""
+    options = model_options(detector_options)
+    payload = {"version": CACHE_VERSION, "mediapipe": _mediapipe_version(), "options": options}
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _hash_file(path, digest, chunk_size=1 << 20):
+    with open(path, "rb") as stream:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+
+
+def is_image_source(path):
+    """Resim dosyası veya klasörü (bağımsız resimler - takip kapalı)"""
+    path = Path(path)
+    return path.is_dir() or path.suffix.lower() in IMAGE_EXTENSIONS
+
+
+def score(landmarks, thresholds=None, gestures=None):
+    """(F, ...) landmark'lardan frame başına etiket dizisi ve metrikler - tek vektörel geçiş"""
+    engine = load_gestures(gestures)
+    metrics = engine.compute_metrics(landmarks)
+    return engine.classify(metrics, engine.resolve_thresholds(thresholds)), metrics
+
+
+@dataclass
+class CachedLandmarks:
+    """Tek kaynak + ayar için memmap'li landmark kaydı"""
+
+    landmarks: LandmarkArrays
+    timestamps: np.ndarray
+    latencies: np.ndarray
+    meta: dict
+    path: Path
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def complete(self):
+        """Kaynağın sonuna kadar işlendi mi (max_frames ile kesilmediyse True)"""
+        return self.meta.get("complete", False)
+
+    def head(self, frames):
+        """İlk `frames` frame (kopyasız görünüm)"""
+        if frames is None or frames >= len(self):
+            return self
+        return CachedLandmarks(
+            landmarks=LandmarkArrays(
+                pose=self.landmarks.pose[:frames],
+                hands=self.landmarks.hands[:frames],
+                face=self.landmarks.face[:frames],
+            ),
+            timestamps=self.timestamps[:frames],
+            latencies=self.latencies[:frames],
+            meta=self.meta,
+            path=self.path,
+        )
+
+    def score(self, thresholds=None, gestures=None):
+        return score(self.landmarks, thresholds, gestures)
+
+
+class LandmarkCache:
+    """Diskteki landmark kayıtları
+
+    Dosya hash'leri (yol, boyut, değişiklik zamanı) ile `index.json` içinde
+    tutulur; aynı dosya her açılışta yeniden okunmaz.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = Path(root)
+        self._index_path = self.root / "index.json"
+        self._index = None
+
+    # ─── Anahtarlar ──────────────────────────────────────────────────────────
+
+    def file_key(self, source_path):
+        """Kaynağın içerik hash'i (klasörde dosya adları + içerikler)"""
+        path = Path(source_path).resolve()
+        files = sorted(child for child in path.iterdir() if child.is_file()) if path.is_dir() else [path]
+        stamp = [(str(file), file.stat().st_size, file.stat().st_mtime_ns) for file in files]
+
+        index = self._load_index()
+        entry = index.get(str(path))
+        if entry is not None and entry["stamp"] == stamp:
+            return entry["hash"]
+
+        digest = hashlib.sha256()
+        for file in files:
+            # Tek dosyada sadece içerik - aynı kaydın kopyası aynı anahtarı alır
+            if path.is_dir():
+                digest.update(file.name.encode("utf-8"))
+            _hash_file(file, digest)
+        key = digest.hexdigest()[:16]
+        index[str(path)] = {"stamp": stamp, "hash": key}
+        self._save_index()
+        return key
+
+    def entry_path(self, source_path, detector_options):
+        return self.root / self.file_key(source_path) / config_key(detector_options)
+
+    # ─── Okuma / yazma ───────────────────────────────────────────────────────
+
+    def load(self, source_path, detector_options, min_frames=None):
+        """Kayıt varsa memmap'li CachedLandmarks, yoksa (veya yetersizse) None
+
+        min_frames verilirse kaynağın sonuna kadar işlenmemiş ve bu kadar
+        frame'i olmayan kayıt yok sayılır.
+        """
+        path = self.entry_path(source_path, detector_options)
+        meta_path = path / "meta.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("version") != CACHE_VERSION:
+            return None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode='r') for name in ARRAY_NAMES}
+        cached = CachedLandmarks(
+            landmarks=LandmarkArrays(pose=arrays["pose"], hands=arrays["hands"], face=arrays["face"]),
+            timestamps=arrays["timestamps"],
+            latencies=arrays["latencies"],
+            meta=meta,
+            path=path,
+        )
+        if min_frames is not None and not cached.complete and len(cached) < min_frames:
+            return None
+        return cached
+
+    def store(self, source_path, detector_options, landmarks, timestamps, latencies, cpu_time=0.0,
+              complete=True):
+        """(F, ...) dizileri yazar; önce geçici klasöre, sonra tek adımda yerine taşır"""
+        path = self.entry_path(source_path, detector_options)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        if temporary.exists():
+            shutil.rmtree(temporary)
+        temporary.mkdir(parents=True)
+
+        arrays = {
+            "pose": landmarks.pose, "hands": landmarks.hands, "face": landmarks.face,
+            "timestamps": timestamps, "latencies": latencies,
+        }
+        for name, values in arrays.items():
+            np.save(temporary / f"{name}.npy", np.asarray(values, dtype=np.float32 if name in
+                                                         ("pose", "hands", "face") else np.float64))
+        meta = {
+            "version": CACHE_VERSION,
+            "source": str(Path(source_path).resolve()),
+            "options": model_options(detector_options),
+            "frames": int(len(timestamps)),
+            "complete": complete,
+            "cpu_time": cpu_time,
+            "created": time.time(),
+        }
+        # meta.json en son - varlığı kaydın tamamlandığını gösterir
+        (temporary / "meta.json").write_text(json.dumps(meta, indent=2, default=str), encoding="utf-8")
+
+        if path.exists():
+            shutil.rmtree(path)
+        try:
+            os.replace(temporary, path)
+        except OSError:
+            # Başka bir process aynı kaydı aynı anda yazdı - onunki kalır
+            shutil.rmtree(temporary, ignore_errors=True)
+        return path
+
+    def build(self, source_path, detector_options, max_frames=None):
+        """Kaynağı sırayla PoseDetector'dan geçirir ve landmark'ları kaydeder"""
+        source = open_source(source_path, realtime=False)
+        if not source.isOpened():
+            raise RuntimeError(f"{source_path} açılamadı")
+        options = dict(detector_options)
+        options.setdefault("static_image_mode", isinstance(source, ImageSequenceSource))
+        detector = PoseDetector(full_landmarks=True, **options)
+
+        frames, timestamps, latencies = [], [], []
+        complete = False
+        try:
+            detector.warm_up()
+            cpu_started = time.process_time()
+            while max_frames is None or len(frames) < max_frames:
+                ret, frame = source.read()
+                if not ret:
+                    complete = True
+                    break
+                started = time.perf_counter()
+                result = detector.detect(frame)
+                latencies.append(time.perf_counter() - started)
+                timestamps.append(source.timestamp)
+                frames.append(result.landmarks)
+            cpu_time = time.process_time() - cpu_started
+        finally:
+            source.release()
+            detector.release()
+
+        landmarks = LandmarkArrays.stack(frames) if frames else LandmarkArrays.empty((0,))
+        self.store(source_path, detector_options, landmarks, timestamps, latencies, cpu_time, complete)
+        return self.load(source_path, detector_options)
+
+    def get_or_build(self, source_path, detector_options, max_frames=None):
+        cached = self.load(source_path, detector_options, min_frames=max_frames)
+        if cached is None:
+            cached = self.build(source_path, detector_options, max_frames)
+        return cached.head(max_frames)
+
+    # ─── Bakım ───────────────────────────────────────────────────────────────
+
+    def entries(self):
+        """Tüm kayıtların meta bilgileri (yol ile)"""
+        result = []
+        for meta_path in sorted(self.root.glob("*/*/meta.json")):
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            meta["path"] = str(meta_path.parent)
+            result.append(meta)
+        return result
+
+    def prune(self):
+        """Kaynağı silinmiş / değişmiş veya eski formattaki kayıtları siler; silinen yolları döner"""
+        removed = []
+        for meta in self.entries():
+            path = Path(meta["path"])
+            source = Path(meta["source"])
+            stale = meta.get("version") != CACHE_VERSION or not source.exists() \
+                or self.file_key(source) != path.parent.name
+            if stale:
+                shutil.rmtree(path)
+                removed.append(path)
+        for file_dir in self.root.glob("*/"):
+            if file_dir.is_dir() and not any(file_dir.iterdir()):
+                file_dir.rmdir()
+        return removed
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                self._index = json.loads(self._index_path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        temporary = self._index_path.with_name(f".index.{os.getpid()}.tmp")
+        temporary.write_text(json.dumps(self._index), encoding="utf-8")
+        os.replace(temporary, self._index_path)
+
+
+def parse_thresholds(items, gestures=None):
+    """["mouth_ratio=0.18", ...] → {"mouth_ratio": 0.18} (isimler kural dosyasındaki eşikler)"""
+    names = load_gestures(gestures).thresholds
+    thresholds = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        if name not in names or not value:
+            raise ValueError(f"Geçersiz eşik: {item!r} (seçenekler: {tuple(names)})")
+        thresholds[name] = float(value)
+    return thresholds
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Landmark cache: oluştur, yeniden puanla, temizle")
+    parser.add_argument("command", choices=("build", "score", "list", "prune"))
+    parser.add_argument("inputs", nargs="*", help="Video, resim klasörü veya .mpraw kayıtları")
+    parser.add_argument("--cache", default=str(DEFAULT_ROOT), help="Cache klasörü")
+    parser.add_argument("--threshold", action="append", default=[],
+                        help="score: kural eşiği, örn. mouth_ratio=0.18 (tekrarlanabilir)")
+    parser.add_argument("--max-frames", type=int, default=None, help="Kaynak başına en fazla frame")
+    add_detector_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    cache = LandmarkCache(args.cache)
+
+    if args.command == "list":
+        for meta in cache.entries():
+            print(f"{meta['path']}  {meta['frames']:>6} frame  {meta['source']}")
+        return
+    if args.command == "prune":
+        removed = cache.prune()
+        print(f"[OK] {len(removed)} kayıt silindi")
+        return
+
+    detector_options = detector_options_from_args(args)
+    thresholds = parse_thresholds(args.threshold, args.gestures)
+    for source_path in args.inputs:
+        options = {"static_image_mode": is_image_source(source_path), **detector_options}
+        started = time.perf_counter()
+        cached = cache.load(source_path, options, min_frames=args.max_frames)
+        hit = cached is not None
+        if args.command == "build" or not hit:
+            cached = cache.build(source_path, options, args.max_frames)
+        cached = cached.head(args.max_frames)
+        elapsed = time.perf_counter() - started
+
+        if args.command == "build":
+            print(f"{source_path}: {len(cached)} frame kaydedildi ({elapsed:.1f} s) → {cached.path}")
+            continue
+        labels, _ = cached.score(thresholds, args.gestures)
+        names, counts = np.unique(labels, return_counts=True)
+        summary = ", ".join(f"{name}={count}" for name, count in zip(names, counts))
+        print(f"{source_path}: {len(cached)} frame, {'cache' if hit else 'inference'} {elapsed:.2f} s  {summary}")
+
+
+if __name__ == "__main__":
+    main()
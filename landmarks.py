@@ -0,0 +1,184 @@
+"""
+Landmark Array Module
+MediaPipe sonuçlarını sabit boyutlu float32 numpy dizilerine çevirir; poz
+kuralları bu diziler üzerinde toplu (vektörel) hesaplanır (bkz. gestures)
+
+Diziler eksik tespitler için NaN ile doldurulur; NaN ile yapılan her
+karşılaştırma False olduğu için kurallar ayrıca "var mı" kontrolü gerektirmez.
+Diziler baştaki ek boyutları (ör. frame sayısı) destekler, yani tek frame de,
+(F, ...) boyutlu bir kayıt da aynı kodla puanlanır.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+POSE_POINTS = 33
+HAND_POINTS = 21
+FACE_POINTS = 478    # refine_landmarks=True; kapalıyken son 10 nokta NaN kalır
+MAX_HANDS = 2
+
+# Pose
+NOSE = 0
+
+# Hands
+WRIST = 0
+
+# FaceMesh
+FACE_NOSE_TIP = 1    # pose'u olmayan kişilerde burun yerine
+FOREHEAD = 10
+CHIN = 152
+
+# Tespit bayraklarının (pose_detected, hand_count, face_detected) okuduğu noktalar
+DETECTION_POINTS = {"pose": NOSE, "hands": WRIST, "face": FOREHEAD}
+
+
+@dataclass
+class LandmarkArrays:
+    """Tek frame'in (veya baştaki boyutlarla çok frame'in) landmark dizileri
+
+    pose:  (..., 33, 3)
+    hands: (..., 2, 21, 3)
+    face:  (..., 478, 3)
+    """
+
+    pose: np.ndarray
+    hands: np.ndarray
+    face: np.ndarray
+
+    @classmethod
+    def empty(cls, leading_shape=()):
+        return cls(
+            pose=np.full(leading_shape + (POSE_POINTS, 3), np.nan, dtype=np.float32),
+            hands=np.full(leading_shape + (MAX_HANDS, HAND_POINTS, 3), np.nan, dtype=np.float32),
+            face=np.full(leading_shape + (FACE_POINTS, 3), np.nan, dtype=np.float32),
+        )
+
+    @classmethod
+    def from_results(cls, pose_results, hand_results, face_results, points=None):
+        """MediaPipe sonuçlarını frame başına bir kez diziye çevirir
+
+        points (grup → indeksler, ör. GestureEngine.points) verilirse sadece o
+        noktalar ve tespit bayraklarının noktaları çevrilir, diğerleri NaN kalır.
+        Protobuf alanlarını tek tek okumak pahalıdır; 478 yüz noktasının
+        tamamını çevirmek frame başına yüzlerce µs sürer.
+        """
+        arrays = cls.empty()
+        if points is not None:
+            points = {group: sorted({index, *points.get(group, ())})
+                      for group, index in DETECTION_POINTS.items()}
+        else:
+            points = {}
+
+        pose_landmarks = getattr(pose_results, 'pose_landmarks', None)
+        if pose_landmarks is not None:
+            _fill(arrays.pose, pose_landmarks, points.get("pose"))
+
+        hand_landmarks = getattr(hand_results, 'multi_hand_landmarks', None) or ()
+        for index, landmarks in enumerate(hand_landmarks[:MAX_HANDS]):
+            _fill(arrays.hands[index], landmarks, points.get("hands"))
+
+        face_landmarks = getattr(face_results, 'multi_face_landmarks', None)
+        if face_landmarks:
+            _fill(arrays.face, face_landmarks[0], points.get("face"))
+
+        return arrays
+
+    @classmethod
+    def people_from_results(cls, pose_results, hand_results, face_results):
+        """Çok kişili frame'i kişi başına LandmarkArrays listesine ayırır
+
+        Her yüz bir kişidir. Pose (MediaPipe Pose tek kişilik) burnu en yakın
+        yüzün kişisine, her el bileği en yakın yüze atanır; pose'u olmayan
+        kişilerin burnu yüzün burun ucundan alınır. Kişiler yüz merkezine göre
+        soldan sağa sıralanır. (kişiler, pose sahibi kişinin indeksi) döner.
+        En fazla bir yüz varsa sonuç `from_results` ile aynıdır.
+        """
+        face_lists = getattr(face_results, 'multi_face_landmarks', None) or ()
+        if len(face_lists) <= 1:
+            return [cls.from_results(pose_results, hand_results, face_results)], 0
+
+        faces = np.full((len(face_lists), FACE_POINTS, 3), np.nan, dtype=np.float32)
+        for index, landmarks in enumerate(face_lists):
+            _fill(faces[index], landmarks)
+        hand_lists = getattr(hand_results, 'multi_hand_landmarks', None) or ()
+        hands = np.full((len(hand_lists), HAND_POINTS, 3), np.nan, dtype=np.float32)
+        for index, landmarks in enumerate(hand_lists):
+            _fill(hands[index], landmarks)
+
+        # Soldan sağa sıra - kişi yuvaları frame'ler arasında olabildiğince sabit kalır
+        centers = np.nanmean(faces[..., :2], axis=1)                    # (F, 2)
+        order = np.argsort(centers[:, 0])
+        faces, centers = faces[order], centers[order]
+        face_heights = np.abs(faces[:, CHIN, 1] - faces[:, FOREHEAD, 1])
+        face_heights = np.where(face_heights > 0, face_heights, 1.0)
+
+        people = cls.empty((len(faces),))
+        people.face[:] = faces
+        people.pose[:, NOSE] = faces[:, FACE_NOSE_TIP]
+
+        # Eller: bilek - yüz merkezi uzaklığı yüz yüksekliğine göre; kişi başına en fazla iki el
+        if len(hands):
+            deltas = hands[:, np.newaxis, WRIST, :2] - centers[np.newaxis]   # (H, F, 2)
+            distances = np.sqrt((deltas ** 2).sum(axis=-1)) / face_heights
+            counts = np.zeros(len(faces), dtype=int)
+            for hand_index in np.argsort(distances.min(axis=1)):
+                for person in np.argsort(distances[hand_index]):
+                    if counts[person] < MAX_HANDS:
+                        people.hands[person, counts[person]] = hands[hand_index]
+                        counts[person] += 1
+                        break
+
+        primary = 0
+        pose_landmarks = getattr(pose_results, 'pose_landmarks', None)
+        if pose_landmarks is not None:
+            pose = np.full((POSE_POINTS, 3), np.nan, dtype=np.float32)
+            _fill(pose, pose_landmarks)
+            nose_distances = np.sqrt(((faces[:, FACE_NOSE_TIP, :2] - pose[NOSE, :2]) ** 2).sum(axis=-1))
+            primary = int(np.argmin(nose_distances))
+            people.pose[primary] = pose
+
+        return [cls(people.pose[i], people.hands[i], people.face[i]) for i in range(len(faces))], primary
+
+    @classmethod
+    def stack(cls, frames):
+        """Frame listesini (F, ...) boyutlu tek LandmarkArrays'e birleştirir"""
+        return cls(
+            pose=np.stack([frame.pose for frame in frames]),
+            hands=np.stack([frame.hands for frame in frames]),
+            face=np.stack([frame.face for frame in frames]),
+        )
+
+    @property
+    def pose_detected(self):
+        return ~np.isnan(self.pose[..., NOSE, 0])
+
+    @property
+    def hand_count(self):
+        return np.count_nonzero(~np.isnan(self.hands[..., WRIST, 0]), axis=-1)
+
+    @property
+    def face_detected(self):
+        return ~np.isnan(self.face[..., FOREHEAD, 0])
+
+
+def _fill(out, landmark_list, indices=None):
+    points = landmark_list.landmark
+    count = min(len(points), out.shape[0])
+    if indices is None:
+        out[:count] = [(point.x, point.y, point.z) for point in points[:count]]
+        return
+    # refine_landmarks kapalıyken olmayan yüz noktaları NaN kalır
+    indices = [index for index in indices if index < count]
+    out[indices] = [(points[index].x, points[index].y, points[index].z) for index in indices]
+
+
+def person_box(landmarks):
+    """Kişinin normalize (x0, y0, x1, y1) kutusu - yüzden, yoksa pose'tan; hiçbiri yoksa None"""
+    for points in (landmarks.face, landmarks.pose):
+        valid = points[~np.isnan(points[:, 0]), :2]
+        if len(valid):
+            low, high = valid.min(axis=0), valid.max(axis=0)
+            return float(low[0]), float(low[1]), float(high[0]), float(high[1])
+    return None
@@ -7,11 +7,15 @@ PyQt5 arayüz + MediaPipe pose detection
 # main.py doğrudan çalıştırılsa bile:
 #   1. Python sürümü yanlışsa uyumlu olanı bulur, yoksa otomatik indirir/kurar
 #   2. .venv yoksa oluşturur
-#   3. Paketler yoksa requirements.lock'tan kurar
+#   3. Paketler yoksa requirements.lock'tan kurar (başarılı kontrol .venv içinde
+#      lock dosyası + yorumlayıcı anahtarıyla önbelleklenir, sonraki açılışlarda
+#      paket kontrolü için ayrı process başlatılmaz)
 #   4. Her şey hazır olunca bu scripti .venv Python'u ile yeniden başlatır
 # ─────────────────────────────────────────────────────────────────────────────
 
 import sys
+import hashlib
+import os
 import subprocess
 import platform
 from pathlib import Path
@@ -102,6 +106,15 @@ def _fatal(msg):
     sys.exit(1)
 
 
+def _environment_stamp(req_file, venv_python):
+    """Lock dosyası içeriği + .venv yorumlayıcısı (gerçek yolu ve değişiklik zamanı) özeti"""
+    interpreter = os.path.realpath(venv_python)
+    digest = hashlib.sha256(req_file.read_bytes())
+    digest.update(interpreter.encode("utf-8"))
+    digest.update(str(os.stat(interpreter).st_mtime_ns).encode("ascii"))
+    return digest.hexdigest()
+
+
 def _bootstrap():
     SCRIPT_DIR  = Path(__file__).parent.resolve()
     VENV_DIR    = SCRIPT_DIR / ".venv"
@@ -141,11 +154,17 @@ def _bootstrap():
         print("[OK] Sanal ortam hazır")
 
     # ── Paketleri kur (yoksa) ────────────────────────────────────────────────
-    check = subprocess.run(
-        [VENV_PYTHON, "-c", "import mediapipe, cv2, PyQt5, numpy"],
-        capture_output=True,
-    )
-    if check.returncode != 0:
+    # Lock dosyası ve yorumlayıcı değişmediyse önceki başarılı kontrol geçerli
+    stamp_file = VENV_DIR / ".bootstrap_ok"
+    stamp = _environment_stamp(REQ_FILE, VENV_PYTHON)
+    if stamp_file.exists() and stamp_file.read_text() == stamp:
+        check = None
+    else:
+        check = subprocess.run(
+            [VENV_PYTHON, "-c", "import mediapipe, cv2, PyQt5, numpy"],
+            capture_output=True,
+        )
+    if check is not None and check.returncode != 0:
         print("[KURULUM] Paketler yükleniyor (ilk kurulumda ~2-3 dk sürebilir)...")
         r = subprocess.run([VENV_PYTHON, "-m", "pip", "install", "--upgrade", "pip", "-q"])
         if r.returncode != 0:
@@ -154,6 +173,8 @@ def _bootstrap():
         if r.returncode != 0:
             _fatal("Paketler yüklenemedi! İnternet bağlantısını kontrol edin.")
         print("[OK] Paketler hazır\n")
+    if check is not None:
+        stamp_file.write_text(stamp)
 
     # ── Bu scripti .venv Python'u ile yeniden başlat ─────────────────────────
     print("[BAŞLATILIYOR] Uygulama başlatılıyor...\n")
@@ -161,23 +182,121 @@ def _bootstrap():
     sys.exit(result.returncode)
 
 
-_bootstrap()
+# Worker process'leri (spawn) bu modülü __mp_main__ olarak yükler - tekrar kurulum yapılmasın
+if __name__ == "__main__":
+    _bootstrap()
 # ─── Bootstrap sonu ──────────────────────────────────────────────────────────
 
-import cv2
+import argparse
+import math
+import threading
+import time
 from pathlib import Path
-from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QLabel
-from PyQt5.QtCore import QTimer, Qt
-from PyQt5.QtGui import QImage, QPixmap, QFont
-
-from pose_detector import PoseDetector
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QGridLayout, QHBoxLayout, QVBoxLayout,
+                             QLabel, QMessageBox, QProgressBar)
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QFont
+
+from pose_detector import PoseDetector, add_detector_arguments, detector_options_from_args
+from pipeline import FramePipeline
+from renderer import PoseRenderer
+from smoothing import PoseStabilizer
+from governor import AdaptiveGovernor
+from motion import MotionGate
+from frame_source import FrameRecorder, RecordingSource, open_source
+from metrics import MetricsRegistry, MetricsServer, SnapshotLogger
+from streams import StreamPool
+from image_cache import MonkeyImageCache, PoseImageLabel
+from display import FrameView, GLFrameView
+
+
+class _ResultBridge(QObject):
+    """Inference thread'inden GUI thread'ine sonuç hazır sinyali taşır"""
+    result_ready = pyqtSignal()
+
+
+class _ModelLoader(QObject):
+    """Kaynağı açar, MediaPipe graph'larını oluşturur ve ısıtır (arka plan thread'i)
+
+    mediapipe importu ve model dosyalarının yüklenmesi birkaç saniye sürer;
+    bu sırada pencere açık kalır ve ilerleme sinyalle bildirilir. Pencere yükleme
+    sırasında kapanırsa cancel() çağrılır; yarım kalan kaynak ve modelleri loader
+    kendisi kapatır, teslim edilmiş ama henüz işlenmemiş olanları cancel() döndürür.
+    """
+    progress = pyqtSignal(int, str)
+    loaded = pyqtSignal(object, object)
+    source_failed = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, source, detector_options, realtime=True, loop=True):
+        super().__init__()
+        self.source = source
+        self.detector_options = detector_options
+        self.realtime = realtime
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._loaded = None
+    
+    def start(self):
+        threading.Thread(target=self._run, name="model-loader", daemon=True).start()
+    
+    @property
+    def cancelled(self):
+        return self._cancelled
+    
+    def cancel(self):
+        """Yüklemeyi iptal et; teslim edilmiş (camera, detector) varsa döndür"""
+        with self._lock:
+            self._cancelled = True
+            return self._loaded
+    
+    def _run(self):
+        camera = detector = None
+        try:
+            self.progress.emit(5, "Kaynak açılıyor...")
+            camera = open_source(self.source, realtime=self.realtime, loop=self.loop)
+            if not camera.isOpened():
+                camera.release()
+                self.source_failed.emit(camera.is_live)
+                return
+            
+            self.progress.emit(20, "MediaPipe yükleniyor...")
+            detector = PoseDetector(**self.detector_options)
+            
+            self.progress.emit(50, "Modeller ısıtılıyor...")
+            detector.warm_up(on_progress=lambda done, total, name: self.progress.emit(
+                50 + 50 * done // total, f"Model hazır: {name}"))
+        except Exception as exc:
+            self._release(camera, detector)
+            self.failed.emit(str(exc))
+            return
+        
+        with self._lock:
+            if not self._cancelled:
+                self._loaded = (camera, detector)
+                self.loaded.emit(camera, detector)
+                return
+        # Pencere yükleme sırasında kapandı
+        self._release(camera, detector)
+    
+    @staticmethod
+    def _release(camera, detector):
+        if detector is not None:
+            detector.release()
+        if camera is not None:
+            camera.release()
 
 
 class MonkeyPoseApp(QMainWindow):
     """Ana uygulama penceresi"""
     
-    def __init__(self):
+    def __init__(self, detector_options=None, render_overlay=True, overlay_every=1, use_opengl=False,
+                 smoothing=True, latency_budget=40.0,
+                 motion_threshold=2.5, motion_max_age=0.5, source="0", record=None, realtime=True,
+                 loop=True, metrics_port=None, metrics_log=None, metrics_interval=10.0, show_hud=False):
         super().__init__()
+        self.use_opengl = use_opengl
         
         self.setWindowTitle("Monkey Pose Mimic (MediaPipe)")
         self.setGeometry(100, 100, 1200, 600)
@@ -190,43 +309,111 @@ class MonkeyPoseApp(QMainWindow):
                 border-radius: 10px;
                 background-color: #1e1e1e;
             }
+            QStatusBar {
+                color: #aaa;
+            }
         """)
         
-        # Kamera başlat (CAP_DSHOW sadece Windows'ta daha kararlı, diğer platformlarda varsayılan)
-        _backend = cv2.CAP_DSHOW if platform.system() == "Windows" else cv2.CAP_ANY
-        self.camera = cv2.VideoCapture(0, _backend)
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-
-        if not self.camera.isOpened():
-            from PyQt5.QtWidgets import QMessageBox
-            msg = QMessageBox()
-            msg.setIcon(QMessageBox.Critical)
-            msg.setWindowTitle("Kamera Bulunamadı")
-            msg.setText("Kamera açılamadı!")
-            msg.setInformativeText(
-                "Lütfen şunları kontrol edin:\n"
-                "• Bilgisayarınızda kamera var mı?\n"
-                "• Kamera başka bir uygulama tarafından kullanılıyor mu?\n"
-                "• Kamera sürücüleri kurulu mu?"
-            )
-            msg.exec_()
-            sys.exit(1)
+        # Metrikler her zaman toplanır; uç nokta ve log isteğe bağlı
+        self.metrics = MetricsRegistry()
+        self.metrics_server = MetricsServer(self.metrics, metrics_port).start() if metrics_port else None
+        self.metrics_logger = SnapshotLogger(self.metrics, metrics_log, metrics_interval).start() \
+            if metrics_log else None
         
-        # Pose detector
-        self.pose_detector = PoseDetector()
+        # Kaynak ve modeller arka planda yüklenir (bkz. _ModelLoader)
+        self.camera = None
+        self.pose_detector = None
+        self.pipeline = None
+        self.record = record
+        self.render_overlay = render_overlay
+        self.overlay_every = overlay_every
+        self.smoothing = smoothing
+        self._pipeline_options = {
+            'governor': AdaptiveGovernor(latency_budget) if latency_budget > 0 else None,
+            'motion_gate': MotionGate(motion_threshold, motion_max_age) if motion_threshold > 0 else None,
+            'metrics': self.metrics,
+        }
         
         # Maymun resimleri
-        self.monkey_images = self._load_monkey_images()
+        self.monkey_images = self._load_monkey_images((detector_options or {}).get('gestures'))
         self.current_pose = "default"
+        self.max_people = (detector_options or {}).get('max_people', 1)
+        self.current_poses = ["default"] * self.max_people
         
-        # UI oluştur
+        # UI oluştur - pencere modeller yüklenmeden gösterilir
         self._setup_ui()
+        self.camera_label.paint_histogram = self.metrics.histogram(
+            'stage_seconds', "Aşama süresi (model, kural, çizim)", stage="display")
+        self.hud_label.setVisible(show_hud)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setMaximumWidth(220)
+        self.progress_bar.setTextVisible(False)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.statusBar().showMessage("Başlatılıyor...")
+        
+        self.loader = _ModelLoader(source, detector_options or {}, realtime, loop)
+        self.loader.progress.connect(self._on_load_progress)
+        self.loader.loaded.connect(self._on_loaded)
+        self.loader.source_failed.connect(self._on_source_failed)
+        self.loader.failed.connect(self._on_load_failed)
+        self.loader.start()
+        
+        # Hat istatistikleri ve HUD (saniyede bir)
+        self._fps_gauge = self.metrics.gauge('fps', "Ekrana teslim edilen frame/saniye")
+        self._last_delivered = (0, time.perf_counter())
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self._update_stats)
+        self.stats_timer.start(1000)
+    
+    def _on_load_progress(self, percent, message):
+        self.progress_bar.setValue(percent)
+        self.statusBar().showMessage(message)
+    
+    def _on_loaded(self, camera, detector):
+        """Modeller hazır - capture/inference thread'leri başlar"""
+        if self.loader.cancelled:
+            return  # Pencere kapandı; kaynakları closeEvent bıraktı
+        self.camera = RecordingSource(camera, FrameRecorder(self.record)) if self.record else camera
+        self.pose_detector = detector
         
-        # Timer (40 FPS - daha akıcı)
-        self.timer = QTimer()
-        self.timer.timeout.connect(self._update_frame)
-        self.timer.start(25)
+        # GUI thread'i sadece gösterim yapar
+        self.result_bridge = _ResultBridge()
+        self.result_bridge.result_ready.connect(self._update_frame)
+        self.pipeline = FramePipeline(
+            self.camera,
+            self.pose_detector,
+            on_result=self.result_bridge.result_ready.emit,
+            renderer=PoseRenderer(every_n=self.overlay_every, color_order="rgb") if self.render_overlay else None,
+            stabilizer=PoseStabilizer.for_detector(detector) if self.smoothing else None,
+            **self._pipeline_options,
+        )
+        self.pipeline.start()
+        self.statusBar().removeWidget(self.progress_bar)
+        self.statusBar().showMessage("Hazır")
+    
+    def _on_source_failed(self, is_live):
+        if not is_live:
+            print(f"HATA: Kaynak açılamadı: {self.loader.source}")
+            QApplication.instance().exit(1)
+            return
+        msg = QMessageBox(self)
+        msg.setIcon(QMessageBox.Critical)
+        msg.setWindowTitle("Kamera Bulunamadı")
+        msg.setText("Kamera açılamadı!")
+        msg.setInformativeText(
+            "Lütfen şunları kontrol edin:\n"
+            "• Bilgisayarınızda kamera var mı?\n"
+            "• Kamera başka bir uygulama tarafından kullanılıyor mu?\n"
+            "• Kamera sürücüleri kurulu mu?"
+        )
+        msg.exec_()
+        QApplication.instance().exit(1)
+    
+    def _on_load_failed(self, message):
+        QMessageBox.critical(self, "Model Yüklenemedi", message)
+        QApplication.instance().exit(1)
     
     def _setup_ui(self):
         """Arayüz oluştur"""
@@ -246,10 +433,16 @@ class MonkeyPoseApp(QMainWindow):
         camera_title.setStyleSheet("QLabel { color: #fff; border: none; background: transparent; padding: 5px; }")
         camera_title.setMaximumHeight(40)
         
-        self.camera_label = QLabel()
-        self.camera_label.setMinimumSize(640, 480)
-        self.camera_label.setAlignment(Qt.AlignCenter)
-        self.camera_label.setScaledContents(True)
+        # Frame buffer'ı kopyalanmadan doğrudan çizilir (QPixmap yok)
+        self.camera_label = GLFrameView() if self.use_opengl else FrameView()
+        
+        # Metrik HUD'ı - H tuşuyla açılır / kapanır
+        self.hud_label = QLabel(self.camera_label)
+        self.hud_label.setFont(QFont("Monospace", 9))
+        self.hud_label.setStyleSheet(
+            "QLabel { color: #e0e0e0; background-color: rgba(0, 0, 0, 170); border: none; "
+            "border-radius: 6px; padding: 6px; }"
+        )
         
         left_layout.addWidget(camera_title, 0)
         left_layout.addWidget(self.camera_label, 1)
@@ -264,105 +457,426 @@ class MonkeyPoseApp(QMainWindow):
         monkey_title.setStyleSheet("QLabel { color: #fff; border: none; background: transparent; padding: 5px; }")
         monkey_title.setMaximumHeight(40)
         
-        self.monkey_label = QLabel()
-        self.monkey_label.setMinimumSize(480, 480)
-        self.monkey_label.setAlignment(Qt.AlignCenter)
-        self.monkey_label.setScaledContents(True)
-        
-        self.pose_name_label = QLabel("Normal Duruş")
-        self.pose_name_label.setFont(QFont("Arial", 12))
-        self.pose_name_label.setAlignment(Qt.AlignCenter)
-        self.pose_name_label.setStyleSheet("QLabel { color: #4CAF50; border: none; background: transparent; padding: 5px; }")
-        self.pose_name_label.setMaximumHeight(35)
-        
         right_layout.addWidget(monkey_title, 0)
-        right_layout.addWidget(self.monkey_label, 1)
-        right_layout.addWidget(self.pose_name_label, 0)
+        
+        # Kişi başına bir maymun paneli (soldan sağa kişi sırası); paneller aynı
+        # boyutta olduğu için tek önbelleği paylaşır
+        self.monkey_panels = []
+        for _ in range(self.max_people):
+            # Resimler etiket boyutuna önceden ölçeklenir (her çizimde değil)
+            monkey_label = PoseImageLabel(self.monkey_images)
+            monkey_label.setMinimumSize(480 // self.max_people, 480 // self.max_people)
+            
+            pose_name_label = QLabel("Normal Duruş")
+            pose_name_label.setFont(QFont("Arial", 12))
+            pose_name_label.setAlignment(Qt.AlignCenter)
+            pose_name_label.setStyleSheet("QLabel { color: #4CAF50; border: none; background: transparent; padding: 5px; }")
+            pose_name_label.setMaximumHeight(35)
+            
+            right_layout.addWidget(monkey_label, 1)
+            right_layout.addWidget(pose_name_label, 0)
+            self.monkey_panels.append((monkey_label, pose_name_label))
+        self.monkey_label, self.pose_name_label = self.monkey_panels[0]
         right_layout.setSpacing(5)
         
         main_layout.addLayout(left_layout, 60)
         main_layout.addLayout(right_layout, 40)
         
-        self._update_monkey_image("default")
-    
-    def _load_monkey_images(self):
-        """Maymun resimlerini yükle"""
-        assets_dir = Path(__file__).parent / "assets"
-        images = {}
-        pose_files = {
-            "raising_hand": "raising_hand_pose.jpg",
-            "shocking": "shocking_pose.jpg",
-            "thinking": "thinking_pose.jpg",
-            "default": "default_pose.jpg"
-        }
+        for slot in range(self.max_people):
+            self._update_monkey_image("default", slot)
+    
+    def _load_monkey_images(self, gestures=None):
+        """Maymun resimlerini bir kez çözüp önbelleğe al (kural dosyası + assets/manifest.json)"""
+        return MonkeyImageCache(Path(__file__).parent / "assets", gestures=gestures)
+    
+    def _update_frame(self):
+        """Inference hattından gelen en yeni sonucu göster"""
+        result = self.pipeline.take_result()
+        if result is None:
+            return
+        rgb_frame, detection = result
+        pose_name = detection.pose_name
         
-        for pose, filename in pose_files.items():
-            image_path = assets_dir / filename
-            if image_path.exists():
-                images[pose] = str(image_path)
-            else:
-                print(f"Uyarı: {image_path} bulunamadı!")
-                images[pose] = None
+        # Kamera göster - RGB buffer doğrudan çizilir, önceki buffer havuza döner
+        self.pipeline.release_frame(self.camera_label.set_frame(rgb_frame))
         
-        return images
+        # Poz değişti mi
+        if pose_name != self.current_pose:
+            self.current_pose = pose_name
+            if self.max_people == 1:
+                self._update_monkey_image(pose_name)
+        
+        # Çok kişili: her panel soldan sağa bir kişiyi gösterir (kişi yoksa boş)
+        if self.max_people > 1:
+            people = detection.people
+            for slot in range(self.max_people):
+                person_pose = people[slot].pose_name if slot < len(people) else None
+                if person_pose != self.current_poses[slot]:
+                    self.current_poses[slot] = person_pose
+                    self._update_monkey_image(person_pose, slot)
     
-    def _update_frame(self):
-        """Kamera frame güncelle"""
-        ret, frame = self.camera.read()
-        if not ret:
+    def _update_monkey_image(self, pose_name, slot=0):
+        """Maymun resmini güncelle - önbellekteki pixmap'e geçiş"""
+        monkey_label, pose_name_label = self.monkey_panels[slot]
+        if pose_name is None:
+            monkey_label.clear_pose()
+            pose_name_label.setText("—")
+            return
+        monkey_label.show_pose(pose_name)
+        pose_name_label.setText(self.monkey_images.titles.get(pose_name, pose_name))
+    
+    def _update_stats(self):
+        """Kuyruk derinliği ve düşürülen frame sayaçlarını durum çubuğunda göster"""
+        if self.pipeline is None:
+            return
+        stats = self.pipeline.stats.snapshot()
+        delivered, since = self._last_delivered
+        now = time.perf_counter()
+        self._fps_gauge.set((stats['delivered'] - delivered) / max(now - since, 1e-6))
+        self._last_delivered = (stats['delivered'], now)
+        if self.hud_label.isVisible():
+            self._update_hud(stats)
+        self.statusBar().showMessage(
+            f"Yakalanan: {stats['captured']}  İşlenen: {stats['inferred']}  "
+            f"Durağan (atlanan): {stats['reused']}  "
+            f"Kuyruk (kamera/sonuç): {stats['capture_queue']}/{stats['result_queue']}  "
+            f"Düşürülen (kamera/sonuç): {stats['capture_dropped']}/{stats['result_dropped']}  "
+            f"Gecikme: {stats['latency_ms']:.0f} ms"
+            + self._scheduler_summary()
+            + self._governor_summary()
+        )
+    
+    def _scheduler_summary(self):
+        """Lazy modda / model aralıklarında model başına çalışan/atlanan sayıları"""
+        scheduler = self.pose_detector.scheduler
+        if scheduler is None:
+            return ""
+        parts = [
+            f"{model}: {c['ran']}/{c['skipped'] + c['reused']}"
+            for model, c in scheduler.counters.items()
+        ]
+        return "  Model (çalışan/atlanan): " + ", ".join(parts)
+    
+    def _update_hud(self, stats):
+        """Aşama bazlı p50 / p95 süreleri, FPS, düşürmeler ve etiket geçişleri"""
+        lines = [f"FPS {self._fps_gauge.value:5.1f}   gecikme {stats['latency_ms']:5.1f} ms", "",
+                 f"{'aşama':<10}{'p50':>8}{'p95':>8}"]
+        transitions = 0
+        for (name, labels), metric in self.metrics.items():
+            if name == 'stage_seconds':
+                p50, p95 = metric.recent_quantiles()
+                lines.append(f"{dict(labels)['stage']:<10}{p50 * 1000:8.1f}{p95 * 1000:8.1f}")
+            elif name in ('capture_seconds', 'frame_seconds'):
+                p50, p95 = metric.recent_quantiles()
+                lines.append(f"{name.split('_')[0]:<10}{p50 * 1000:8.1f}{p95 * 1000:8.1f}")
+            elif name == 'label_transitions':
+                transitions += metric.value
+        lines += ["", f"düşürülen  kamera {stats['capture_dropped']}  sonuç {stats['result_dropped']}",
+                  f"etiket geçişi {transitions}"]
+        self.hud_label.setText("\n".join(lines))
+        self.hud_label.adjustSize()
+        # Sağ üst köşe - frame'e çizilen debug satırlarının üstüne binmez
+        self.hud_label.move(self.camera_label.width() - self.hud_label.width() - 12, 12)
+    
+    def keyPressEvent(self, event):
+        """H: metrik HUD'ını aç / kapat"""
+        if event.key() == Qt.Key_H:
+            self.hud_label.setVisible(not self.hud_label.isVisible())
+            if self.hud_label.isVisible() and self.pipeline is not None:
+                self._update_hud(self.pipeline.stats.snapshot())
             return
+        super().keyPressEvent(event)
+    
+    def _governor_summary(self):
+        """Governor'ın güncel seviyesi ve kararları"""
+        governor = self.pipeline.governor
+        if governor is None:
+            return ""
+        decision = governor.decision
+        intervals = ", ".join(f"{model}/{n}" for model, n in decision['model_intervals'].items()) or "hepsi"
+        return (
+            f"  Seviye: {decision['level'] + 1}/{decision['levels']}"
+            f" (ölçek {decision['input_scale']:.2f}, aralık {decision['frame_interval_ms']:.0f} ms,"
+            f" model {intervals})"
+        )
+    
+    def closeEvent(self, event):
+        """Kaynakları temizle"""
+        self.stats_timer.stop()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self.camera.release()
+            self.pose_detector.release()
+        else:
+            # Yükleme sürüyor: loader yarım kalanları kendisi kapatır
+            loaded = self.loader.cancel()
+            if loaded is not None:
+                _ModelLoader._release(*loaded)
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.metrics_logger is not None:
+            self.metrics_logger.stop()
+        event.accept()
+
+
+class _StreamBridge(QObject):
+    """Sonuç thread'inden GUI thread'ine hangi kaynağın sonucu hazır olduğunu taşır"""
+    result_ready = pyqtSignal(int)
+
+
+class _StreamPanel(QWidget):
+    """Tek kaynağın görüntüsü ve altında kişi başına maymun resimleri"""
+    
+    def __init__(self, title, cache, max_people, use_opengl=False):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        layout.setSpacing(5)
         
-        # Ayna efekti kaldır
-        frame = cv2.flip(frame, 1)
+        title_label = QLabel(title)
+        title_label.setFont(QFont("Arial", 12, QFont.Bold))
+        title_label.setAlignment(Qt.AlignCenter)
+        title_label.setStyleSheet("QLabel { color: #fff; border: none; background: transparent; padding: 3px; }")
+        title_label.setMaximumHeight(30)
         
-        # Pose detection
-        processed_frame, pose_name = self.pose_detector.detect_pose(frame)
+        self.view = GLFrameView() if use_opengl else FrameView()
+        self.view.setMinimumSize(320, 240)
         
-        # Kamera göster - direkt pixmap, Qt otomatik ölçeklendirir
-        rgb_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_frame.shape
-        qt_image = QImage(rgb_frame.data, w, h, ch * w, QImage.Format_RGB888)
+        people_layout = QHBoxLayout()
+        self.people = []
+        for _ in range(max_people):
+            column = QVBoxLayout()
+            monkey_label = PoseImageLabel(cache)
+            monkey_label.setMinimumSize(110, 110)
+            caption = QLabel("—")
+            caption.setAlignment(Qt.AlignCenter)
+            caption.setStyleSheet("QLabel { color: #4CAF50; border: none; background: transparent; }")
+            caption.setMaximumHeight(25)
+            column.addWidget(monkey_label, 1)
+            column.addWidget(caption, 0)
+            people_layout.addLayout(column)
+            self.people.append((monkey_label, caption))
+        self.poses = [None] * max_people
         
-        pixmap = QPixmap.fromImage(qt_image)
-        self.camera_label.setPixmap(pixmap)
+        # Worker bu kaynağın frame'ini işleyemediyse hata mesajı
+        self.error_label = QLabel()
+        self.error_label.setWordWrap(True)
+        self.error_label.setStyleSheet("QLabel { color: #ff5252; border: none; background: transparent; }")
+        self.error_label.setVisible(False)
         
-        # Poz değişti mi
-        if pose_name != self.current_pose:
-            self.current_pose = pose_name
-            self._update_monkey_image(pose_name)
+        layout.addWidget(title_label, 0)
+        layout.addWidget(self.view, 3)
+        layout.addWidget(self.error_label, 0)
+        layout.addLayout(people_layout, 1)
+    
+    def show_error(self, message):
+        """Hata mesajını gösterir (None ise gizler)"""
+        self.error_label.setVisible(message is not None)
+        if message is not None:
+            self.error_label.setText(f"⚠️ {message}")
+    
+    def show_people(self, people, titles):
+        """Kişi etiketlerini panellere yansıtır (sadece değişen paneller)"""
+        for slot, (monkey_label, caption) in enumerate(self.people):
+            pose = people[slot].pose_name if slot < len(people) else None
+            if pose == self.poses[slot]:
+                continue
+            self.poses[slot] = pose
+            if pose is None:
+                monkey_label.clear_pose()
+                caption.setText("—")
+            else:
+                monkey_label.show_pose(pose)
+                caption.setText(titles.get(pose, pose))
+
+
+class MultiStreamApp(QMainWindow):
+    """Birden çok kaynak - her kaynak bir panel, kaynaklar worker process havuzunda işlenir"""
     
-    def _update_monkey_image(self, pose_name):
-        """Maymun resmini güncelle"""
-        image_path = self.monkey_images.get(pose_name)
+    def __init__(self, sources, detector_options=None, workers=None, smoothing=True, use_opengl=False,
+                 realtime=True, loop=True):
+        super().__init__()
+        self.setWindowTitle("Monkey Pose Mimic (MediaPipe) - Çoklu Kaynak")
+        self.setGeometry(60, 60, 1400, 800)
+        self.setStyleSheet("""
+            QMainWindow {
+                background-color: #2b2b2b;
+            }
+            QLabel {
+                border: 2px solid #444;
+                border-radius: 10px;
+                background-color: #1e1e1e;
+            }
+            QStatusBar {
+                color: #aaa;
+            }
+        """)
         
-        if image_path:
-            pixmap = QPixmap(image_path)
-            self.monkey_label.setPixmap(pixmap)  # Qt otomatik ölçeklendirir
-        else:
-            self.monkey_label.setText(f"{pose_name}\n\n(Resim bulunamadı)")
-            self.monkey_label.setStyleSheet("QLabel { color: #ff9800; font-size: 16px; border: 2px dashed #444; }")
-        
-        pose_names = {
-            "raising_hand": "☝️ İşaret Parmağı Yukarıda",
-            "shocking": "😲 Ağız Açık (Şaşkınlık)",
-            "thinking": "🤔 El Yüzde (Düşünme)",
-            "default": "😊 Normal Duruş"
-        }
-        self.pose_name_label.setText(pose_names.get(pose_name, pose_name))
+        cameras = [open_source(source, realtime=realtime, loop=loop) for source in sources]
+        closed = [source for source, camera in zip(sources, cameras) if not camera.isOpened()]
+        if closed:
+            QMessageBox.critical(self, "Kaynak Açılamadı", "Açılamayan kaynaklar:\n" + "\n".join(closed))
+            sys.exit(1)
+        
+        detector_options = detector_options or {}
+        self.monkey_images = MonkeyImageCache(Path(__file__).parent / "assets",
+                                              gestures=detector_options.get('gestures'))
+        
+        # Kaynaklar karesel ızgarada
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        grid = QGridLayout(central_widget)
+        grid.setSpacing(10)
+        columns = math.ceil(math.sqrt(len(sources)))
+        self.panels = []
+        for index, source in enumerate(sources):
+            panel = _StreamPanel(f"📷 {index + 1}: {source}", self.monkey_images,
+                                 detector_options.get('max_people', 1), use_opengl)
+            grid.addWidget(panel, index // columns, index % columns)
+            self.panels.append(panel)
+        
+        self.bridge = _StreamBridge()
+        self.bridge.result_ready.connect(self._update_stream)
+        self.pool = StreamPool(
+            cameras,
+            on_result=self.bridge.result_ready.emit,
+            workers=workers,
+            detector_options=detector_options,
+            stabilize=smoothing,
+            renderer=PoseRenderer(color_order="rgb"),
+        )
+        self.pool.start()
+        
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self._update_stats)
+        self.stats_timer.start(1000)
+    
+    def _update_stream(self, index):
+        item = self.pool.take_result(index)
+        if item is None:
+            return
+        rgb_frame, result = item
+        panel = self.panels[index]
+        self.pool.release_frame(index, panel.view.set_frame(rgb_frame))
+        panel.show_error(result.error)
+        if result.error is None:
+            panel.show_people(result.people, self.monkey_images.titles)
+    
+    def _update_stats(self):
+        parts = [
+            f"{stream.index + 1}: {stream.stats['processed']}/{stream.stats['dropped']} "
+            f"({stream.stats['latency_ms']:.0f} ms)"
+            + (f" {stream.stats['errors']} hata" if stream.stats['errors'] else "")
+            for stream in self.pool.streams
+        ]
+        self.statusBar().showMessage(
+            f"Worker: {self.pool.worker_count}  Kaynak (işlenen/düşürülen): " + "  ".join(parts)
+        )
     
     def closeEvent(self, event):
-        """Kaynakları temizle"""
-        self.timer.stop()
-        self.camera.release()
-        self.pose_detector.release()
+        self.stats_timer.stop()
+        self.pool.stop()
         event.accept()
 
 
+# Sadece tek kaynaklı MonkeyPoseApp'te karşılığı olan argümanlar
+_SINGLE_SOURCE_OPTIONS = {
+    'record': "--record",
+    'metrics_port': "--metrics-port",
+    'metrics_log': "--metrics-log",
+    'metrics_interval': "--metrics-interval",
+    'motion_threshold': "--motion-threshold",
+    'motion_max_age': "--motion-max-age",
+    'latency_budget': "--latency-budget",
+}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Monkey Pose Mimic")
+    add_detector_arguments(parser)
+    parser.add_argument("--no-overlay", dest="render_overlay", action="store_false",
+                        help="Kamera görüntüsüne landmark ve debug çizme")
+    parser.add_argument("--overlay-every", type=int, default=1,
+                        help="Overlay'i her N frame'de bir yeniden çiz")
+    parser.add_argument("--opengl", dest="use_opengl", action="store_true",
+                        help="Kamera görüntüsünü OpenGL ile çiz")
+    parser.add_argument("--no-smoothing", dest="smoothing", action="store_false",
+                        help="Poz etiketini frame bazlı ham kararla göster (histerezis yok)")
+    parser.add_argument("--latency-budget", type=float, default=40.0,
+                        help="Frame işleme bütçesi (ms); çözünürlük, frame aralığı ve model "
+                             "sıklığı buna göre ayarlanır (0 = kapalı, --input-scale sabit kalır)")
+    parser.add_argument("--source", action="append", default=None,
+                        help="Kamera indeksi, video dosyası, resim klasörü veya .mpraw kaydı; "
+                             "birden çok verilirse her kaynak ayrı panelde işlenir")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Çoklu kaynakta worker process sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--record", default=None,
+                        help="Okunan frame'leri zaman damgalarıyla bu .mpraw dosyasına kaydet")
+    parser.add_argument("--max-speed", dest="realtime", action="store_false",
+                        help="Kayıtlı kaynakları orijinal hız yerine olabildiğince hızlı oynat")
+    parser.add_argument("--no-loop", dest="loop", action="store_false",
+                        help="Kayıtlı kaynak bitince başa sarma")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Prometheus metriklerini http://127.0.0.1:PORT/metrics adresinde yayınla")
+    parser.add_argument("--metrics-log", default=None,
+                        help="Metrik anlık görüntülerini bu JSONL dosyasına periyodik olarak ekle")
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help="JSON anlık görüntü aralığı (saniye)")
+    parser.add_argument("--hud", dest="show_hud", action="store_true",
+                        help="Metrik HUD'ı açık başlasın (çalışırken H tuşu)")
+    parser.add_argument("--motion-threshold", type=float, default=2.5,
+                        help="Ortalama gri fark bu değerin altındaysa inference atlanır (0 = kapalı)")
+    parser.add_argument("--motion-max-age", type=float, default=0.5,
+                        help="Durağan sahnede bile en fazla bu kadar saniyede bir yeniden tespit")
+    args = parser.parse_args()
+    
+    # Çoklu kaynak penceresi tek kaynak hattının bu özelliklerini desteklemez
+    if args.source and len(args.source) > 1:
+        unsupported = [
+            flag for dest, flag in _SINGLE_SOURCE_OPTIONS.items()
+            if getattr(args, dest) != parser.get_default(dest)
+        ]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} sadece tek kaynakla kullanılabilir")
+    return args
+
+
 def main():
+    args = _parse_args()
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     
-    window = MonkeyPoseApp()
+    sources = args.source or ["0"]
+    if len(sources) > 1:
+        window = MultiStreamApp(
+            sources,
+            detector_options=detector_options_from_args(args),
+            workers=args.workers,
+            smoothing=args.smoothing,
+            use_opengl=args.use_opengl,
+            realtime=args.realtime,
+            loop=args.loop,
+        )
+        window.show()
+        sys.exit(app.exec_())
+    
+    window = MonkeyPoseApp(
+        detector_options=detector_options_from_args(args),
+        render_overlay=args.render_overlay,
+        overlay_every=args.overlay_every,
+        use_opengl=args.use_opengl,
+        smoothing=args.smoothing,
+        latency_budget=args.latency_budget,
+        motion_threshold=args.motion_threshold,
+        motion_max_age=args.motion_max_age,
+        source=sources[0],
+        record=args.record,
+        realtime=args.realtime,
+        loop=args.loop,
+        metrics_port=args.metrics_port,
+        metrics_log=args.metrics_log,
+        metrics_interval=args.metrics_interval,
+        show_hud=args.show_hud,
+    )
     window.show()
     
     sys.exit(app.exec_())
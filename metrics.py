@@ -0,0 +1,247 @@
+"""
+Metrics Module
+Aşama süreleri için histogramlar, frame / düşürme / etiket geçişi sayaçları;
+Prometheus metin formatında yerel HTTP uç noktası ve periyodik JSON anlık görüntü
+"""
+
+import bisect
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+PREFIX = "monkey_pose_"
+
+# Saniye cinsinden kova sınırları (1 ms - 1 s)
+DEFAULT_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.035, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0)
+
+
+def _escape(text, quotes=True):
+    """Prometheus metin formatı kaçışları - ters bölü, satır sonu ve (etiket değerlerinde) tırnak"""
+    text = str(text).replace("\\", "\\\\").replace("\n", "\\n")
+    return text.replace('"', '\\"') if quotes else text
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class Counter:
+    """Monoton artan sayaç"""
+
+    kind = "counter"
+    # Örnekler ve TYPE / HELP satırları aynı adı (..._total) taşır
+    suffix = "_total"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        return [(f"{name}{_label_text(labels)}", self.value)]
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """Anlık değer (ör. FPS)"""
+
+    kind = "gauge"
+    suffix = ""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self, name, labels):
+        return [(f"{name}{_label_text(labels)}", self.value)]
+
+    def snapshot(self):
+        return self.value
+
+
+class Histogram:
+    """Kovalı süre histogramı
+
+    Prometheus için toplam kova sayıları, HUD için son `window` ölçümün
+    yüzdelikleri tutulur.
+    """
+
+    kind = "histogram"
+    suffix = ""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=256):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._recent = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._recent.append(value)
+            self.count += 1
+            self.sum += value
+
+    def recent_quantiles(self, quantiles=(50, 95)):
+        """Son ölçümlerin yüzdelikleri (ölçüm yoksa NaN)"""
+        with self._lock:
+            recent = list(self._recent)
+        if not recent:
+            return [float('nan')] * len(quantiles)
+        return [float(value) for value in np.percentile(recent, quantiles)]
+
+    def samples(self, name, labels):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float('inf') else repr(bound)
+            lines.append((f"{name}_bucket{_label_text(labels + (('le', le),))}", cumulative))
+        lines.append((f"{name}_sum{_label_text(labels)}", total))
+        lines.append((f"{name}_count{_label_text(labels)}", count))
+        return lines
+
+    def snapshot(self):
+        p50, p95 = self.recent_quantiles()
+        return {
+            'count': self.count,
+            'mean_ms': self.sum / self.count * 1000.0 if self.count else None,
+            'p50_ms': None if np.isnan(p50) else p50 * 1000.0,
+            'p95_ms': None if np.isnan(p95) else p95 * 1000.0,
+        }
+
+
+class MetricsRegistry:
+    """İsim + etiket kümesine göre metrik deposu (aynı anahtar aynı nesneyi döner)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._help = {}
+
+    def counter(self, name, help_text="", **labels):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", **labels):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", **labels):
+        return self._get(Histogram, name, help_text, labels)
+
+    def _get(self, cls, name, help_text, labels):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = cls()
+                    self._help.setdefault(name, help_text)
+        return metric
+
+    def items(self):
+        with self._lock:
+            return sorted(self._metrics.items(), key=lambda item: item[0])
+
+    def render_prometheus(self):
+        """Prometheus metin formatı (0.0.4)"""
+        lines = []
+        seen = set()
+        for (name, labels), metric in self.items():
+            full_name = PREFIX + name + metric.suffix
+            if name not in seen:
+                seen.add(name)
+                if self._help.get(name):
+                    lines.append(f"# HELP {full_name} {_escape(self._help[name], quotes=False)}")
+                lines.append(f"# TYPE {full_name} {metric.kind}")
+            lines.extend(f"{sample} {value}" for sample, value in metric.samples(full_name, labels))
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """JSON'a yazılabilir dict: {"isim{etiket=değer}": değer}"""
+        return {
+            name + _label_text(labels): metric.snapshot()
+            for (name, labels), metric in self.items()
+        }
+
+
+class MetricsServer:
+    """Yerel /metrics uç noktası (daemon thread'de http.server)"""
+
+    def __init__(self, registry, port=9464, host="127.0.0.1"):
+        self.registry = registry
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class SnapshotLogger:
+    """Belirli aralıklarla registry anlık görüntüsünü JSONL dosyasına ekler"""
+
+    def __init__(self, registry, path, interval=10.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-log", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(self.interval)
+        self.write()
+
+    def write(self):
+        record = {'time': time.time(), 'metrics': self.registry.snapshot()}
+        with open(self.path, "a", encoding="utf-8") as stream:
+            stream.write(json.dumps(record) + "\n")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
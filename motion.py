@@ -0,0 +1,65 @@
+"""
+Motion Gate Module
+Küçültülmüş gri frame farkıyla hareket ölçer; sahne durağanken inference
+atlanır ve önceki sonuç kullanılır
+"""
+
+import time
+
+import cv2
+
+
+class MotionGate:
+    """PoseDetector önünde ucuz hareket kapısı
+
+    threshold: son inference yapılan frame'e göre ortalama mutlak gri fark
+               (0-255); altında kalan frame'lerde inference atlanır
+    max_age:   sahne durağan olsa da en fazla bu kadar saniyede bir yenileme
+    size:      karşılaştırma çözünürlüğü (genişlik, yükseklik)
+
+    Fark bir önceki frame'e değil son inference frame'ine göre hesaplanır;
+    yavaş hareketler birikir ve eninde sonunda eşiği geçer.
+    """
+
+    def __init__(self, threshold=2.5, max_age=0.5, size=(64, 48)):
+        if threshold < 0:
+            raise ValueError("Hareket eşiği negatif olamaz")
+        self.threshold = threshold
+        self.max_age = max_age
+        self.size = size
+
+        self.last_score = 0.0
+        self.counters = {'ran': 0, 'reused': 0}
+        self._gray = None
+        self._small = None
+        self._diff = None
+        self.reset()
+
+    def reset(self):
+        """Referans frame'i unutur - sonraki frame her zaman işlenir"""
+        self._reference = None
+        self._reference_at = None
+
+    def should_run(self, rgb_frame, timestamp=None):
+        """Frame için inference gerekiyorsa True döner (ve referansı günceller)"""
+        now = time.monotonic() if timestamp is None else timestamp
+        self._gray = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY, dst=self._gray)
+        self._small = cv2.resize(self._gray, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+
+        if self._reference is None or now - self._reference_at >= self.max_age:
+            self.last_score = float('inf')
+        else:
+            self._diff = cv2.absdiff(self._small, self._reference, dst=self._diff)
+            self.last_score = float(self._diff.mean())
+            if self.last_score < self.threshold:
+                self.counters['reused'] += 1
+                return False
+
+        # Referans buffer'ı yeniden kullanılır, frame başına ayırma yok
+        if self._reference is None:
+            self._reference = self._small.copy()
+        else:
+            self._reference[:] = self._small
+        self._reference_at = now
+        self.counters['ran'] += 1
+        return True
@@ -0,0 +1,391 @@
+"""
+ONNX Backend Module
+MediaPipe'ın pose / hand / face landmark modellerini ONNX Runtime ile CPU'da
+çalıştıran isteğe bağlı backend (int8 nicemleme, intra-op thread sayısı, toplu çalışma)
+
+MediaPipe graph'larındaki detector (palm / face detection) modelleri yoktur:
+pose modeli tüm frame'in kare (letterbox) kırpıntısında çalışır, yüz ve el
+kırpıntıları aynı frame'in pose landmark'larından çıkarılır. Sonuçlar
+landmark_pb2 listelerine çevrilir; kurallar ve çizim değişmeden çalışır.
+
+Modeller `models/` klasöründe beklenir (MediaPipe dosya adlarıyla):
+    pose_landmark_{lite,full,heavy}.onnx   model_complexity 0 / 1 / 2
+    hand_landmark_{lite,full}.onnx         model_complexity 0 / 1
+    face_landmark.onnx                     468 nokta (iris noktaları yok)
+
+Kullanım:
+    python onnx_backend.py export                 # mediapipe paketindeki .tflite → .onnx (tf2onnx gerekir)
+    python onnx_backend.py quantize               # *.onnx → *.int8.onnx (dinamik int8)
+    python main.py --backend onnx --onnx-threads 2 --onnx-int8
+
+Toplu çalışmada (`process_batch`) her model frame / kırpıntı grubunu tek
+çağrıda işler; export edilen modelin batch boyutu sabit 1 ise kırpıntılar
+sırayla çalıştırılır.
+"""
+
+import argparse
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+
+MODELS_DIR = Path(__file__).parent / "models"
+
+MODEL_FILES = {
+    "pose": ("pose_landmark_lite", "pose_landmark_full", "pose_landmark_heavy"),
+    "hands": ("hand_landmark_lite", "hand_landmark_full"),
+    "face": ("face_landmark",),
+}
+
+# mediapipe paketindeki kaynak .tflite dosyaları (export için)
+TFLITE_DIRS = {"pose": "pose_landmark", "hands": "hand_landmark", "face": "face_landmark"}
+
+# Pose landmark indeksleri (MediaPipe Pose 33 nokta)
+FACE_POSE_INDICES = list(range(0, 11))
+HAND_POSE_INDICES = {"left": (15, 17, 19), "right": (16, 18, 20)}  # bilek, serçe, işaret
+
+MIN_CROP_SIDE = 16
+
+
+def _sigmoid(values):
+    return 1.0 / (1.0 + np.exp(-values))
+
+
+def _landmark_pb2():
+    """mediapipe protobuf sınıfları ilk sonuç oluşturulurken yüklenir"""
+    from mediapipe.framework.formats import landmark_pb2
+    return landmark_pb2
+
+
+class LandmarkModel:
+    """Tek ONNX landmark modeli - kare kırpıntılardan (N, nokta, değer) landmark'lar
+
+    points / values: çıktıdaki nokta sayısı ve nokta başına değer (x, y, z, ...)
+    flag_logits:     varlık çıktısı logit ise True (sigmoid uygulanır)
+
+    Çıktılar isimle değil boyutla bulunur (tf2onnx isimleri export'a göre değişir):
+    örnek başına points * values elemanlı çıktı landmark'lar, 1 elemanlı ilk
+    çıktı varlık skorudur.
+    """
+
+    def __init__(self, ort, path, points, values, session_options, flag_logits=False):
+        self.path = Path(path)
+        self.points = points
+        self.values = values
+        self.flag_logits = flag_logits
+        self.session = ort.InferenceSession(str(self.path), session_options, providers=["CPUExecutionProvider"])
+
+        model_input = self.session.get_inputs()[0]
+        shape = model_input.shape
+        self.input_name = model_input.name
+        self.channels_first = shape[1] == 3
+        self.size = int(shape[-1] if self.channels_first else shape[2])
+        # Sembolik veya 1'den farklı batch boyutu → tek çağrıda toplu çalışma
+        self.batched = not (isinstance(shape[0], int) and shape[0] == 1)
+        self._landmark_output = None
+        self._flag_output = None
+
+    def run(self, crops):
+        """uint8 (N, boyut, boyut, 3) RGB kırpıntılar → (landmark'lar (N, nokta, değer), skorlar (N,))"""
+        tensor = crops.astype(np.float32)
+        tensor *= 1.0 / 255.0
+        if self.channels_first:
+            tensor = tensor.transpose(0, 3, 1, 2)
+        if self.batched:
+            outputs = self.session.run(None, {self.input_name: tensor})
+        else:
+            runs = [self.session.run(None, {self.input_name: tensor[index:index + 1]}) for index in range(len(tensor))]
+            outputs = [np.concatenate(parts) for parts in zip(*runs)]
+
+        if self._landmark_output is None:
+            self._find_outputs(outputs, len(crops))
+        landmarks = outputs[self._landmark_output].reshape(len(crops), self.points, self.values)
+        flags = outputs[self._flag_output].reshape(len(crops))
+        if self.flag_logits:
+            flags = _sigmoid(flags)
+        return landmarks, flags
+
+    def _find_outputs(self, outputs, count):
+        sizes = [output.size // count for output in outputs]
+        try:
+            self._landmark_output = sizes.index(self.points * self.values)
+            self._flag_output = sizes.index(1)
+        except ValueError:
+            raise RuntimeError(
+                f"{self.path.name}: beklenen çıktılar bulunamadı "
+                f"({self.points}x{self.values} landmark ve 1 skor; çıktı boyutları {sizes})"
+            ) from None
+
+
+class OnnxBackend:
+    """ONNX Runtime ile pose, hands ve face landmark modelleri
+
+    Modeller `models` içinden tek başına çağrılabilir (paralel mod).
+    Ayrı çağrıldığında yüz ve el kırpıntıları son çalışan pose sonucundan
+    alınır: serial modda aynı frame'in, paralel modda önceki frame'in pose'u.
+    `process_batch` her frame'i kendi pose'uyla kırpar.
+
+    Lazy mod desteklenmez: lazy önce elleri çalıştırır, el kırpıntısı ise
+    pose olmadan çıkarılamaz - pose hiç çalışmaz, hiçbir şey bulunmaz.
+    """
+
+    name = "onnx"
+    supports_split = True
+    supports_roi = False
+    supports_lazy = False
+
+    def __init__(self, model_complexity=1, refine_landmarks=True, static_image_mode=False, max_people=1,
+                 min_confidence=0.5, model_dir=None, threads=0, int8=False, face_scale=1.6, hand_scale=2.6):
+        if max_people > 1:
+            raise ValueError("onnx backend'i tek kişiliktir (max_people=1)")
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:
+            raise RuntimeError("onnx backend'i için onnxruntime gerekli: pip install onnxruntime") from exc
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        paths = {model: _model_path(path, int8) for model, path in
+                 model_paths(model_complexity, model_dir, int8).items()}
+        # Pose: 39 nokta x (x, y, z, görünürlük, varlık) - ilk 33'ü gerçek landmark
+        self.pose_model = LandmarkModel(ort, paths["pose"], 39, 5, options)
+        self.hand_model = LandmarkModel(ort, paths["hands"], 21, 3, options)
+        self.face_model = LandmarkModel(ort, paths["face"], 468, 3, options, flag_logits=True)
+
+        self.min_confidence = min_confidence
+        self.face_scale = face_scale
+        self.hand_scale = hand_scale
+        self._pose_points = None
+        self.models = {
+            "pose": self._process_pose,
+            "hands": self._process_hands,
+            "face": self._process_face,
+        }
+
+    def process(self, rgb_frame):
+        return self.process_batch([rgb_frame])[0]
+
+    def process_batch(self, rgb_frames):
+        """Frame listesi için (pose, hands, face) sonuç listesi - her model tek toplu çağrı"""
+        poses = self._run_pose(rgb_frames)
+        face_boxes = [self._face_box(points, frame.shape) for points, frame in zip(poses, rgb_frames)]
+        hand_boxes = [self._hand_boxes(points, frame.shape) for points, frame in zip(poses, rgb_frames)]
+        faces = self._run_crops(self.face_model, rgb_frames, [[box] if box else [] for box in face_boxes])
+        hands = self._run_crops(self.hand_model, rgb_frames, hand_boxes)
+        if poses:
+            self._pose_points = poses[-1]
+        return [
+            (
+                SimpleNamespace(pose_landmarks=_landmark_list(points)),
+                SimpleNamespace(multi_hand_landmarks=[_landmark_list(p) for p in frame_hands] or None,
+                                multi_handedness=None),
+                SimpleNamespace(multi_face_landmarks=[_landmark_list(p) for p in frame_faces] or None),
+            )
+            for points, frame_hands, frame_faces in zip(poses, hands, faces)
+        ]
+
+    def reset(self):
+        """Kırpıntıların dayandığı son pose'u unutur"""
+        self._pose_points = None
+
+    def release(self):
+        # InferenceSession'ların kapatma çağrısı yok, referans bırakılınca serbest kalır
+        self.pose_model = self.hand_model = self.face_model = None
+
+    def _process_pose(self, rgb_frame):
+        points = self._run_pose([rgb_frame])[0]
+        self._pose_points = points
+        return SimpleNamespace(pose_landmarks=_landmark_list(points))
+
+    def _process_hands(self, rgb_frame):
+        boxes = self._hand_boxes(self._pose_points, rgb_frame.shape)
+        hands = self._run_crops(self.hand_model, [rgb_frame], [boxes])[0]
+        return SimpleNamespace(multi_hand_landmarks=[_landmark_list(p) for p in hands] or None,
+                               multi_handedness=None)
+
+    def _process_face(self, rgb_frame):
+        box = self._face_box(self._pose_points, rgb_frame.shape)
+        faces = self._run_crops(self.face_model, [rgb_frame], [[box] if box else []])[0]
+        return SimpleNamespace(multi_face_landmarks=[_landmark_list(p) for p in faces] or None)
+
+    def _run_pose(self, rgb_frames):
+        """Tüm frame'in kare kırpıntısında pose - frame başına (33, 4) normalize nokta veya None"""
+        boxes = []
+        for frame in rgb_frames:
+            height, width = frame.shape[:2]
+            side = max(width, height)
+            boxes.append([((width - side) / 2.0, (height - side) / 2.0, side)])
+        return [people[0] if people else None for people in self._run_crops(self.pose_model, rgb_frames, boxes)]
+
+    def _run_crops(self, model, rgb_frames, boxes):
+        """Frame başına kutu listesi → frame başına normalize nokta dizileri listesi
+
+        Tüm frame'lerin tüm kırpıntıları tek (N, boyut, boyut, 3) dizisinde toplanır.
+        Kutular (x0, y0, kenar) piksel cinsinden; frame dışına taşan kısım siyah doldurulur.
+        """
+        total = sum(len(frame_boxes) for frame_boxes in boxes)
+        results = [[] for _ in rgb_frames]
+        if total == 0:
+            return results
+
+        size = model.size
+        crops = np.empty((total, size, size, 3), dtype=np.uint8)
+        owners = []
+        index = 0
+        for frame_index, (frame, frame_boxes) in enumerate(zip(rgb_frames, boxes)):
+            for x0, y0, side in frame_boxes:
+                scale = size / side
+                matrix = np.array([[scale, 0.0, -x0 * scale], [0.0, scale, -y0 * scale]], dtype=np.float32)
+                cv2.warpAffine(frame, matrix, (size, size), dst=crops[index], flags=cv2.INTER_LINEAR,
+                               borderMode=cv2.BORDER_CONSTANT)
+                owners.append((frame_index, x0, y0, side, frame.shape))
+                index += 1
+
+        landmarks, flags = model.run(crops)
+        for (frame_index, x0, y0, side, shape), points, flag in zip(owners, landmarks, flags):
+            if flag < self.min_confidence:
+                continue
+            height, width = shape[:2]
+            # Kırpıntı pikseli → frame'e göre normalize (z, x ile aynı ölçekte)
+            scale = side / size
+            mapped = np.empty((points.shape[0], 4), dtype=np.float32)
+            mapped[:, 0] = (x0 + points[:, 0] * scale) / width
+            mapped[:, 1] = (y0 + points[:, 1] * scale) / height
+            mapped[:, 2] = points[:, 2] * scale / width
+            mapped[:, 3] = _sigmoid(points[:, 3]) if points.shape[1] > 3 else 1.0
+            results[frame_index].append(mapped)
+        return results
+
+    def _face_box(self, pose_points, frame_shape):
+        """Pose'un yüz noktalarından (burun, gözler, kulaklar, ağız) kare yüz kutusu"""
+        if pose_points is None:
+            return None
+        points = pose_points[FACE_POSE_INDICES]
+        points = points[points[:, 3] >= self.min_confidence]
+        if len(points) < 3:
+            return None
+        return _square_box(points[:, :2], self.face_scale, frame_shape)
+
+    def _hand_boxes(self, pose_points, frame_shape):
+        """Pose'un bilek / serçe / işaret noktalarından el başına kare kutu"""
+        if pose_points is None:
+            return []
+        boxes = []
+        for indices in HAND_POSE_INDICES.values():
+            points = pose_points[list(indices)]
+            if (points[:, 3] < self.min_confidence).any():
+                continue
+            box = _square_box(points[:, :2], self.hand_scale, frame_shape)
+            if box is not None:
+                boxes.append(box)
+        return boxes
+
+
+def _square_box(points, scale, frame_shape):
+    """Normalize noktaları kapsayan ölçeklenmiş kare kutu (x0, y0, kenar) piksel; çok küçükse None"""
+    height, width = frame_shape[:2]
+    pixels = points * (width, height)
+    low = pixels.min(axis=0)
+    high = pixels.max(axis=0)
+    side = float((high - low).max()) * scale
+    if side < MIN_CROP_SIDE:
+        return None
+    center = (low + high) / 2.0
+    return float(center[0] - side / 2.0), float(center[1] - side / 2.0), side
+
+
+def _landmark_list(points):
+    """(nokta, 4) normalize dizi → NormalizedLandmarkList (pose'ta fazladan 6 nokta atılır)"""
+    if points is None:
+        return None
+    landmark_pb2 = _landmark_pb2()
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    count = 33 if len(points) == 39 else len(points)
+    for x, y, z, visibility in points[:count].tolist():
+        landmark_list.landmark.add(x=x, y=y, z=z, visibility=visibility)
+    return landmark_list
+
+
+def model_paths(model_complexity=1, model_dir=None, int8=False):
+    """Ayarların kullandığı model dosyaları: model → yol (var olmayabilir)"""
+    model_dir = Path(model_dir) if model_dir else MODELS_DIR
+    suffix = ".int8.onnx" if int8 else ".onnx"
+    return {
+        "pose": model_dir / f"{MODEL_FILES['pose'][model_complexity]}{suffix}",
+        "hands": model_dir / f"{MODEL_FILES['hands'][min(model_complexity, 1)]}{suffix}",
+        "face": model_dir / f"face_landmark{suffix}",
+    }
+
+
+def _model_path(path, int8):
+    if not path.exists():
+        hint = "python onnx_backend.py quantize" if int8 else "python onnx_backend.py export"
+        raise RuntimeError(f"ONNX modeli bulunamadı: {path} ({hint})")
+    return path
+
+
+def export_models(model_dir=MODELS_DIR):
+    """mediapipe paketindeki landmark .tflite dosyalarını tf2onnx ile .onnx'e çevirir"""
+    spec = importlib.util.find_spec("mediapipe")
+    if spec is None:
+        raise RuntimeError("mediapipe bulunamadı")
+    modules_dir = Path(spec.submodule_search_locations[0]) / "modules"
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+
+    exported = []
+    for model, stems in MODEL_FILES.items():
+        for stem in stems:
+            source = modules_dir / TFLITE_DIRS[model] / f"{stem}.tflite"
+            if not source.exists():
+                # lite / heavy pose modelleri mediapipe tarafından ilk kullanımda indirilir
+                print(f"Uyarı: {source.name} bulunamadı, atlanıyor")
+                continue
+            target = model_dir / f"{stem}.onnx"
+            subprocess.run(
+                [sys.executable, "-m", "tf2onnx.convert", "--tflite", str(source), "--output", str(target)],
+                check=True,
+            )
+            exported.append(target)
+    return exported
+
+
+def quantize_models(model_dir=MODELS_DIR):
+    """Klasördeki her .onnx modelinin dinamik int8 nicemlenmiş kopyasını (.int8.onnx) yazar"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantized = []
+    for path in sorted(Path(model_dir).glob("*.onnx")):
+        if path.name.endswith(".int8.onnx"):
+            continue
+        target = path.with_name(path.stem + ".int8.onnx")
+        quantize_dynamic(str(path), str(target), weight_type=QuantType.QInt8)
+        quantized.append(target)
+    return quantized
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ONNX landmark modellerini hazırla")
+    parser.add_argument("command", choices=("export", "quantize"),
+                        help="export: .tflite → .onnx, quantize: .onnx → .int8.onnx")
+    parser.add_argument("--models", default=str(MODELS_DIR), help="Model klasörü")
+    args = parser.parse_args(argv)
+
+    paths = export_models(args.models) if args.command == "export" else quantize_models(args.models)
+    for path in paths:
+        print(f"{path} ({path.stat().st_size / 1e6:.1f} MB)")
+    if not paths:
+        print("Uyarı: hiç model işlenmedi")
+
+
+if __name__ == "__main__":
+    main()
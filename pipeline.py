@@ -0,0 +1,299 @@
+"""
+Frame Pipeline Module
+Kamera okuma, pose inference ve GUI teslimini ayrı thread'lere böler
+"""
+
+import dataclasses
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class BufferPool:
+    """Önceden ayrılmış numpy frame buffer havuzu
+
+    Her frame için yeni dizi ayırmak yerine serbest bırakılan buffer'lar
+    tekrar kullanılır; havuz sadece aynı anda kullanımda olan buffer
+    sayısı kadar büyür.
+    """
+
+    def __init__(self):
+        self._free = []
+        self._lock = threading.Lock()
+        self.allocated = 0
+
+    def acquire(self, shape):
+        """Verilen boyutta boş bir buffer döner (gerekirse yeni ayırır)"""
+        with self._lock:
+            while self._free:
+                buffer = self._free.pop()
+                if buffer.shape == shape:
+                    return buffer
+            self.allocated += 1
+        return np.empty(shape, dtype=np.uint8)
+
+    def release(self, buffer):
+        if buffer is None:
+            return
+        with self._lock:
+            self._free.append(buffer)
+
+
+class FrameRing:
+    """Sabit boyutlu, en eskiyi atan frame kuyruğu - her zaman en yeni frame'ler tutulur
+
+    `on_drop` verilirse düşürülen öğeler ona iletilir (buffer'ı havuza iade için).
+    """
+
+    def __init__(self, size=1, on_drop=None):
+        if size < 1:
+            raise ValueError("FrameRing boyutu en az 1 olmalı")
+        self._items = deque(maxlen=size)
+        self._cond = threading.Condition()
+        self._on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        """Frame ekler, kuyruk doluysa en eski frame düşürülür"""
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+                if self._on_drop is not None:
+                    self._on_drop(self._items[0])
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """En eski bekleyen frame'i döner, zaman aşımında None"""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def clear(self):
+        with self._cond:
+            if self._on_drop is not None:
+                for item in self._items:
+                    self._on_drop(item)
+            self._items.clear()
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class PipelineStats:
+    """Aşama bazlı sayaçlar: işlenen frame, düşürülen frame, kuyruk derinliği"""
+
+    def __init__(self, capture_ring, result_ring):
+        self._capture_ring = capture_ring
+        self._result_ring = result_ring
+        self._lock = threading.Lock()
+        self.captured = 0
+        self.inferred = 0
+        self.reused = 0
+        self.delivered = 0
+        self.read_failures = 0
+        self.last_latency = 0.0
+
+    def add(self, field, value=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + value)
+
+    def snapshot(self):
+        """Anlık sayaçları dict olarak döner"""
+        with self._lock:
+            return {
+                'captured': self.captured,
+                'inferred': self.inferred,
+                'reused': self.reused,
+                'delivered': self.delivered,
+                'read_failures': self.read_failures,
+                'capture_queue': len(self._capture_ring),
+                'capture_dropped': self._capture_ring.dropped,
+                'result_queue': len(self._result_ring),
+                'result_dropped': self._result_ring.dropped,
+                'latency_ms': self.last_latency * 1000.0,
+            }
+
+
+class FramePipeline:
+    """Capture → inference → teslim hattı
+
+    Capture thread'i kamerayı sürekli boşaltır ve sadece en yeni frame'leri
+    tutar; inference thread'i en güncel frame'i işler ve sonucu `on_result`
+    callback'i ile iletir (GUI tarafında bu bir Qt sinyalidir).
+
+    Sonuçlar (rgb_frame, DetectionResult) çiftidir; frame tek seferde RGB'ye
+    çevrilir, overlay varsa doğrudan RGB buffer'a çizilir. Kamera ve RGB
+    frame'leri havuzdan gelir: gösterimi biten RGB buffer `release_frame`
+    ile iade edilmelidir.
+
+    `frame_interval` iki inference arasındaki en kısa süredir (saniye).
+    `governor` verilirse (bkz. governor.AdaptiveGovernor) her frame'in işleme
+    süresi ölçülür ve seviye değiştikçe detector ile bu aralık güncellenir;
+    başlangıç ayarları seviye 0'dır, bütçe aşılmadıkça değiştirilmez.
+
+    `motion_gate` verilirse (bkz. motion.MotionGate) durağan sahnede inference
+    atlanır, son tespit sonucu yeni frame için yeniden kullanılır.
+
+    `metrics` verilirse (bkz. metrics.MetricsRegistry) kamera okuma, model /
+    kural / çizim aşamaları, frame ve uçtan uca süreler histograma; frame,
+    düşürme ve etiket geçişleri sayaçlara yazılır.
+    """
+
+    def __init__(self, camera, detector, on_result, renderer=None, stabilizer=None, capture_depth=1,
+                 result_depth=1, mirror=True, governor=None, frame_interval=0.0,
+                 motion_gate=None, metrics=None):
+        self.camera = camera
+        self.detector = detector
+        self.renderer = renderer
+        self.stabilizer = stabilizer
+        self.on_result = on_result
+        self.mirror = mirror
+        self.frame_interval = frame_interval
+        self.governor = governor
+        self.motion_gate = motion_gate
+        self._last_detection = None
+        if governor is not None:
+            governor.attach(detector, self)
+
+        # Kamera (BGR) ve gösterim (RGB) buffer havuzları
+        self.capture_pool = BufferPool()
+        self.rgb_pool = BufferPool()
+        self._frame_shape = None
+
+        self.metrics = metrics
+        self._last_label = None
+        self.capture_ring = FrameRing(capture_depth, on_drop=self._drop_capture)
+        self.result_ring = FrameRing(result_depth, on_drop=self._drop_result)
+        self.stats = PipelineStats(self.capture_ring, self.result_ring)
+
+        self._running = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._running.is_set():
+            return
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        self._running.clear()
+        self.capture_ring.clear()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def take_result(self):
+        """GUI thread'inde çağrılır - bekleyen en yeni sonucu döner (yoksa None)"""
+        result = self.result_ring.get(timeout=0)
+        if result is not None:
+            self.stats.add('delivered')
+        return result
+
+    def release_frame(self, rgb_frame):
+        """Gösterimi biten RGB buffer'ı havuza iade eder"""
+        self.rgb_pool.release(rgb_frame)
+
+    def _drop_capture(self, item):
+        self.capture_pool.release(item[1])
+        if self.metrics is not None:
+            self.metrics.counter('frames_dropped', "Düşürülen frame", queue="capture").inc()
+
+    def _drop_result(self, item):
+        self.rgb_pool.release(item[0])
+        if self.metrics is not None:
+            self.metrics.counter('frames_dropped', "Düşürülen frame", queue="result").inc()
+
+    def _capture_loop(self):
+        while self._running.is_set():
+            # İlk frame'den sonra kamera doğrudan havuzdaki buffer'a okur
+            buffer = self.capture_pool.acquire(self._frame_shape) if self._frame_shape else None
+            read_started = time.perf_counter()
+            ret, frame = self.camera.read(buffer)
+            if not ret:
+                self.capture_pool.release(buffer)
+                self.stats.add('read_failures')
+                time.sleep(0.01)
+                continue
+            if frame is not buffer:
+                # Kamera yeni dizi ayırdı (ilk frame / çözünürlük değişti)
+                self.capture_pool.release(buffer)
+                self._frame_shape = frame.shape
+            captured_at = time.perf_counter()
+            if self.metrics is not None:
+                self.metrics.histogram('capture_seconds', "Kamera okuma süresi").observe(captured_at - read_started)
+                self.metrics.counter('frames', "Frame sayısı", stage="captured").inc()
+            self.capture_ring.put((captured_at, frame))
+            self.stats.add('captured')
+
+    def _inference_loop(self):
+        next_inference = 0.0
+        while self._running.is_set():
+            # Frame aralığı dolana kadar beklenir; sonra en yeni frame alınır
+            wait = next_inference - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            item = self.capture_ring.get(timeout=0.1)
+            if item is None:
+                continue
+            captured_at, frame = item
+            started = time.perf_counter()
+            next_inference = started + self.frame_interval
+
+            # Tek renk dönüşümü, ayna efekti RGB buffer üzerinde yerinde
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb_pool.acquire(frame.shape))
+            self.capture_pool.release(frame)
+            if self.mirror:
+                cv2.flip(rgb_frame, 1, dst=rgb_frame)
+
+            detected = self._last_detection is None or self.motion_gate is None \
+                or self.motion_gate.should_run(rgb_frame, captured_at)
+            if detected:
+                result = self._last_detection = self.detector.detect(rgb_frame, is_rgb=True)
+            else:
+                # Stabilizer etiketi yerinde değiştirdiği için ham etiketli kopya
+                last = self._last_detection
+                result = dataclasses.replace(last, pose_name=last.raw_pose_name)
+            if self.stabilizer is not None:
+                self.stabilizer.apply(result, captured_at)
+            if self.renderer is not None:
+                self.renderer.render(rgb_frame, result)
+            self.stats.add('inferred' if detected else 'reused')
+            finished = time.perf_counter()
+            self.stats.last_latency = finished - captured_at
+            # Atlanan frame'ler governor'ı yanıltmasın diye ölçülmez
+            if detected and self.governor is not None and self.governor.observe(finished - started):
+                self.governor.apply(self.detector, self)
+            if self.metrics is not None:
+                self._record_metrics(result, detected, finished - started, finished - captured_at)
+
+            self.result_ring.put((rgb_frame, result))
+            self.on_result()
+
+
+    def _record_metrics(self, result, detected, frame_time, latency):
+        metrics = self.metrics
+        metrics.counter('frames', "Frame sayısı", stage="inferred" if detected else "reused").inc()
+        metrics.histogram('frame_seconds', "Frame işleme süresi").observe(frame_time)
+        metrics.histogram('latency_seconds', "Kamera okumadan sonuca kadar gecikme").observe(latency)
+        stages = dict(self.detector.stage_timings) if detected else {}
+        if self.renderer is not None:
+            stages.update(self.renderer.timings)
+        for stage, seconds in stages.items():
+            metrics.histogram('stage_seconds', "Aşama süresi (model, kural, çizim)", stage=stage).observe(seconds)
+        if self._last_label is not None and result.pose_name != self._last_label:
+            metrics.counter('label_transitions', "Poz etiketi geçişleri",
+                            source=self._last_label, target=result.pose_name).inc()
+        self._last_label = result.pose_name
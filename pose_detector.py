@@ -3,44 +3,397 @@ Pose Detection Module
 MediaPipe ile pose, hand ve face detection
 """
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
 import cv2
-import mediapipe as mp
 import numpy as np
 
+from onnx_backend import OnnxBackend
+from gestures import load_gestures
+from landmarks import LandmarkArrays, person_box
+from renderer import PoseRenderer
+from roi import RoiTracker
 
-class PoseDetector:
-    """MediaPipe ile pose algılama - 4 poz: el kaldırma, şaşırma, düşünme, varsayılan"""
+
+def _solutions():
+    """mediapipe ilk graph oluşturulurken yüklenir - modül importu açılışı yavaşlatmaz"""
+    import mediapipe as mp
+    return mp.solutions
+
+
+EXECUTION_MODES = ("serial", "parallel", "lazy")
+
+# Lazy modda eksik grupların çalıştırılma sırası: eller en ucuz kapı, FaceMesh en pahalı
+LAZY_ORDER = ("hands", "pose", "face")
+
+# Çalıştırılmayan model yerine kullanılan boş sonuç
+_EMPTY_RESULTS = SimpleNamespace(
+    pose_landmarks=None,
+    multi_hand_landmarks=None,
+    multi_handedness=None,
+    multi_face_landmarks=None,
+)
+
+
+@dataclass
+class PersonResult:
+    """Çok kişili modda tek kişinin etiketi, metrikleri ve normalize kutusu"""
+    
+    pose_name: str
+    metrics: dict
+    landmarks: LandmarkArrays
+    box: tuple = None
+    raw_pose_name: str = None
+    confidences: dict = field(default_factory=dict)
+
+
+@dataclass
+class DetectionResult:
+    """Tek frame için saf tespit sonucu - frame'e dokunulmaz
+    
+    Üst düzey alanlar birincil kişiye (pose sahibi) aittir; `people` frame'deki
+    tüm kişileri soldan sağa içerir, `primary` birincil kişinin indeksidir.
+    """
+    
+    pose_name: str
+    pose_results: object
+    hand_results: object
+    face_results: object
+    landmarks: LandmarkArrays = None
+    metrics: dict = field(default_factory=dict)
+    # PoseStabilizer uygulanınca: frame'in ham etiketi ve etiket güvenleri
+    raw_pose_name: str = None
+    confidences: dict = field(default_factory=dict)
+    debug_info: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    people: list = field(default_factory=list)
+    primary: int = 0
+
+
+class ModelScheduler:
+    """Model zamanlayıcı (lazy mod ve model aralıkları için)
+    
+    Karar için gerekmeyen modeller atlanır (boş sonuç, sadece lazy mod),
+    modeller `intervals` ile her N frame'de bir çalıştırılır; arada son
+    sonuç yeniden kullanılır. Her model için ran / skipped / reused sayaçları tutulur.
+    """
+    
+    MODELS = ("pose", "hands", "face")
+    
+    def __init__(self, intervals=None):
+        self.counters = {model: {'ran': 0, 'skipped': 0, 'reused': 0} for model in self.MODELS}
+        self.set_intervals(intervals)
+        self._frame_index = 0
+        self._last_results = {}
+        self._last_run = {}
+    
+    def set_intervals(self, intervals):
+        """Aralıkları değiştirir; verilmeyen modeller her frame çalışır"""
+        self.intervals = {model: 1 for model in self.MODELS}
+        self.intervals.update(intervals or {})
+    
+    def begin_frame(self):
+        self._frame_index += 1
     
-    def __init__(self):
-        # MediaPipe modüllerini başlat
-        self.mp_pose = mp.solutions.pose
-        self.mp_hands = mp.solutions.hands
-        self.mp_face_mesh = mp.solutions.face_mesh
+    def run(self, model, process, rgb_frame):
+        """Modeli çalıştırır ya da aralık dolmadıysa son sonucu döner"""
+        last_run = self._last_run.get(model)
+        if last_run is not None and self._frame_index - last_run < self.intervals[model]:
+            self.counters[model]['reused'] += 1
+            return self._last_results[model]
         
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=1,
+        results = process(rgb_frame)
+        self._last_results[model] = results
+        self._last_run[model] = self._frame_index
+        self.counters[model]['ran'] += 1
+        return results
+    
+    def skip(self, model):
+        """Bu frame'de kararı etkilemeyen modeli atlar"""
+        self.counters[model]['skipped'] += 1
+        return _EMPTY_RESULTS
+
+
+class SolutionsBackend:
+    """Ayrı pose, hands ve face mesh graph'ları (varsayılan)
+    
+    Her model `models` içinden tek başına çağrılabildiği için paralel ve
+    lazy çalışma modlarını destekler.
+    """
+    
+    name = "solutions"
+    supports_split = True
+    supports_roi = True
+    supports_lazy = True
+    
+    def __init__(self, model_complexity=1, refine_landmarks=True, static_image_mode=False, max_people=1,
+                 min_confidence=0.5):
+        solutions = _solutions()
+        self.pose = solutions.pose.Pose(
+            static_image_mode=static_image_mode,
+            model_complexity=model_complexity,
+            smooth_landmarks=True,
+            min_detection_confidence=min_confidence,
+            min_tracking_confidence=min_confidence
+        )
+        # Hands sadece 0 ve 1 karmaşıklığını destekler
+        self.hands = solutions.hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=2 * max_people,
+            model_complexity=min(model_complexity, 1),
+            min_detection_confidence=min_confidence,
+            min_tracking_confidence=min_confidence
+        )
+        self.face_mesh = solutions.face_mesh.FaceMesh(
+            static_image_mode=static_image_mode,
+            max_num_faces=max_people,
+            refine_landmarks=refine_landmarks,
+            min_detection_confidence=min_confidence,
+            min_tracking_confidence=min_confidence
+        )
+        self.models = {
+            "pose": self.pose.process,
+            "hands": self.hands.process,
+            "face": self.face_mesh.process,
+        }
+    
+    def process(self, rgb_frame):
+        return (
+            self.pose.process(rgb_frame),
+            self.hands.process(rgb_frame),
+            self.face_mesh.process(rgb_frame),
+        )
+    
+    def reset(self):
+        """Takip durumunu sıfırlar (yeni video / yeni sahne)"""
+        self.pose.reset()
+        self.hands.reset()
+        self.face_mesh.reset()
+    
+    def release(self):
+        self.pose.close()
+        self.hands.close()
+        self.face_mesh.close()
+
+
+class HolisticBackend:
+    """Tek MediaPipe Holistic graph'ı - pose, eller ve yüz tek geçişte
+    
+    Ön işleme ve model yükleme bir kez yapılır; sonuçlar solutions
+    backend'i ile aynı şekle dönüştürülür, kurallar değişmeden çalışır.
+    Tek graph olduğu için modeller ayrı ayrı çağrılamaz (`models` None).
+    """
+    
+    name = "holistic"
+    supports_split = False
+    supports_roi = False
+    supports_lazy = False
+    models = None
+    
+    def __init__(self, model_complexity=1, refine_landmarks=True, static_image_mode=False, max_people=1,
+                 min_confidence=0.5):
+        self.holistic = _solutions().holistic.Holistic(
+            static_image_mode=static_image_mode,
+            model_complexity=model_complexity,
             smooth_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+            refine_face_landmarks=refine_landmarks,
+            min_detection_confidence=min_confidence,
+            min_tracking_confidence=min_confidence
         )
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            model_complexity=1,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+    
+    def process(self, rgb_frame):
+        results = self.holistic.process(rgb_frame)
+        
+        hands = [
+            landmarks for landmarks in (results.left_hand_landmarks, results.right_hand_landmarks)
+            if landmarks is not None
+        ]
+        pose_results = SimpleNamespace(pose_landmarks=results.pose_landmarks)
+        hand_results = SimpleNamespace(multi_hand_landmarks=hands or None, multi_handedness=None)
+        face_results = SimpleNamespace(
+            multi_face_landmarks=[results.face_landmarks] if results.face_landmarks else None
         )
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            static_image_mode=False,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+        return pose_results, hand_results, face_results
+    
+    def reset(self):
+        """Takip durumunu sıfırlar (yeni video / yeni sahne)"""
+        self.holistic.reset()
+    
+    def release(self):
+        self.holistic.close()
+
+
+BACKENDS = {
+    SolutionsBackend.name: SolutionsBackend,
+    HolisticBackend.name: HolisticBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+
+def add_detector_arguments(parser):
+    """PoseDetector ayarlarını argparse parser'ına ekler (main, batch, benchmark ortak)"""
+    group = parser.add_argument_group("detector")
+    group.add_argument("--execution-mode", choices=EXECUTION_MODES, default="serial",
+                       help="MediaPipe graph'larını sırayla, paralel veya gerektikçe çalıştır")
+    group.add_argument("--backend", choices=tuple(BACKENDS), default="solutions",
+                       help="Ayrı graph'lar (solutions), tek Holistic graph'ı veya ONNX Runtime (onnx)")
+    group.add_argument("--model-complexity", type=int, choices=(0, 1, 2), default=1,
+                       help="Pose modeli karmaşıklığı (0 en hızlı)")
+    group.add_argument("--no-refine-landmarks", dest="refine_landmarks", action="store_false",
+                       help="Yüzde iris/dudak iyileştirmesini kapat")
+    group.add_argument("--roi", action="store_true",
+                       help="FaceMesh ve Hands'i pose'tan çıkarılan kırpıntılarda çalıştır")
+    group.add_argument("--max-people", type=int, default=1,
+                       help="Frame başına en fazla kişi (yüz) sayısı; her kişi ayrı etiket alır")
+    group.add_argument("--min-confidence", type=float, default=0.5,
+                       help="Modellerin tespit / takip güven eşiği")
+    group.add_argument("--gestures", default=None,
+                       help="Poz kuralı dosyası (varsayılan: gestures.json)")
+    group.add_argument("--input-scale", type=float, default=1.0,
+                       help="Inference öncesi frame ölçeği (ör. 0.5 = yarı çözünürlük)")
+    group.add_argument("--onnx-models", default=None,
+                       help="onnx backend'i: model klasörü (varsayılan: models/)")
+    group.add_argument("--onnx-threads", type=int, default=0,
+                       help="onnx backend'i: model başına intra-op thread sayısı (0 = otomatik)")
+    group.add_argument("--onnx-int8", action="store_true",
+                       help="onnx backend'i: int8 nicemlenmiş modelleri (*.int8.onnx) kullan")
+    return group
+
+
+def detector_options_from_args(args):
+    """add_detector_arguments ile eklenen argümanlardan PoseDetector kwargs'ı"""
+    return {
+        'execution_mode': args.execution_mode,
+        'backend': args.backend,
+        'model_complexity': args.model_complexity,
+        'refine_landmarks': args.refine_landmarks,
+        'roi': args.roi,
+        'input_scale': args.input_scale,
+        'max_people': args.max_people,
+        'min_confidence': args.min_confidence,
+        'gestures': args.gestures,
+        'backend_options': {
+            'model_dir': args.onnx_models,
+            'threads': args.onnx_threads,
+            'int8': args.onnx_int8,
+        } if args.backend == "onnx" else None,
+    }
+
+
+class PoseDetector:
+    """MediaPipe ile pose algılama - pozlar kural dosyasından (varsayılan: el kaldırma, şaşırma, düşünme)
+    
+    backend:
+        "solutions" - ayrı pose / hands / face mesh graph'ları
+        "holistic"  - tek Holistic graph'ı (sadece serial mod)
+        "onnx"      - ONNX Runtime ile landmark modelleri (bkz. onnx_backend;
+                      `backend_options` ile model klasörü, thread sayısı, int8)
+    
+    execution_mode:
+        "serial"   - pose, hands ve face mesh sırayla çalışır
+        "parallel" - üç graph aynı frame üzerinde eş zamanlı çalışır
+                     (MediaPipe C++ tarafında GIL'i bıraktığı için thread yeterli)
+        "lazy"     - sadece karar için gereken graph'lar çalışır (kural
+                     dosyasından türetilir, etiket serial modla aynıdır)
+    
+    `model_intervals` (ör. {"face": 2}) ile modeller her N frame'de bir
+    çalıştırılır, arada son sonuç kullanılır; çalışırken `set_model_intervals`
+    ile değiştirilebilir.
+    
+    roi=True ise FaceMesh ve Hands önceki frame'in pose landmark'larından
+    çıkarılan yüz / el kırpıntılarında çalışır (bkz. roi.RoiTracker);
+    static_image_mode=True ile yok sayılır (frame'ler bağımsız).
+    
+    max_people > 1 ise FaceMesh birden çok yüz, Hands kişi başına iki el bulur;
+    eller ve pose yüzlere atanır ve her kişi ayrı etiketlenir (`result.people`).
+    
+    input_scale < 1 ise modeller küçültülmüş frame üzerinde çalışır; landmark'lar
+    normalize olduğu için sonuçlar ve çizim orijinal frame'e göre aynı kalır.
+    
+    Pozlar `gestures` kural dosyasından derlenir (varsayılan: gestures.json,
+    bkz. gestures.GestureEngine). `thresholds` dosyadaki isimli eşiklerin bir
+    kısmını değiştirir (ör. {"mouth_ratio": 0.18}); `min_confidence` modellerin
+    tespit / takip güven eşiğidir.
+    
+    `detect_batch` birden çok frame'i backend destekliyorsa (onnx) her model
+    için tek toplu çağrıda işler.
+    
+    Tek kişilik modda `result.landmarks` sadece kuralların okuduğu noktaları
+    içerir (diğerleri NaN); tüm noktalar gerekiyorsa (landmark cache, sunucu)
+    full_landmarks=True verilir.
+    """
+    
+    def __init__(self, execution_mode="serial", model_intervals=None, backend="solutions",
+                 model_complexity=1, refine_landmarks=True, static_image_mode=False, roi=False,
+                 input_scale=1.0, max_people=1, backend_options=None, thresholds=None, min_confidence=0.5,
+                 gestures=None, full_landmarks=False):
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Geçersiz execution_mode: {execution_mode} (seçenekler: {EXECUTION_MODES})")
+        if backend not in BACKENDS:
+            raise ValueError(f"Geçersiz backend: {backend} (seçenekler: {tuple(BACKENDS)})")
+        if execution_mode != "serial" and not BACKENDS[backend].supports_split:
+            raise ValueError(f"{backend} backend'i sadece serial modda çalışır")
+        if execution_mode == "lazy" and not BACKENDS[backend].supports_lazy:
+            raise ValueError(f"{backend} backend'i lazy modu desteklemez")
+        if roi and not BACKENDS[backend].supports_roi:
+            raise ValueError(f"{backend} backend'i ROI modunu desteklemez")
+        if max_people < 1:
+            raise ValueError(f"max_people en az 1 olmalı: {max_people}")
+        if max_people > 1 and not BACKENDS[backend].supports_split:
+            raise ValueError(f"{backend} backend'i tek kişiliktir (max_people=1)")
+        if roi and max_people > 1:
+            raise ValueError("ROI modu tek kişiliktir (max_people=1)")
+        if execution_mode == "lazy" and max_people > 1:
+            # Bir kişinin eli kalkınca FaceMesh herkes için atlanır, diğerlerinin kararı kaybolur
+            raise ValueError("lazy mod tek kişiliktir (max_people=1)")
+        if not 0.0 < input_scale <= 1.0:
+            raise ValueError(f"input_scale (0, 1] aralığında olmalı: {input_scale}")
+        # Poz kuralları ve eşikleri (bkz. gestures.json)
+        self.gestures = load_gestures(gestures)
+        self.thresholds = self.gestures.resolve_thresholds(thresholds)
+        self._points = None if full_landmarks else self.gestures.points
+        self.execution_mode = execution_mode
+        
+        self.backend = BACKENDS[backend](
+            model_complexity=model_complexity,
+            refine_landmarks=refine_landmarks,
+            static_image_mode=static_image_mode,
+            max_people=max_people,
+            min_confidence=min_confidence,
+            **(backend_options or {}),
         )
+        self.max_people = max_people
+        
+        # Paralel mod için her graph'a bir thread
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="mediapipe") \
+            if execution_mode == "parallel" else None
+        self.scheduler = ModelScheduler(model_intervals) if execution_mode == "lazy" else None
+        if model_intervals:
+            self.set_model_intervals(model_intervals)
+        self.input_scale = input_scale
+        
+        # ROI modu: FaceMesh ve Hands önceki pose'tan çıkarılan kırpıntılarda.
+        # static_image_mode'da frame'ler birbirinden bağımsızdır (batch resimleri,
+        # sunucu); önceki resmin kişisinden kırpılmasın diye ROI kapalıdır.
+        self.roi_tracker = RoiTracker() if roi and not static_image_mode else None
+        
+        # Aşama süreleri (saniye) - son frame için, benchmark ve profil için
+        self.stage_timings = {}
+        if self.backend.supports_split:
+            models = dict(self.backend.models)
+            if self.roi_tracker is not None:
+                models["face"] = self.roi_tracker.wrap("face", models["face"])
+                models["hands"] = self.roi_tracker.wrap("hands", models["hands"])
+            self._models = {name: self._timed(name, process) for name, process in models.items()}
+        else:
+            self._models = None
+            self._process_all = self._timed("inference", self.backend.process)
         
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        # detect_pose() için varsayılan renderer, ilk kullanımda oluşturulur
+        self._renderer = None
         
         # Debug bilgileri
         self.debug_info = {
@@ -50,159 +403,247 @@ class PoseDetector:
             'face_detected': False
         }
         
-    def detect_pose(self, frame):
-        """Frame üzerinde pose detection yapar"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def detect(self, frame, is_rgb=False):
+        """Frame üzerinde tespit yapar, çizim yapmadan DetectionResult döner
+        
+        `is_rgb=True` ise frame zaten RGB kabul edilir ve renk dönüşümü atlanır.
+        """
+        timings = self.stage_timings
+        timings.clear()
+        inference_frame = self._prepare(frame, is_rgb)
         
         # Detection'lar
-        pose_results = self.pose.process(rgb_frame)
-        hand_results = self.hands.process(rgb_frame)
-        face_results = self.face_mesh.process(rgb_frame)
-        
-        # Debug sıfırla
-        self.debug_info['hands_detected'] = 0
-        self.debug_info['face_detected'] = False
-        
-        # Sadece ağız bölgesi çiz
-        if face_results.multi_face_landmarks:
-            self.debug_info['face_detected'] = True
-            for face_landmarks in face_results.multi_face_landmarks:
-                landmarks = face_landmarks.landmark
-                h, w = frame.shape[:2]
-                
-                # Sadece dudak konturları
-                self.mp_drawing.draw_landmarks(
-                    frame,
-                    face_landmarks,
-                    self.mp_face_mesh.FACEMESH_LIPS,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=self.mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=1)
-                )
-        
-        # Eller çiz
-        if hand_results.multi_hand_landmarks:
-            self.debug_info['hands_detected'] = len(hand_results.multi_hand_landmarks)
-            for hand_landmarks in hand_results.multi_hand_landmarks:
-                self.mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                    self.mp_drawing_styles.get_default_hand_connections_style()
-                )
+        pose_results, hand_results, face_results = self._process(inference_frame)
+        if self.roi_tracker is not None:
+            self.roi_tracker.update(pose_results, inference_frame.shape)
+        return self._result(pose_results, hand_results, face_results)
+    
+    def detect_batch(self, frames, is_rgb=False):
+        """Frame listesi için DetectionResult listesi
+        
+        Backend `process_batch` sunuyorsa (onnx) modeller tüm frame'lerde tek
+        toplu çağrıyla çalışır; aksi halde frame'ler sırayla `detect` edilir.
+        Sonuçların `timings` değerleri toplu sürenin frame başına payıdır.
+        """
+        process_batch = getattr(self.backend, "process_batch", None)
+        if process_batch is None or self.scheduler is not None or self.roi_tracker is not None:
+            return [self.detect(frame, is_rgb) for frame in frames]
+        
+        timings = self.stage_timings
+        timings.clear()
+        inference_frames = [self._prepare(frame, is_rgb) for frame in frames]
+        started = time.perf_counter()
+        batch = process_batch(inference_frames)
+        timings['inference'] = time.perf_counter() - started
+        shared = {stage: seconds / len(frames) for stage, seconds in timings.items()}
+        
+        results = []
+        for pose_results, hand_results, face_results in batch:
+            timings.clear()
+            timings.update(shared)
+            results.append(self._result(pose_results, hand_results, face_results))
+        return results
+    
+    def _prepare(self, frame, is_rgb):
+        """Renk dönüşümü ve inference ölçeği - modellere verilecek RGB frame"""
+        timings = self.stage_timings
+        if is_rgb:
+            rgb_frame = frame
+        else:
+            started = time.perf_counter()
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            timings['color'] = timings.get('color', 0.0) + time.perf_counter() - started
+        
+        if self.input_scale < 1.0:
+            started = time.perf_counter()
+            rgb_frame = cv2.resize(rgb_frame, None, fx=self.input_scale, fy=self.input_scale,
+                                   interpolation=cv2.INTER_AREA)
+            timings['resize'] = timings.get('resize', 0.0) + time.perf_counter() - started
+        return rgb_frame
+    
+    def _result(self, pose_results, hand_results, face_results):
+        """Model sonuçlarından landmark dizileri, kurallar ve DetectionResult"""
+        timings = self.stage_timings
+        
+        # Landmark'lar frame başına bir kez diziye çevrilir, kurallar dizilerde çalışır
+        started = time.perf_counter()
+        if self.max_people > 1:
+            people, primary = LandmarkArrays.people_from_results(pose_results, hand_results, face_results)
+        else:
+            people, primary = [LandmarkArrays.from_results(pose_results, hand_results, face_results,
+                                                           self._points)], 0
+        landmarks = people[primary]
+        timings['convert'] = time.perf_counter() - started
+        
+        self.debug_info['hands_detected'] = int(landmarks.hand_count)
+        self.debug_info['face_detected'] = bool(landmarks.face_detected)
         
         # Pozu belirle
-        pose_name = self._determine_pose(pose_results, hand_results, face_results)
-        
-        # Debug bilgileri göster
-        y_pos = 30
-        cv2.putText(frame, f"Eller: {self.debug_info['hands_detected']}", 
-                   (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-        y_pos += 30
-        cv2.putText(frame, f"Yuz: {'VAR' if self.debug_info['face_detected'] else 'YOK'}", 
-                   (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-        y_pos += 30
-        cv2.putText(frame, f"Agiz: {self.debug_info['mouth_ratio']:.3f}", 
-                   (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-        y_pos += 30
-        cv2.putText(frame, f"El Yukseklik: {self.debug_info['hand_height']:.3f}", 
-                   (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-        
-        # Poz göster
-        cv2.putText(frame, f"Pose: {pose_name}", (10, frame.shape[0] - 20),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-        
-        return frame, pose_name
-    
-    def _determine_pose(self, pose_results, hand_results, face_results):
-        """Pozu belirler - öncelik: el kaldırma > düşünme > şaşırma > varsayılan"""
-        if self._is_raising_hand(pose_results, hand_results):
-            return "raising_hand"
-        
-        if self._is_thinking(pose_results, hand_results, face_results):
-            return "thinking"
-        
-        if self._is_shocking(face_results):
-            return "shocking"
-        
-        return "default"
-    
-    def _is_raising_hand(self, pose_results, hand_results):
-        """El baş hizasından yukarıda mı"""
-        if not pose_results.pose_landmarks or not hand_results.multi_hand_landmarks:
-            self.debug_info['hand_height'] = 0.0
-            return False
-        
-        pose_landmarks = pose_results.pose_landmarks.landmark
-        nose_y = pose_landmarks[self.mp_pose.PoseLandmark.NOSE].y
-        
-        for hand_landmarks in hand_results.multi_hand_landmarks:
-            wrist_y = hand_landmarks.landmark[self.mp_hands.HandLandmark.WRIST].y
-            height_diff = nose_y - wrist_y
-            self.debug_info['hand_height'] = height_diff
-            
-            if height_diff > 0.05:
-                return True
-        
-        return False
-    
-    def _is_shocking(self, face_results):
-        """Ağız açık mı"""
-        if not face_results.multi_face_landmarks:
-            self.debug_info['mouth_ratio'] = 0.0
-            return False
-        
-        face_landmarks = face_results.multi_face_landmarks[0].landmark
-        
-        # Ağız landmark'ları
-        upper_lip = face_landmarks[13].y
-        lower_lip = face_landmarks[14].y
-        forehead = face_landmarks[10].y
-        chin = face_landmarks[152].y
-        face_height = abs(chin - forehead)
-        
-        mouth_opening = abs(lower_lip - upper_lip)
-        mouth_ratio = mouth_opening / face_height if face_height > 0 else 0
-        self.debug_info['mouth_ratio'] = mouth_ratio
-        
-        return mouth_ratio > 0.15
-    
-    def _is_thinking(self, pose_results, hand_results, face_results):
-        """El ağza/çeneye değiyor mu (thinking pozu)"""
-        if not face_results.multi_face_landmarks or not hand_results.multi_hand_landmarks:
-            return False
-        
-        face_landmarks = face_results.multi_face_landmarks[0].landmark
-        
-        # Ağız bölgesi (üst dudak, alt dudak, çene)
-        mouth_points = [
-            face_landmarks[13],   # Üst dudak
-            face_landmarks[14],   # Alt dudak
-            face_landmarks[152],  # Çene
-            face_landmarks[0],    # Ağız merkezi
+        started = time.perf_counter()
+        pose_name, metrics = self._determine_pose(landmarks)
+        if len(people) > 1:
+            person_results = self._determine_people(people)
+        else:
+            person_results = [PersonResult(pose_name, metrics, landmarks, raw_pose_name=pose_name)]
+        timings['rules'] = time.perf_counter() - started
+        
+        return DetectionResult(
+            pose_name=pose_name,
+            raw_pose_name=pose_name,
+            pose_results=pose_results,
+            hand_results=hand_results,
+            face_results=face_results,
+            landmarks=landmarks,
+            metrics=metrics,
+            debug_info=dict(self.debug_info),
+            timings=dict(timings),
+            people=person_results,
+            primary=primary,
+        )
+    
+    def detect_pose(self, frame):
+        """Frame üzerinde pose detection yapar, overlay'i frame'e çizer (eski arayüz)"""
+        result = self.detect(frame)
+        
+        if self._renderer is None:
+            self._renderer = PoseRenderer()
+        self._renderer.render(frame, result)
+        self.stage_timings.update(self._renderer.timings)
+        
+        return frame, result.pose_name
+    
+    def _process(self, rgb_frame):
+        """Üç graph'ı seçili moda göre çalıştırır ve sonuçları birleştirir"""
+        if self.execution_mode == "lazy":
+            return self._process_lazy(rgb_frame)
+        
+        if self._models is None:
+            return self._process_all(rgb_frame)
+        
+        if self.scheduler is not None:
+            self.scheduler.begin_frame()
+        run = self._run_model
+        if self._executor is None:
+            return run("pose", rgb_frame), run("hands", rgb_frame), run("face", rgb_frame)
+        
+        # Aynı frame üç graph'a salt okunur veriliyor, kopya gerekmez
+        futures = [
+            self._executor.submit(run, "pose", rgb_frame),
+            self._executor.submit(run, "hands", rgb_frame),
+            self._executor.submit(run, "face", rgb_frame),
         ]
+        return tuple(future.result() for future in futures)
+    
+    def _run_model(self, model, rgb_frame):
+        """Model aralıkları ayarlıysa zamanlayıcı üzerinden, değilse doğrudan çalıştırır"""
+        if self.scheduler is None:
+            return self._models[model](rgb_frame)
+        return self.scheduler.run(model, self._models[model], rgb_frame)
+    
+    def _process_lazy(self, rgb_frame):
+        """Kısmi kararla kısa devre: kural motoru karar kesinleşene kadar eksik grubu ister
+        
+        Sıra eller → pose → yüz (en ucuz kapı önce, FaceMesh en son). Varsayılan
+        kurallarda: el yoksa sadece yüz, el kalkmışsa yüz gereksiz.
+        """
+        scheduler = self.scheduler
+        scheduler.begin_frame()
+        results = {}
+        while True:
+            landmarks = LandmarkArrays.from_results(results.get("pose"), results.get("hands"), results.get("face"),
+                                                    self._points)
+            _, missing = self.gestures.decide_partial(landmarks, set(results), self.thresholds)
+            if not missing:
+                break
+            model = next(model for model in LAZY_ORDER if model in missing)
+            results[model] = scheduler.run(model, self._models[model], rgb_frame)
         
-        for hand_landmarks in hand_results.multi_hand_landmarks:
-            # El parmaklarının uçları
-            finger_tips = [
-                hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP],
-                hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP],
-                hand_landmarks.landmark[self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP],
-            ]
-            
-            # Herhangi bir parmak ağız bölgesine çok yakın mı?
-            for finger_tip in finger_tips:
-                for mouth_point in mouth_points:
-                    distance = np.sqrt((finger_tip.x - mouth_point.x)**2 + (finger_tip.y - mouth_point.y)**2)
-                    
-                    # Threshold çok düşük - neredeyse değmeli
-                    if distance < 0.08:
-                        return True
-        
-        return False
+        for model in ModelScheduler.MODELS:
+            if model not in results:
+                results[model] = scheduler.skip(model)
+        return results["pose"], results["hands"], results["face"]
+    
+    def _timed(self, stage, process):
+        """Çağrı süresini `stage_timings[stage]` içine yazan sarmalayıcı"""
+        def timed_process(rgb_frame):
+            started = time.perf_counter()
+            results = process(rgb_frame)
+            self.stage_timings[stage] = time.perf_counter() - started
+            return results
+        return timed_process
+    
+    def _determine_pose(self, landmarks):
+        """Pozu belirler - kural dosyasındaki öncelik sırasıyla, hiçbiri tutmazsa varsayılan"""
+        metrics = {name: float(value) for name, value in self.gestures.compute_metrics(landmarks).items()}
+        pose_name = self.gestures.classify(metrics, self.thresholds)
+        
+        # Tespit yoksa (veya kural dosyasında metrik yoksa) debug değerleri 0 gösterilir
+        for name in ('hand_height', 'mouth_ratio'):
+            value = metrics.get(name, np.nan)
+            self.debug_info[name] = 0.0 if np.isnan(value) else value
+        return pose_name, metrics
+    
+    def warm_up(self, frame_shape=(480, 640, 3), on_progress=None):
+        """Her graph'ı bir kez çalıştırır (model dosyaları ilk process çağrısında yüklenir)
+        
+        `on_progress(tamamlanan, toplam, model)` her modelden sonra çağrılır.
+        Sonunda takip durumu sıfırlanır; ısınma frame'i gerçek akışı etkilemez.
+        """
+        frame = np.zeros(frame_shape, dtype=np.uint8)
+        steps = list(self.backend.models.items()) if self.backend.supports_split \
+            else [(self.backend.name, self.backend.process)]
+        for index, (name, process) in enumerate(steps, 1):
+            process(frame)
+            if on_progress is not None:
+                on_progress(index, len(steps), name)
+        self.reset()
+    
+    @property
+    def model_intervals(self):
+        """1'den büyük model aralıkları (ör. {"face": 2})"""
+        if self.scheduler is None:
+            return {}
+        return {model: interval for model, interval in self.scheduler.intervals.items() if interval > 1}
+    
+    def set_model_intervals(self, intervals):
+        """Modellerin kaç frame'de bir çalışacağını ayarlar (ör. {"face": 2})
+        
+        Tek graph'lı backend'lerde modeller ayrı çalıştırılamadığı için yok sayılır.
+        """
+        if not self.backend.supports_split:
+            return
+        if self.scheduler is None:
+            if not intervals:
+                return
+            self.scheduler = ModelScheduler(intervals)
+        else:
+            self.scheduler.set_intervals(intervals)
+    
+    def _determine_people(self, people):
+        """Tüm kişilerin metrik ve etiketleri tek vektörel geçişte"""
+        metrics = self.gestures.compute_metrics(LandmarkArrays.stack(people))
+        labels = self.gestures.classify(metrics, self.thresholds)
+        return [
+            PersonResult(
+                pose_name=str(labels[index]),
+                raw_pose_name=str(labels[index]),
+                metrics={name: float(values[index]) for name, values in metrics.items()},
+                landmarks=person,
+                box=person_box(person),
+            )
+            for index, person in enumerate(people)
+        ]
+    
+    def reset(self):
+        """Model takip durumunu, ROI kutularını ve zamanlayıcı önbelleğini sıfırlar"""
+        self.backend.reset()
+        if self.roi_tracker is not None:
+            self.roi_tracker.reset()
+        if self.scheduler is not None:
+            self.scheduler = ModelScheduler(self.scheduler.intervals)
     
     def release(self):
         """Kaynakları serbest bırak"""
-        self.pose.close()
-        self.hands.close()
-        self.face_mesh.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.backend.release()
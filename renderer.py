@@ -0,0 +1,166 @@
+"""
+Overlay Render Module
+PoseDetector sonuçlarını (dudak, el iskeleti, debug yazıları) frame üzerine çizer
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+def _solutions():
+    """mediapipe ilk renderer oluşturulurken yüklenir (bkz. pose_detector._solutions)"""
+    import mediapipe as mp
+    return mp.solutions
+
+
+def _swap_spec(spec):
+    """DrawingSpec rengini BGR ↔ RGB çevirir"""
+    return _solutions().drawing_utils.DrawingSpec(
+        color=tuple(reversed(spec.color)),
+        thickness=spec.thickness,
+        circle_radius=spec.circle_radius,
+    )
+
+
+def _swap_style(style):
+    if isinstance(style, dict):
+        return {key: _swap_spec(spec) for key, spec in style.items()}
+    return _swap_spec(style)
+
+
+class PoseRenderer:
+    """Tespit sonucunu frame'e çizen, kapatılabilir render aşaması
+
+    enabled:     False ise hiçbir şey çizilmez (headless / batch)
+    every_n:     overlay katmanı her N frame'de bir yeniden çizilir, arada
+                 son katman maske ile kopyalanır (çizimden çok daha ucuz)
+    color_order: "bgr" (OpenCV frame) veya "rgb" (Qt'ye gidecek buffer) -
+                 RGB buffer'a doğrudan çizilince ikinci renk dönüşümü gerekmez
+    """
+
+    def __init__(self, enabled=True, every_n=1, color_order="bgr"):
+        if color_order not in ("bgr", "rgb"):
+            raise ValueError(f"Geçersiz color_order: {color_order}")
+        self.enabled = enabled
+        self.every_n = max(1, int(every_n))
+        self.color_order = color_order
+
+        solutions = _solutions()
+        self.mp_drawing = solutions.drawing_utils
+        drawing_styles = solutions.drawing_styles
+        self.lips_connections = solutions.face_mesh.FACEMESH_LIPS
+        self.hand_connections = solutions.hands.HAND_CONNECTIONS
+
+        # Stiller bir kez hazırlanır (BGR renkler)
+        lips_spec = self.mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=1)
+        hand_landmark_style = drawing_styles.get_default_hand_landmarks_style()
+        hand_connection_style = drawing_styles.get_default_hand_connections_style()
+        self.text_color = (255, 255, 0)
+        self.pose_color = (0, 255, 0)
+
+        if color_order == "rgb":
+            lips_spec = _swap_spec(lips_spec)
+            hand_landmark_style = _swap_style(hand_landmark_style)
+            hand_connection_style = _swap_style(hand_connection_style)
+            self.text_color = self.text_color[::-1]
+            self.pose_color = self.pose_color[::-1]
+
+        self.lips_spec = lips_spec
+        self.hand_landmark_style = hand_landmark_style
+        self.hand_connection_style = hand_connection_style
+
+        # Düşük oranlı çizim için overlay katmanı
+        self._layer = None
+        self._mask = None
+        self._frame_index = 0
+
+        self.timings = {}
+
+    def render(self, frame, result):
+        """Overlay'i frame üzerine yerinde çizer, frame'i döner"""
+        self.timings.clear()
+        if not self.enabled:
+            return frame
+
+        if self.every_n == 1:
+            self._draw(frame, result)
+            return frame
+
+        started = time.perf_counter()
+        layer_stale = self._layer is None or self._layer.shape != frame.shape
+        if layer_stale or self._frame_index % self.every_n == 0:
+            if layer_stale:
+                self._layer = np.zeros_like(frame)
+            else:
+                self._layer.fill(0)
+            self._draw(self._layer, result)
+            self._mask = self._layer.any(axis=2)[..., np.newaxis]
+        self._frame_index += 1
+
+        np.copyto(frame, self._layer, where=self._mask)
+        self.timings['composite'] = time.perf_counter() - started
+        return frame
+
+    def _draw(self, frame, result):
+        started = time.perf_counter()
+
+        # Sadece dudak konturları
+        if result.face_results.multi_face_landmarks:
+            for face_landmarks in result.face_results.multi_face_landmarks:
+                self.mp_drawing.draw_landmarks(
+                    frame,
+                    face_landmarks,
+                    self.lips_connections,
+                    landmark_drawing_spec=None,
+                    connection_drawing_spec=self.lips_spec
+                )
+
+        # Eller
+        if result.hand_results.multi_hand_landmarks:
+            for hand_landmarks in result.hand_results.multi_hand_landmarks:
+                self.mp_drawing.draw_landmarks(
+                    frame,
+                    hand_landmarks,
+                    self.hand_connections,
+                    self.hand_landmark_style,
+                    self.hand_connection_style
+                )
+
+        self.timings['draw'] = time.perf_counter() - started
+
+        # Debug bilgileri
+        started = time.perf_counter()
+        debug_info = result.debug_info
+        lines = [
+            f"Eller: {debug_info['hands_detected']}",
+            f"Yuz: {'VAR' if debug_info['face_detected'] else 'YOK'}",
+            f"Agiz: {debug_info['mouth_ratio']:.3f}",
+            f"El Yukseklik: {debug_info['hand_height']:.3f}",
+        ]
+        y_pos = 30
+        for line in lines:
+            cv2.putText(frame, line, (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.text_color, 2)
+            y_pos += 30
+
+        # Poz
+        cv2.putText(frame, f"Pose: {result.pose_name}", (10, frame.shape[0] - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.pose_color, 2)
+
+        # Çok kişili: kişi başına kutu ve etiket
+        if len(result.people) > 1:
+            self.draw_people(frame, result.people)
+        self.timings['overlay'] = time.perf_counter() - started
+
+    def draw_people(self, frame, people):
+        """Kutusu olan her kişi için dikdörtgen ve "sıra: etiket" yazısı"""
+        height, width = frame.shape[:2]
+        for index, person in enumerate(people, 1):
+            if person.box is None:
+                continue
+            x0, y0, x1, y1 = person.box
+            top_left = (int(x0 * width), int(y0 * height))
+            cv2.rectangle(frame, top_left, (int(x1 * width), int(y1 * height)), self.pose_color, 2)
+            cv2.putText(frame, f"{index}: {person.pose_name}", (top_left[0], max(top_left[1] - 8, 16)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.pose_color, 2)
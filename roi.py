@@ -0,0 +1,141 @@
+"""
+ROI Tracking Module
+Önceki frame'in pose landmark'larından yüz ve el bölgelerini çıkarır; FaceMesh
+ve Hands tüm frame yerine bu kırpıntılar üzerinde çalışır
+"""
+
+import numpy as np
+
+
+# Pose landmark indeksleri (MediaPipe Pose 33 nokta)
+FACE_POSE_INDICES = tuple(range(0, 11))          # burun, gözler, kulaklar, ağız
+HAND_POSE_INDICES = (15, 16, 17, 18, 19, 20, 21, 22)  # bilekler, serçe, işaret, başparmak
+
+
+class RoiTracker:
+    """Pose'tan yüz / el kırpıntı kutuları üretir ve modelleri kırpıntıda çalıştırır
+
+    - Kutular önceki frame'in pose sonucundan hesaplanır (paralel modla uyumlu)
+    - Yeni kutu öncekinin içinde kalıyorsa önceki kutu korunur; MediaPipe'ın
+      kendi takibi sabit koordinat sistemi sayesinde bozulmaz
+    - Kırpıntıda landmark bulunamazsa (takip kaybı) aynı frame tüm görüntüde
+      yeniden işlenir; pose `max_pose_age` frame'den eskiyse doğrudan tüm frame
+    """
+
+    def __init__(self, face_scale=2.2, hand_scale=2.5, min_hand_side=0.3,
+                 min_visibility=0.5, max_pose_age=5):
+        self.face_scale = face_scale
+        self.hand_scale = hand_scale
+        self.min_hand_side = min_hand_side
+        self.min_visibility = min_visibility
+        self.max_pose_age = max_pose_age
+
+        self.boxes = {"face": None, "hands": None}
+        self._pose_age = None
+        self.counters = {
+            model: {'roi': 0, 'full': 0, 'lost': 0} for model in self.boxes
+        }
+
+    def update(self, pose_results, frame_shape):
+        """Frame sonunda çağrılır - bir sonraki frame için kutuları günceller"""
+        pose_landmarks = getattr(pose_results, 'pose_landmarks', None)
+        if pose_landmarks is None:
+            if self._pose_age is not None:
+                self._pose_age += 1
+            return
+
+        height, width = frame_shape[:2]
+        landmarks = pose_landmarks.landmark
+        points = np.array([(lm.x * width, lm.y * height, lm.visibility) for lm in landmarks], dtype=np.float32)
+        self._pose_age = 0
+
+        face_points = points[list(FACE_POSE_INDICES)]
+        face_points = face_points[face_points[:, 2] >= self.min_visibility, :2]
+        face_box = None
+        if len(face_points) >= 3:
+            face_box = self._square_box(face_points, self.face_scale, 0, width, height)
+        self.boxes["face"] = self._stabilize(self.boxes["face"], face_box)
+
+        hand_points = points[list(HAND_POSE_INDICES)]
+        hand_points = hand_points[hand_points[:, 2] >= self.min_visibility, :2]
+        hand_box = None
+        if len(hand_points):
+            min_side = self.min_hand_side * min(width, height)
+            hand_box = self._square_box(hand_points, self.hand_scale, min_side, width, height)
+        self.boxes["hands"] = self._stabilize(self.boxes["hands"], hand_box)
+
+    def reset(self):
+        self.boxes = {"face": None, "hands": None}
+        self._pose_age = None
+
+    def wrap(self, model, process):
+        """Modeli ROI üzerinde çalıştıran sarmalayıcı döner ("face" veya "hands")"""
+        landmark_field = "multi_face_landmarks" if model == "face" else "multi_hand_landmarks"
+        counters = self.counters[model]
+
+        def process_roi(rgb_frame):
+            box = self.boxes[model]
+            if box is None or self._pose_age is None or self._pose_age > self.max_pose_age:
+                counters['full'] += 1
+                return process(rgb_frame)
+
+            x0, y0, x1, y1 = box
+            crop = np.ascontiguousarray(rgb_frame[y0:y1, x0:x1])
+            results = process(crop)
+            landmark_lists = getattr(results, landmark_field)
+            if not landmark_lists:
+                # Takip kaybı - tüm frame'e dön
+                counters['lost'] += 1
+                return process(rgb_frame)
+
+            counters['roi'] += 1
+            height, width = rgb_frame.shape[:2]
+            _map_to_frame(landmark_lists, box, width, height)
+            return results
+
+        return process_roi
+
+    @staticmethod
+    def _square_box(points, scale, min_side, width, height):
+        """Noktaları kapsayan, ölçeklenmiş ve frame'e sığdırılmış kare kutu"""
+        low = points.min(axis=0)
+        high = points.max(axis=0)
+        center = (low + high) / 2.0
+        side = max(float((high - low).max()) * scale, min_side)
+        side = min(side, width, height)
+
+        x0 = int(np.clip(center[0] - side / 2.0, 0, width - side))
+        y0 = int(np.clip(center[1] - side / 2.0, 0, height - side))
+        x1 = min(int(x0 + side), width)
+        y1 = min(int(y0 + side), height)
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return None
+        return x0, y0, x1, y1
+
+    @staticmethod
+    def _stabilize(previous, box):
+        """Yeni kutu öncekinin içinde ve yeterince büyükse önceki kutuyu korur"""
+        if previous is None or box is None:
+            return box
+        px0, py0, px1, py1 = previous
+        x0, y0, x1, y1 = box
+        inside = x0 >= px0 and y0 >= py0 and x1 <= px1 and y1 <= py1
+        previous_area = (px1 - px0) * (py1 - py0)
+        if inside and (x1 - x0) * (y1 - y0) >= 0.5 * previous_area:
+            return previous
+        return box
+
+
+def _map_to_frame(landmark_lists, box, width, height):
+    """Kırpıntıya göre normalize landmark'ları tüm frame koordinatlarına taşır"""
+    x0, y0, x1, y1 = box
+    scale_x = (x1 - x0) / width
+    scale_y = (y1 - y0) / height
+    offset_x = x0 / width
+    offset_y = y0 / height
+    for landmark_list in landmark_lists:
+        for landmark in landmark_list.landmark:
+            landmark.x = landmark.x * scale_x + offset_x
+            landmark.y = landmark.y * scale_y + offset_y
+            # z, x ile aynı ölçekte
+            landmark.z = landmark.z * scale_x
@@ -0,0 +1,559 @@
+"""
+Inference Server
+Tarayıcılardan gelen JPEG frame'leri GUI olmadan sınıflandıran asyncio sunucusu
+
+Kullanım:
+    python server.py serve --port 8765 --workers 4
+    python server.py client kayit.mp4 --fps 30
+    python server.py client resimler/ --http
+
+Uç noktalar:
+    GET  /ws      WebSocket - ikili mesaj olarak JPEG gönderilir, her işlenen
+                  frame için JSON metin mesajı döner
+    POST /detect  Gövdesi JPEG olan tek istek, yanıt aynı JSON
+    GET  /stats   Sunucu sayaçları
+
+Inference, her biri kendi PoseDetector örneğine sahip worker process'lerde
+yapılır. Her WebSocket istemcisinin tek bir "en yeni frame" yuvası vardır:
+worker meşgulken gelen frame'ler öncekinin yerine geçer, eski frame'ler
+işlenmeden düşürülür ve yavaş bir istemci diğerlerini bekletmez.
+
+Bağımlılık gerektirmez; WebSocket (RFC 6455) el sıkışması ve çerçeveleme
+burada asgari düzeyde uygulanmıştır.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import cv2
+import numpy as np
+
+from pose_detector import PoseDetector, add_detector_arguments, detector_options_from_args
+
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_MESSAGE_BYTES = 8 * 1024 * 1024
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+
+# ─── Worker tarafı ───────────────────────────────────────────────────────────
+
+_detector = None
+
+
+def _init_worker(detector_options):
+    """Process başına bir detector; frame'ler farklı istemcilerden karışık gelir"""
+    global _detector
+    _detector = PoseDetector(static_image_mode=True, full_landmarks=True, **detector_options)
+
+
+def check_detector_options(detector_options):
+    """Worker'ların kuracağı detector ayarlarını sunucu açılmadan doğrular
+
+    Worker'lar farklı istemcilerin frame'lerini karışık işler; frame'ler
+    arasında durum tutan ayarlar (ROI takibi) bir istemcinin kırpıntılarını
+    başka bir istemcinin pose'undan keser. Geçersiz ayar birleşimleri
+    worker'larda değil burada hata versin diye detector bir kez kurulur.
+    Hatada ValueError / RuntimeError.
+    """
+    if detector_options.get('roi'):
+        raise ValueError("ROI modu sunucuda kullanılamaz (istemcilerin frame'leri aynı detector'da karışır)")
+    PoseDetector(static_image_mode=True, full_landmarks=True, **detector_options).release()
+
+
+def _detect_jpeg(data):
+    started = time.perf_counter()
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Görüntü çözülemedi (JPEG bekleniyor)")
+    result = _detector.detect(frame)
+    payload = result_payload(result)
+    payload['size'] = [frame.shape[1], frame.shape[0]]
+    payload['inference_ms'] = round((time.perf_counter() - started) * 1000.0, 2)
+    return payload
+
+
+def result_payload(result):
+    """DetectionResult → JSON uyumlu dict (NaN yerine null, tespit yoksa null)"""
+    landmarks = result.landmarks
+    hands = [_points(hand) for hand in landmarks.hands if not np.isnan(hand[0, 0])]
+    return {
+        'pose': result.pose_name,
+        'metrics': {
+            name: None if np.isnan(value) else round(float(value), 6)
+            for name, value in result.metrics.items()
+        },
+        'landmarks': {
+            'pose': _points(landmarks.pose) if landmarks.pose_detected else None,
+            'hands': hands,
+            'face': _points(landmarks.face) if landmarks.face_detected else None,
+        },
+    }
+
+
+def _points(array):
+    # refine_landmarks kapalıyken yüzün son noktaları NaN - bunlar atılır
+    valid = array[~np.isnan(array[:, 0])]
+    return np.round(valid, 5).tolist()
+
+
+# ─── WebSocket çerçeveleme ───────────────────────────────────────────────────
+
+def _accept_key(key):
+    return base64.b64encode(hashlib.sha1(key.encode("ascii") + WS_GUID).digest()).decode("ascii")
+
+
+def _apply_mask(payload, mask):
+    data = np.frombuffer(payload, dtype=np.uint8)
+    key = np.resize(np.frombuffer(mask, dtype=np.uint8), data.shape)
+    return (data ^ key).tobytes()
+
+
+def encode_frame(opcode, payload, mask=False):
+    """Tek parça WebSocket çerçevesi (istemci → sunucu çerçeveleri maskelenir)"""
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, mask_bit | length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, mask_bit | 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, mask_bit | 127, length)
+    if mask:
+        key = os.urandom(4)
+        return header + key + _apply_mask(payload, key)
+    return header + payload
+
+
+async def read_message(reader, writer):
+    """Sonraki veri mesajını (opcode, payload) döner; ping'lere cevap verir
+
+    Bağlantı kapanırsa (OP_CLOSE, b"") döner.
+    """
+    chunks = []
+    opcode = None
+    size = 0
+    while True:
+        try:
+            head = await reader.readexactly(2)
+        except asyncio.IncompleteReadError:
+            return OP_CLOSE, b""
+        fin = head[0] & 0x80
+        frame_opcode = head[0] & 0x0F
+        masked = head[1] & 0x80
+        length = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await reader.readexactly(8))[0]
+        if size + length > MAX_MESSAGE_BYTES:
+            raise ValueError(f"Mesaj çok büyük: {size + length} bayt")
+        key = await reader.readexactly(4) if masked else None
+        payload = await reader.readexactly(length)
+        if key is not None:
+            payload = _apply_mask(payload, key)
+
+        if frame_opcode == OP_CLOSE:
+            return OP_CLOSE, payload
+        if frame_opcode == OP_PING:
+            writer.write(encode_frame(OP_PONG, payload, mask=key is None))
+            continue
+        if frame_opcode == OP_PONG:
+            continue
+
+        if frame_opcode != OP_CONTINUATION:
+            opcode = frame_opcode
+        chunks.append(payload)
+        size += length
+        if fin:
+            return opcode, b"".join(chunks)
+
+
+async def _read_http_head(reader):
+    """İstek / yanıt satırı ve küçük harfli başlıklar"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+# ─── Sunucu ──────────────────────────────────────────────────────────────────
+
+class _ClientSlot:
+    """İstemci başına tek frame'lik yuva - yeni frame bekleyen eskisinin yerine geçer"""
+
+    def __init__(self):
+        self.received = 0
+        self.dropped = 0
+        self._latest = None
+        self._ready = asyncio.Event()
+
+    def offer(self, data):
+        if self._latest is not None:
+            self.dropped += 1
+        self._latest = (self.received, time.perf_counter(), data)
+        self.received += 1
+        self._ready.set()
+
+    async def take(self):
+        await self._ready.wait()
+        self._ready.clear()
+        item, self._latest = self._latest, None
+        return item
+
+
+class InferenceServer:
+    """HTTP / WebSocket uç noktaları ve PoseDetector process havuzu"""
+
+    def __init__(self, host="127.0.0.1", port=8765, workers=None, detector_options=None):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.detector_options = detector_options or {}
+        self.stats = {'clients': 0, 'frames': 0, 'processed': 0, 'dropped': 0, 'errors': 0}
+        self._pool = None
+        self._server = None
+
+    async def start(self):
+        self._pool = ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(self.detector_options,)
+        )
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"[OK] Dinleniyor: http://{self.host}:{self.port} ({self.workers} worker)", file=sys.stderr)
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def detect(self, data):
+        """JPEG'i bir worker'da işler; çözülemeyen görüntüde ValueError"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _detect_jpeg, data)
+
+    def _internal_error(self, exc):
+        """Beklenmeyen inference hatasını sayar ve loglar; istemciye gidecek mesajı döner"""
+        self.stats['errors'] += 1
+        print(f"Uyarı: frame işlenemedi: {type(exc).__name__}: {exc}", file=sys.stderr)
+        return f"Sunucu hatası: {type(exc).__name__}"
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line, headers = await _read_http_head(reader)
+            method, target, _ = request_line.split(" ", 2)
+            path = urlsplit(target).path
+            if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._handle_websocket(reader, writer, headers)
+            elif path == "/detect" and method == "POST":
+                await self._handle_post(reader, writer, headers)
+            elif path == "/stats" and method == "GET":
+                self._respond(writer, 200, self.stats)
+            else:
+                self._respond(writer, 404, {'error': f"Bilinmeyen uç nokta: {method} {path}"})
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                  500: "Internal Server Error"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: application/json\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+
+    async def _handle_post(self, reader, writer, headers):
+        length = int(headers.get("content-length", 0))
+        if not 0 < length <= MAX_MESSAGE_BYTES:
+            self._respond(writer, 413 if length else 400, {'error': "Geçersiz gövde boyutu"})
+            return
+        data = await reader.readexactly(length)
+        self.stats['frames'] += 1
+        try:
+            payload = await self.detect(data)
+        except ValueError as exc:
+            self.stats['errors'] += 1
+            self._respond(writer, 400, {'error': str(exc)})
+            return
+        except Exception as exc:
+            self._respond(writer, 500, {'error': self._internal_error(exc)})
+            return
+        self.stats['processed'] += 1
+        self._respond(writer, 200, payload)
+
+    async def _handle_websocket(self, reader, writer, headers):
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {_accept_key(headers['sec-websocket-key'])}\r\n\r\n".encode("latin-1")
+        )
+        await writer.drain()
+
+        slot = _ClientSlot()
+        self.stats['clients'] += 1
+        worker = asyncio.create_task(self._serve_client(slot, writer))
+        try:
+            while True:
+                opcode, data = await read_message(reader, writer)
+                if opcode == OP_CLOSE:
+                    break
+                if opcode == OP_BINARY:
+                    self.stats['frames'] += 1
+                    slot.offer(data)
+        finally:
+            worker.cancel()
+            self.stats['clients'] -= 1
+            self.stats['dropped'] += slot.dropped
+            if not writer.is_closing():
+                writer.write(encode_frame(OP_CLOSE, b""))
+
+    async def _serve_client(self, slot, writer):
+        """İstemcinin en yeni frame'ini işler; işlem sürerken gelenler birikmez"""
+        while True:
+            index, received_at, data = await slot.take()
+            try:
+                payload = await self.detect(data)
+                self.stats['processed'] += 1
+            except ValueError as exc:
+                self.stats['errors'] += 1
+                payload = {'error': str(exc)}
+            except Exception as exc:
+                # Worker çöktü vb. - istemci cevapsız kalmasın, sonraki frame'ler denenir
+                payload = {'error': self._internal_error(exc)}
+            payload['frame'] = index
+            payload['dropped'] = slot.dropped
+            payload['server_ms'] = round((time.perf_counter() - received_at) * 1000.0, 2)
+            writer.write(encode_frame(OP_TEXT, json.dumps(payload).encode("utf-8")))
+            await writer.drain()
+
+
+# ─── Test istemcisi ──────────────────────────────────────────────────────────
+
+def iter_jpeg_frames(source, quality=80, limit=None):
+    """Video, resim klasörü, tek resim veya kamera indeksinden JPEG bayt dizisi üretir"""
+    path = Path(source)
+    if path.is_dir():
+        images = sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        frames = (cv2.imread(str(image)) for image in images)
+    elif path.suffix.lower() in IMAGE_EXTENSIONS:
+        frames = iter([cv2.imread(str(path))])
+    else:
+        capture = cv2.VideoCapture(int(source) if source.isdigit() else str(path))
+        if not capture.isOpened():
+            raise ValueError(f"Kaynak açılamadı: {source}")
+
+        def _read():
+            try:
+                while True:
+                    ret, frame = capture.read()
+                    if not ret:
+                        return
+                    yield frame
+            finally:
+                capture.release()
+        frames = _read()
+
+    count = 0
+    for frame in frames:
+        if frame is None:
+            continue
+        if limit is not None and count >= limit:
+            return
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            count += 1
+            yield encoded.tobytes()
+
+
+async def run_ws_client(url, frames, fps=30.0, verbose=True):
+    """Frame'leri verilen hızda gönderir, sonuçları toplar; özet dict döner"""
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    writer.write(
+        f"GET {parts.path or '/ws'} HTTP/1.1\r\n"
+        f"Host: {parts.netloc}\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\n"
+        "Sec-WebSocket-Version: 13\r\n\r\n".encode("latin-1")
+    )
+    status_line, headers = await _read_http_head(reader)
+    if " 101 " not in status_line or headers.get("sec-websocket-accept") != _accept_key(key):
+        raise ValueError(f"WebSocket el sıkışması başarısız: {status_line}")
+
+    sent_at = []
+    round_trips = []
+    results = []
+    done = asyncio.Event()
+
+    async def receive():
+        while True:
+            opcode, data = await read_message(reader, writer)
+            if opcode == OP_CLOSE:
+                break
+            payload = json.loads(data)
+            round_trips.append(time.perf_counter() - sent_at[payload['frame']])
+            results.append(payload)
+            if verbose:
+                print(f"frame {payload['frame']:5d}  {payload.get('pose', payload.get('error'))!s:14s}"
+                      f"  {round_trips[-1] * 1000:7.1f} ms  düşürülen: {payload['dropped']}")
+            if done.is_set() and payload['frame'] == len(sent_at) - 1:
+                break
+
+    receiver = asyncio.create_task(receive())
+    interval = 1.0 / fps if fps > 0 else 0.0
+    for data in frames:
+        sent_at.append(time.perf_counter())
+        writer.write(encode_frame(OP_BINARY, data, mask=True))
+        await writer.drain()
+        await asyncio.sleep(interval)
+    done.set()
+
+    # Son frame her zaman işlenir (yuvada kalan en yeni frame düşürülmez)
+    if results and results[-1]['frame'] == len(sent_at) - 1:
+        receiver.cancel()
+    elif sent_at:
+        try:
+            await asyncio.wait_for(receiver, timeout=30.0)
+        except asyncio.TimeoutError:
+            receiver.cancel()
+    writer.write(encode_frame(OP_CLOSE, b"", mask=True))
+    writer.close()
+    return _summary(len(sent_at), results, round_trips)
+
+
+async def run_http_client(url, frames, verbose=True):
+    """Frame'leri tek tek POST eder (her istek bir öncekinin yanıtını bekler)"""
+    parts = urlsplit(url)
+    results = []
+    round_trips = []
+    sent = 0
+    for data in frames:
+        started = time.perf_counter()
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+        writer.write(
+            f"POST {parts.path or '/detect'} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            "Content-Type: image/jpeg\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+        _, headers = await _read_http_head(reader)
+        payload = json.loads(await reader.readexactly(int(headers['content-length'])))
+        writer.close()
+        payload['frame'] = sent
+        sent += 1
+        round_trips.append(time.perf_counter() - started)
+        results.append(payload)
+        if verbose:
+            print(f"frame {payload['frame']:5d}  {payload.get('pose', payload.get('error'))!s:14s}"
+                  f"  {round_trips[-1] * 1000:7.1f} ms")
+    return _summary(sent, results, round_trips)
+
+
+def _summary(sent, results, round_trips):
+    latencies = np.array(round_trips) * 1000.0 if round_trips else np.zeros(1)
+    return {
+        'sent': sent,
+        'received': len(results),
+        'dropped': sent - len(results),
+        'errors': sum(1 for payload in results if 'error' in payload),
+        'rtt_ms_mean': round(float(latencies.mean()), 2),
+        'rtt_ms_p95': round(float(np.percentile(latencies, 95)), 2),
+    }
+
+
+# ─── CLI ─────────────────────────────────────────────────────────────────────
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PoseDetector HTTP / WebSocket sunucusu")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Sunucuyu başlat")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--workers", type=int, default=None,
+                       help="Detector process sayısı (varsayılan: çekirdek sayısı)")
+    add_detector_arguments(serve)
+
+    client = commands.add_parser("client", help="Test istemcisi - frame gönderip sonuçları yazdırır")
+    client.add_argument("source", help="Video dosyası, resim, resim klasörü veya kamera indeksi")
+    client.add_argument("--url", default=None,
+                        help="Sunucu adresi (varsayılan: ws://127.0.0.1:8765/ws veya /detect)")
+    client.add_argument("--http", action="store_true", help="WebSocket yerine HTTP POST kullan")
+    client.add_argument("--fps", type=float, default=30.0, help="WebSocket gönderim hızı (0 = sınırsız)")
+    client.add_argument("--count", type=int, default=None, help="En fazla gönderilecek frame sayısı")
+    client.add_argument("--quiet", action="store_true", help="Sadece özeti yazdır")
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        try:
+            check_detector_options(detector_options_from_args(args))
+        except (RuntimeError, ValueError) as e:
+            serve.error(str(e))
+    return args
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    if args.command == "serve":
+        server = InferenceServer(args.host, args.port, args.workers, detector_options_from_args(args))
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return
+
+    frames = iter_jpeg_frames(args.source, limit=args.count)
+    if args.http:
+        url = args.url or "http://127.0.0.1:8765/detect"
+        summary = asyncio.run(run_http_client(url, frames, verbose=not args.quiet))
+    else:
+        url = args.url or "ws://127.0.0.1:8765/ws"
+        summary = asyncio.run(run_ws_client(url, frames, fps=args.fps, verbose=not args.quiet))
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
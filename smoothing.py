@@ -0,0 +1,144 @@
+"""
+Pose Smoothing Module
+Frame bazlı poz kararlarını zamana yayar: metriklerde üstel hareketli ortalama,
+giriş / çıkış eşikleriyle histerezis ve minimum bekleme süresi
+"""
+
+import time
+
+import numpy as np
+
+from gestures import DEFAULT_ENGINE, DEFAULT_LABEL
+
+
+# Etiket → [(metrik, yön, giriş eşiği, çıkış eşiği), ...]; öncelik sırasıyla
+# Çıkış eşikleri (gestures.json'da "exit") girişten gevşek: sınırdaki küçük
+# titremeler etiketi değiştirmez
+DEFAULT_HYSTERESIS = DEFAULT_ENGINE.hysteresis()
+
+
+class PoseStabilizer:
+    """PoseDetector üzerinde durumlu sınıflandırıcı
+
+    alpha:      EMA katsayısı (1.0 = yumuşatma yok)
+    min_dwell:  yeni etiketin geçerli olması için kesintisiz aday kalması
+                gereken süre (saniye)
+    hysteresis: etiket başına (metrik, yön, giriş, çıkış) koşulları; tümü
+                tutunca etiket aday olur (bkz. GestureEngine.hysteresis)
+
+    Detector'ün kendi kural dosyası ve eşikleri için `for_detector` kullanılır.
+
+    Çok kişili sonuçlarda her kişi yuvası (soldan sağa sıra) kendi durumunu tutar.
+    """
+
+    def __init__(self, alpha=0.5, min_dwell=0.15, hysteresis=None, default_label=DEFAULT_LABEL):
+        self.alpha = alpha
+        self.default_label = default_label
+        self.min_dwell = min_dwell
+        self.hysteresis = {
+            label: [conditions] if isinstance(conditions[0], str) else list(conditions)
+            for label, conditions in (hysteresis or DEFAULT_HYSTERESIS).items()
+        }
+        self.transitions = 0
+        self.reset()
+
+    @classmethod
+    def for_detector(cls, detector, **kwargs):
+        """Detector'ün kurallarından (gestures + thresholds) histerezisli stabilizatör"""
+        return cls(hysteresis=detector.gestures.hysteresis(detector.thresholds),
+                   default_label=detector.gestures.default_label, **kwargs)
+
+    def reset(self):
+        """Durumu varsayılan etikete döndürür (geçiş sayacı korunur)"""
+        self.label = self.default_label
+        self.smoothed = {}
+        self.confidences = {label: 0.0 for label in self.hysteresis}
+        self.confidences[self.default_label] = 1.0
+
+        self._candidate = self.default_label
+        self._candidate_since = None
+        self._people = []
+
+    def update(self, metrics, timestamp=None):
+        """Yeni frame metrikleriyle durumu günceller, kararlı etiketi döner"""
+        now = time.monotonic() if timestamp is None else timestamp
+        self._smooth(metrics)
+
+        candidate = self.default_label
+        for label, conditions in self.hysteresis.items():
+            passes = True
+            confidence = 1.0
+            for metric, direction, enter, exit_ in conditions:
+                value = self.smoothed.get(metric, np.nan)
+                # Aktif etiket çıkış eşiğiyle, diğerleri giriş eşiğiyle değerlendirilir
+                threshold = exit_ if label == self.label else enter
+                confidence = min(confidence, _confidence(value, direction, enter, exit_))
+                passes = passes and _passes(value, direction, threshold)
+            self.confidences[label] = confidence
+            if candidate == self.default_label and passes:
+                candidate = label
+        self.confidences[self.default_label] = 1.0 - max(
+            (self.confidences[label] for label in self.hysteresis), default=0.0
+        )
+
+        if candidate == self.label:
+            self._candidate = candidate
+            self._candidate_since = None
+            return self.label
+
+        if candidate != self._candidate or self._candidate_since is None:
+            self._candidate = candidate
+            self._candidate_since = now
+
+        if now - self._candidate_since >= self.min_dwell:
+            self.label = candidate
+            self.transitions += 1
+            self._candidate_since = None
+        return self.label
+
+    def apply(self, result, timestamp=None):
+        """DetectionResult'ın etiketini kararlı etiketle değiştirir (ham etiket korunur)"""
+        result.raw_pose_name = result.pose_name
+        people = result.people
+        if len(people) <= 1:
+            result.pose_name = self.update(result.metrics, timestamp)
+            result.confidences = dict(self.confidences)
+            for person in people:
+                person.pose_name = result.pose_name
+                person.confidences = result.confidences
+            return result
+
+        while len(self._people) < len(people):
+            self._people.append(PoseStabilizer(self.alpha, self.min_dwell, self.hysteresis, self.default_label))
+        for person, stabilizer in zip(people, self._people):
+            person.pose_name = stabilizer.update(person.metrics, timestamp)
+            person.confidences = dict(stabilizer.confidences)
+        primary = people[result.primary]
+        result.pose_name = primary.pose_name
+        result.confidences = primary.confidences
+        return result
+
+    def _smooth(self, metrics):
+        for name, value in metrics.items():
+            value = float(value)
+            previous = self.smoothed.get(name, np.nan)
+            if np.isnan(value) or np.isnan(previous):
+                # Tespit kaybında / ilk görüşte ortalama taşınmaz
+                self.smoothed[name] = value
+            else:
+                self.smoothed[name] = self.alpha * value + (1.0 - self.alpha) * previous
+
+
+def _passes(value, direction, threshold):
+    if np.isnan(value):
+        return False
+    return value > threshold if direction == '>' else value < threshold
+
+
+def _confidence(value, direction, enter, exit_):
+    """Çıkış eşiğinde 0, giriş eşiğinde 0.5, girişin bir o kadar ötesinde 1"""
+    if np.isnan(value):
+        return 0.0
+    margin = abs(enter - exit_) or 1e-6
+    offset = value - exit_ if direction == '>' else exit_ - value
+    return float(np.clip(offset / (2.0 * margin), 0.0, 1.0))
@@ -0,0 +1,316 @@
+"""
+Stream Pool Module
+Birden çok kamera / kaynağın frame'lerini paylaşılan worker process havuzunda işler
+
+Her kaynağın bir capture thread'i vardır. Kaynaklar worker'lara sabit atanır
+(kaynak i → worker i % N): MediaPipe takip durumu ve poz stabilizatörü
+kaynak başına worker içinde tutulur. Frame'ler paylaşımlı bellek üzerinden
+aktarılır (pickle yok); her kaynağın aynı anda tek frame'i işlenir, işlem
+sürerken gelen frame'ler sadece en yenisi kalacak şekilde düşürülür.
+Worker'lar ayrı process olduğu için çekirdek sayısına kadar doğrusal ölçeklenir.
+Çöken worker (MediaPipe içinde segfault / OOM) hata sonucu olarak bildirilir ve
+en fazla MAX_WORKER_RESTARTS kez yeniden başlatılır; sonra kaynakları durur.
+"""
+
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from pipeline import BufferPool, FrameRing
+
+
+MAX_WORKER_RESTARTS = 3
+
+
+@dataclass
+class StreamResult:
+    """Worker'dan dönen, process sınırını geçebilen (picklable) sonuç"""
+
+    stream: int
+    pose_name: str
+    people: list = field(default_factory=list)
+    primary: int = 0
+    captured_at: float = 0.0
+    inference_time: float = 0.0
+    # Frame işlenemediyse "HataTürü: mesaj" (worker çalışmaya devam eder)
+    error: str = None
+
+
+# ─── Worker tarafı ───────────────────────────────────────────────────────────
+
+def _attach(name, shape):
+    # spawn ile başlayan worker ana process'in resource_tracker'ını paylaşır;
+    # bağlanırken yapılan kayıt aynı isme düşer, silme yine ana process'te
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+
+
+def _stream_worker(tasks, results, detector_options, stabilize):
+    """Worker process döngüsü - atanan kaynaklar için detector ve stabilizatör tutar"""
+    from pose_detector import PoseDetector
+    from smoothing import PoseStabilizer
+
+    detectors = {}
+    stabilizers = {}
+    buffers = {}
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            stream, shm_name, shape, captured_at = task
+
+            attached = buffers.get(stream)
+            if attached is None or attached[0].name != shm_name:
+                if attached is not None:
+                    attached[0].close()
+                attached = buffers[stream] = _attach(shm_name, shape)
+            started = time.perf_counter()
+            try:
+                detector = detectors.get(stream)
+                if detector is None:
+                    detector = PoseDetector(**detector_options)
+                    detector.warm_up(frame_shape=shape)
+                    detectors[stream] = detector
+                    stabilizers[stream] = PoseStabilizer.for_detector(detector) if stabilize else None
+
+                result = detector.detect(attached[1])
+                if stabilizers[stream] is not None:
+                    stabilizers[stream].apply(result, captured_at)
+            except Exception as e:
+                # Hata sonuç olarak bildirilir: kaynak işlemde takılı kalmaz, diğer kaynaklar sürer
+                results.put(StreamResult(
+                    stream=stream,
+                    pose_name=None,
+                    captured_at=captured_at,
+                    inference_time=time.perf_counter() - started,
+                    error=f"{type(e).__name__}: {e}",
+                ))
+                continue
+            results.put(StreamResult(
+                stream=stream,
+                pose_name=result.pose_name,
+                people=result.people,
+                primary=result.primary,
+                captured_at=captured_at,
+                inference_time=time.perf_counter() - started,
+            ))
+    finally:
+        for shm, _ in buffers.values():
+            shm.close()
+        for detector in detectors.values():
+            detector.release()
+
+
+# ─── Ana process tarafı ──────────────────────────────────────────────────────
+
+class _Stream:
+    """Tek kaynağın durumu: bekleyen en yeni frame, işlemdeki frame'in paylaşımlı belleği"""
+
+    def __init__(self, index, source, worker):
+        self.index = index
+        self.source = source
+        self.worker = worker
+        self.lock = threading.Lock()
+        self.capture_pool = BufferPool()
+        self.rgb_pool = BufferPool()
+        self.result_ring = FrameRing(1, on_drop=lambda item: self.rgb_pool.release(item[0]))
+        self.pending = None
+        self.in_flight = False
+        self.submitted_at = None
+        self.shm = None
+        self.frame = None
+        self.stats = {'captured': 0, 'processed': 0, 'dropped': 0, 'errors': 0, 'latency_ms': 0.0}
+        self.error = None
+
+
+class StreamPool:
+    """Çok kaynaklı capture → worker havuzu → sonuç hattı
+
+    sources:   FrameSource listesi (bkz. frame_source.open_source)
+    on_result: sonuç hazır olunca kaynak indeksiyle çağrılır (GUI'de Qt sinyali)
+    workers:   worker process sayısı (varsayılan: min(kaynak, çekirdek))
+    renderer:  verilirse kişi kutuları gösterim frame'ine çizilir
+    """
+
+    def __init__(self, sources, on_result, workers=None, detector_options=None, stabilize=True,
+                 mirror=True, renderer=None):
+        if not sources:
+            raise ValueError("En az bir kaynak gerekli")
+        self.on_result = on_result
+        self.mirror = mirror
+        self.renderer = renderer
+        self.worker_count = max(1, min(workers or os.cpu_count() or 1, len(sources)))
+
+        # Qt thread'leri varken fork güvenli değil - worker'lar spawn ile başlar
+        self._context = multiprocessing.get_context("spawn")
+        self._worker_options = (detector_options or {}, stabilize)
+        self._results = self._context.Queue()
+        self._tasks = [None] * self.worker_count
+        self._processes = [self._spawn(index) for index in range(self.worker_count)]
+        self._restarts = [0] * self.worker_count
+        self.streams = [_Stream(index, source, index % self.worker_count) for index, source in enumerate(sources)]
+
+        self._running = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._running.set()
+        for process in self._processes:
+            process.start()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, args=(stream,), name=f"capture-{stream.index}", daemon=True)
+            for stream in self.streams
+        ]
+        self._threads.append(threading.Thread(target=self._result_loop, name="stream-results", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=2.0):
+        self._running.clear()
+        for thread in self._threads:
+            thread.join(timeout)
+        for tasks in self._tasks:
+            tasks.put(None)
+        for process in self._processes:
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for stream in self.streams:
+            stream.source.release()
+            if stream.shm is not None:
+                stream.shm.close()
+                stream.shm.unlink()
+                stream.shm = None
+
+    def _spawn(self, index):
+        """Worker process'i (başlatmadan) ve ona ait yeni görev kuyruğunu oluşturur"""
+        self._tasks[index] = self._context.Queue()
+        return self._context.Process(
+            target=_stream_worker,
+            args=(self._tasks[index], self._results, *self._worker_options),
+            name=f"stream-worker-{index}",
+            daemon=True,
+        )
+
+    def take_result(self, index):
+        """GUI thread'inde - kaynağın bekleyen en yeni (rgb_frame, StreamResult) çifti"""
+        return self.streams[index].result_ring.get(timeout=0)
+
+    def release_frame(self, index, rgb_frame):
+        self.streams[index].rgb_pool.release(rgb_frame)
+
+    def _capture_loop(self, stream):
+        shape = None
+        while self._running.is_set():
+            buffer = stream.capture_pool.acquire(shape) if shape else None
+            ret, frame = stream.source.read(buffer)
+            if not ret:
+                stream.capture_pool.release(buffer)
+                time.sleep(0.01)
+                continue
+            if frame is not buffer:
+                stream.capture_pool.release(buffer)
+                shape = frame.shape
+            captured_at = time.perf_counter()
+
+            with stream.lock:
+                stream.stats['captured'] += 1
+                if stream.in_flight:
+                    # Worker meşgul - sadece en yeni frame bekler
+                    if stream.pending is not None:
+                        stream.stats['dropped'] += 1
+                        stream.capture_pool.release(stream.pending[1])
+                    stream.pending = (captured_at, frame)
+                else:
+                    self._submit(stream, captured_at, frame)
+
+    def _submit(self, stream, captured_at, frame):
+        """Frame'i kaynağın paylaşımlı belleğine yazar ve worker'a gönderir (kilit altında)"""
+        if self._processes[stream.worker] is None:
+            # Worker yeniden başlatma sınırını aştı - kaynak durdu (hata gösterildi)
+            stream.capture_pool.release(frame)
+            return
+        if stream.frame is None or stream.frame.shape != frame.shape:
+            if stream.shm is not None:
+                stream.shm.close()
+                stream.shm.unlink()
+            stream.shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+            stream.frame = np.ndarray(frame.shape, dtype=np.uint8, buffer=stream.shm.buf)
+        # Ayna efekti kopyayla birlikte tek geçişte
+        if self.mirror:
+            cv2.flip(frame, 1, dst=stream.frame)
+        else:
+            np.copyto(stream.frame, frame)
+        stream.capture_pool.release(frame)
+        stream.in_flight = True
+        stream.submitted_at = captured_at
+        self._tasks[stream.worker].put((stream.index, stream.shm.name, frame.shape, captured_at))
+
+    def _result_loop(self):
+        checked_at = time.perf_counter()
+        while self._running.is_set():
+            # Diğer kaynakların sonuçları akarken de çöken worker fark edilsin
+            if time.perf_counter() - checked_at > 0.5:
+                self._check_workers()
+                checked_at = time.perf_counter()
+            try:
+                result = self._results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._deliver(self.streams[result.stream], result)
+
+    def _check_workers(self):
+        """Çöken worker'ın kaynaklarını hata sonucuyla serbest bırakır, worker'ı yeniden başlatır"""
+        for index, process in enumerate(self._processes):
+            if process is None or process.exitcode is None:
+                continue
+            error = f"worker process çöktü (çıkış kodu {process.exitcode})"
+            if self._restarts[index] < MAX_WORKER_RESTARTS:
+                self._restarts[index] += 1
+                self._processes[index] = self._spawn(index)
+                self._processes[index].start()
+                error += ", yeniden başlatıldı"
+            else:
+                self._processes[index] = None
+                error += ", kaynaklar durduruldu"
+            for stream in self.streams:
+                if stream.worker == index and stream.in_flight:
+                    self._deliver(stream, StreamResult(stream.index, pose_name=None,
+                                                       captured_at=stream.submitted_at, error=error))
+
+    def _deliver(self, stream, result):
+        """Sonucu kaynağın sonuç halkasına koyar ve bekleyen frame'i gönderir"""
+        with stream.lock:
+            if not stream.in_flight or result.captured_at != stream.submitted_at:
+                return  # Çöken worker'dan kalan eski sonuç
+            # Worker bitirdi - paylaşımlı frame bir sonraki gönderime kadar bizde
+            rgb_frame = cv2.cvtColor(stream.frame, cv2.COLOR_BGR2RGB,
+                                     dst=stream.rgb_pool.acquire(stream.frame.shape))
+            stream.in_flight = False
+            stream.stats['processed'] += 1
+            stream.stats['latency_ms'] = (time.perf_counter() - result.captured_at) * 1000.0
+            if result.error is not None:
+                stream.stats['errors'] += 1
+                if result.error != stream.error:
+                    print(f"Uyarı: kaynak {stream.index + 1}: {result.error}", file=sys.stderr)
+            stream.error = result.error
+            if stream.pending is not None:
+                captured_at, frame = stream.pending
+                stream.pending = None
+                self._submit(stream, captured_at, frame)
+
+        if self.renderer is not None:
+            self.renderer.draw_people(rgb_frame, result.people)
+        stream.result_ring.put((rgb_frame, result))
+        self.on_result(result.stream)